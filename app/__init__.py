@@ -3,9 +3,8 @@ Rafad Clinic System
 Flask application factory
 """
 from datetime import datetime
-from flask import Flask, render_template, request
+from flask import Flask, Request, render_template, request
 from flask_login import LoginManager
-from flask_migrate import Migrate
 from config import config_dict
 from sqlalchemy.exc import SQLAlchemyError
 from app.models import db, User
@@ -18,6 +17,23 @@ login_manager.login_message = 'Please log in to access this page.'
 login_manager.login_message_category = 'info'
 
 
+class AppRequest(Request):
+    """Request whose upload limit a view can raise before reading the body"""
+    
+    _max_content_length = None
+    
+    @property
+    def max_content_length(self):
+        """MAX_CONTENT_LENGTH, unless the view set its own limit"""
+        if self._max_content_length is not None:
+            return self._max_content_length
+        return super().max_content_length
+    
+    @max_content_length.setter
+    def max_content_length(self, value):
+        self._max_content_length = value
+
+
 @login_manager.user_loader
 def load_user(user_id):
     """Load user by ID for Flask-Login"""
@@ -35,20 +51,44 @@ def create_app(config_name='development'):
         Flask: The configured Flask application
     """
     app = Flask(__name__)
+    app.request_class = AppRequest
     
     # Load configuration
     app.config.from_object(config_dict[config_name])
     config_dict[config_name].init_app(app)
     
+    # Client address from X-Forwarded-For behind PROXY_FIX_X_FOR trusted proxies
+    if app.config['PROXY_FIX_X_FOR']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    
+    # orjson-backed jsonify() with ISO dates and HH:MM times (app/utils/serialization.py)
+    from app.utils.serialization import AppJSONProvider
+    app.json = AppJSONProvider(app)
+    
+    _init_template_cache(app)
+    
+    # gzip/brotli responses; registered first so it runs after every other hook
+    from app.utils.compression import init_compression
+    init_compression(app)
+    
+    # Fingerprinted, precompressed static bundles (app/utils/assets.py)
+    from app.utils.assets import init_assets
+    init_assets(app)
+    
     # Initialize extensions
     db.init_app(app)
     login_manager.init_app(app)
-    migrate = Migrate(app, db)
+    _init_migrations(app)
     
     # Register all blueprints using the centralized registration function
     from app.routes import register_blueprints
     register_blueprints(app)
     
+    # CLI commands (init_db, seed_db, startup-profile, ...)
+    from app.cli import register_commands
+    register_commands(app)
+    
     # Error handlers
     @app.errorhandler(403)
     def forbidden(e):
@@ -89,6 +129,14 @@ def create_app(config_name='development'):
                               title="Database Error",
                               message="A database error has occurred. Please try again later."), 500
         
+    @app.before_request
+    def note_activity():
+        """Remember when logged-in users were last seen (written in batches)"""
+        from flask_login import current_user
+        if request.endpoint != 'static' and current_user.is_authenticated:
+            from app.utils import activity
+            activity.record_seen(current_user.id)
+    
     # Add context processor for templates
     @app.context_processor
     def inject_now():
@@ -97,8 +145,48 @@ def create_app(config_name='development'):
         """
         return {'now': datetime.now()}
     
-    # Create database tables if they don't exist
-    with app.app_context():
-        db.create_all()
+    # The schema is created by `flask init_db` / `flask db upgrade`, not on every
+    # application start (each gunicorn worker, CLI command and test used to pay for it)
+    return app
+
+
+def _init_template_cache(app):
+    """
+    Enable fragment caching, and keep compiled templates on disk so a new
+    worker loads them instead of compiling
+    
+    Jinja checks each entry against the template source, so edited templates
+    are recompiled on their next use.
+    
+    Args:
+        app: The Flask application instance
+    """
+    # {% cache %} fragment blocks (app/utils/fragment_cache.py)
+    app.jinja_env.add_extension('app.utils.fragment_cache.FragmentCacheExtension')
+    
+    directory = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if not directory:
+        return
+    
+    import os
+    from jinja2 import FileSystemBytecodeCache
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def _init_migrations(app):
+    """
+    Set up Flask-Migrate only when running under the flask CLI
+    
+    Flask-Migrate pulls in Alembic (and Mako), a large share of cold start time,
+    and the `flask db` commands are its only users.
+    
+    Args:
+        app: The Flask application instance
+    """
+    import click
+    if click.get_current_context(silent=True) is None:
+        return
     
-    return app
\ No newline at end of file
+    from flask_migrate import Migrate
+    Migrate(app, db)
\ No newline at end of file
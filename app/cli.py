@@ -0,0 +1,334 @@
+"""
+CLI commands for Rafad Clinic System
+
+Commands import what they need inside their bodies so that registering them
+adds nothing to application startup.
+"""
+import os
+
+import click
+
+
+def register_commands(app):
+    """
+    Register custom CLI commands with the Flask application
+
+    Args:
+        app: The Flask application instance
+    """
+
+    @app.cli.command('init_db')
+    def init_db():
+        """Initialize the database with tables"""
+        from app.models import db
+
+        db.create_all()
+        print('Database initialized with tables!')
+
+    @app.cli.command('seed_db')
+    def seed_db():
+        """Seed the database with initial data"""
+        from app.models import db, User, Setting
+
+        # Create admin user
+        admin = User(
+            username='admin',
+            email='admin@rafadclinic.com',
+            role='admin'
+        )
+        admin.password = 'Admin@123'
+        db.session.add(admin)
+
+        # Create default settings
+        settings = [
+            Setting(
+                setting_name='clinic_name',
+                setting_value='Rafad Clinic',
+                setting_type='string',
+                description='Name of the clinic',
+                is_public=True
+            ),
+            Setting(
+                setting_name='appointment_duration',
+                setting_value='30',
+                setting_type='integer',
+                description='Default appointment duration in minutes',
+                is_public=True
+            ),
+            Setting(
+                setting_name='clinic_open_time',
+                setting_value='09:00',
+                setting_type='string',
+                description='Clinic opening time',
+                is_public=True
+            ),
+            Setting(
+                setting_name='clinic_close_time',
+                setting_value='18:00',
+                setting_type='string',
+                description='Clinic closing time',
+                is_public=True
+            ),
+            Setting(
+                setting_name='maintenance_mode',
+                setting_value='false',
+                setting_type='boolean',
+                description='Whether the system is in maintenance mode',
+                is_public=False
+            ),
+        ]
+
+        for setting in settings:
+            db.session.add(setting)
+
+        db.session.commit()
+        print('Database seeded with initial data!')
+
+    @app.cli.command('recount-patient-counters')
+    def recount_patient_counters():
+        """Rebuild the per-patient appointment counters from the appointments table"""
+        from app.models import Patient
+
+        updated = Patient.recalculate_appointment_counters()
+        print(f'Appointment counters recalculated for {updated} patients.')
+
+    @app.cli.command('build-schedules')
+    @click.option('--csv', 'csv_path', type=click.Path(exists=True, dir_okay=False),
+                  help='CSV with doctor_id,day,start,end[,duration,break,valid_from]')
+    @click.option('--doctors', default=None, help='Doctor IDs for the template, comma separated, or "all"')
+    @click.option('--days', default='mon-fri', show_default=True, help='Days for the template, e.g. mon-fri or mon,wed')
+    @click.option('--start', default='09:00', show_default=True)
+    @click.option('--end', default='17:00', show_default=True)
+    @click.option('--duration', default=30, show_default=True, help='Appointment length in minutes')
+    @click.option('--break', 'break_minutes', default=0, show_default=True, help='Break between appointments')
+    @click.option('--valid-from', default=None, help='First day the schedules apply (YYYY-MM-DD)')
+    @click.option('--dry-run', is_flag=True, help='Validate and report without saving')
+    def build_schedules(csv_path, doctors, days, start, end, duration, break_minutes, valid_from, dry_run):
+        """Create weekly schedules for many doctors from a template or a CSV file"""
+        from app.models import db, Doctor
+        from app.utils import schedule_builder
+
+        try:
+            if csv_path:
+                with open(csv_path, newline='', encoding='utf-8-sig') as stream:
+                    rows = schedule_builder.read_schedule_csv(stream)
+            elif doctors:
+                if doctors == 'all':
+                    doctor_ids = [doctor_id for (doctor_id,) in db.session.query(Doctor.id)]
+                else:
+                    doctor_ids = [int(value) for value in doctors.split(',') if value.strip()]
+                rows = schedule_builder.expand_template({
+                    'days': days, 'start': start, 'end': end, 'duration': duration,
+                    'break': break_minutes, 'valid_from': valid_from,
+                }, doctor_ids)
+            else:
+                raise click.UsageError('Give --csv or --doctors')
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+        report = schedule_builder.build_schedules(rows, dry_run=dry_run)
+        for error in report['errors']:
+            click.echo(f"  row {error['row']}: {error['error']}")
+        if report['errors']:
+            raise click.ClickException(f"{len(report['errors'])} of {report['total']} rows invalid; nothing saved.")
+        if dry_run:
+            click.echo(f"Dry run: {report['valid']} schedules valid, nothing saved.")
+        else:
+            click.echo(f"Created {report['created']} schedules.")
+
+    @app.cli.command('import-appointments')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']), default=None,
+                  help='File format (default: from the file extension)')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Rows per INSERT batch and commit')
+    @click.option('--rejects', type=click.Path(dir_okay=False, writable=True), default=None,
+                  help='Write rejected rows to this CSV file')
+    @click.option('--dry-run', is_flag=True, help='Validate and report without saving')
+    def import_appointments(path, file_format, chunk_size, rejects, dry_run):
+        """Import appointments from a CSV or JSON Lines file"""
+        from app.utils import appointment_import
+
+        file_format = file_format or appointment_import.detect_format(path)
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            report = appointment_import.import_appointments(
+                appointment_import.iter_rows(stream, file_format), chunk_size=chunk_size, dry_run=dry_run
+            )
+
+        if rejects and report['rejected']:
+            with open(rejects, 'w', newline='', encoding='utf-8') as stream:
+                appointment_import.write_rejects(report['rejected'], stream)
+
+        done = f"{report['valid']} valid (dry run)" if dry_run else f"{report['inserted']} imported"
+        click.echo(f"{report['total']} rows read, {done}, {len(report['rejected'])} rejected "
+                   f"in {report['seconds']:.1f} s ({report['rows_per_second']:.0f} rows/s)")
+        for item in report['rejected'][:10]:
+            click.echo(f"  line {item['line']}: {item['error']}")
+        if len(report['rejected']) > 10:
+            click.echo(f"  ... see {rejects}" if rejects else '  ... use --rejects to save them all')
+
+    @app.cli.command('register-patients')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']), default=None,
+                  help='File format (default: from the file extension)')
+    @click.option('--chunk-size', default=500, show_default=True, help='Rows per INSERT batch and commit')
+    @click.option('--rejects', type=click.Path(dir_okay=False, writable=True), default=None,
+                  help='Write rejected rows to this CSV file')
+    @click.option('--dry-run', is_flag=True, help='Validate and report without saving')
+    def register_patients(path, file_format, chunk_size, rejects, dry_run):
+        """Create patient accounts from a CSV or JSON Lines onboarding list"""
+        from app.utils import appointment_import, registration
+
+        file_format = file_format or appointment_import.detect_format(path)
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            report = registration.register_patients(
+                appointment_import.iter_rows(stream, file_format), chunk_size=chunk_size, dry_run=dry_run
+            )
+
+        if rejects and report['rejected']:
+            with open(rejects, 'w', newline='', encoding='utf-8') as stream:
+                appointment_import.write_rejects(report['rejected'], stream)
+
+        done = f"{report['valid']} valid (dry run)" if dry_run else f"{report['created']} registered"
+        click.echo(f"{report['total']} rows read, {done}, {len(report['rejected'])} rejected "
+                   f"in {report['seconds']:.1f} s ({report['rows_per_second']:.0f} rows/s)")
+        for item in report['rejected'][:10]:
+            click.echo(f"  line {item['line']}: {item['error']}")
+        if len(report['rejected']) > 10:
+            click.echo(f"  ... see {rejects}" if rejects else '  ... use --rejects to save them all')
+
+    @app.cli.command('sweep-no-shows')
+    @click.option('--grace', default=None, type=int,
+                  help='Minutes after the end time to wait (default: NO_SHOW_GRACE_MINUTES)')
+    @click.option('--chunk-size', default=500, show_default=True, help='Appointments per UPDATE')
+    def sweep_no_shows(grace, chunk_size):
+        """Mark overdue scheduled appointments as no-shows (run from cron)"""
+        from flask import current_app
+        from app.models import Appointment
+
+        grace = current_app.config['NO_SHOW_GRACE_MINUTES'] if grace is None else grace
+        marked = Appointment.sweep_no_shows(grace_minutes=grace, chunk_size=chunk_size)
+        print(f'{marked} appointments marked as no-show.')
+
+    @app.cli.command('archive-appointments')
+    @click.option('--days', default=None, type=int,
+                  help='Archive finished appointments older than this (default: APPOINTMENT_ARCHIVE_DAYS)')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Appointments moved per transaction')
+    @click.option('--dry-run', is_flag=True, help='Only count the appointments that would move')
+    def archive_appointments(days, chunk_size, dry_run):
+        """Move old completed, cancelled and no-show appointments to the archive table"""
+        from datetime import date, timedelta
+        from app.utils import appointment_archive
+
+        if days is None:
+            before = appointment_archive.default_archive_date()
+        else:
+            before = date.today() - timedelta(days=days)
+        report = appointment_archive.archive_appointments(before, chunk_size=chunk_size, dry_run=dry_run)
+
+        verb = 'would be archived' if dry_run else 'archived'
+        print(f"{report['moved']} appointments dated before {before.isoformat()} {verb} "
+              f"in {report['seconds']:.1f} s.")
+
+    @app.cli.command('send-reminders')
+    @click.option('--hours', default=None, type=int,
+                  help='Remind about appointments starting within this many hours (default: REMINDER_LEAD_HOURS)')
+    @click.option('--bucket', default=60, show_default=True, help='Minutes of the window scanned at a time')
+    @click.option('--transport', default=None, help='console, file or module:Class (default: REMINDER_TRANSPORT)')
+    @click.option('--generate-only', is_flag=True, help='Queue reminders in the outbox without sending')
+    @click.option('--send-only', is_flag=True, help='Only send reminders already in the outbox')
+    def send_reminders(hours, bucket, transport, generate_only, send_only):
+        """Queue reminders for upcoming appointments and send the outbox"""
+        from app.utils import reminders
+
+        if not send_only:
+            report = reminders.generate_reminders(lead_hours=hours, bucket_minutes=bucket)
+            print(f"{report['scanned']} appointments scanned, {report['created']} reminders queued, "
+                  f"{report['skipped']} skipped in {report['seconds']:.1f} s.")
+        if not generate_only:
+            report = reminders.deliver_reminders(reminders.get_transport(transport))
+            print(f"{report['sent']} reminders sent, {report['failed']} to retry, "
+                  f"{report['given_up']} given up, {report['cancelled']} cancelled "
+                  f"in {report['seconds']:.1f} s.")
+
+    @app.cli.command('login-throttle')
+    @click.option('--prune', is_flag=True, help='Delete counters with no recent failures first')
+    def login_throttle(prune):
+        """Show rejected and blocked login attempts"""
+        from app.utils import login_throttle as throttle
+
+        if prune:
+            print(f'{throttle.prune()} stale counters deleted.')
+        stats = throttle.metrics()
+        for kind in throttle.KINDS:
+            print(f"{kind}: {stats['rejected'][kind]} attempts rejected, {stats['blocked'][kind]} blocked now")
+
+    @app.cli.command('worker')
+    @click.option('--processes', default=2, show_default=True,
+                  help='Jobs run at the same time (0 runs them in this process)')
+    @click.option('--poll', default=2.0, show_default=True, help='Seconds between queue polls when idle')
+    @click.option('--once', is_flag=True, help='Exit when the queue is empty')
+    @click.option('--config', 'config_name', default=None,
+                  help='Configuration for the pool processes (default: FLASK_CONFIG)')
+    def worker(processes, poll, once, config_name):
+        """Run queued background jobs (exports, imports, archiving, ...)"""
+        import os
+        from app.utils.jobs import run_worker
+
+        try:
+            run_worker(config_name or os.getenv('FLASK_CONFIG') or 'default',
+                       processes=processes, poll_interval=poll, once=once)
+        except KeyboardInterrupt:
+            print('Worker stopped.')
+
+    @app.cli.command('precompile-templates')
+    @click.option('--clear', is_flag=True, help='Empty the bytecode cache first')
+    def precompile_templates(clear):
+        """Compile every template into JINJA_BYTECODE_CACHE_DIR (run at build time)"""
+        from app.utils.warmup import precompile_templates as precompile
+
+        try:
+            report = precompile(app, clear=clear)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"{report['templates']} templates compiled into {app.config['JINJA_BYTECODE_CACHE_DIR']} "
+                   f"in {report['ms']:.0f} ms")
+
+    @app.cli.command('build-assets')
+    def build_assets():
+        """Bundle, minify, fingerprint and precompress static files into static/dist/"""
+        from app.utils.assets import BUNDLES, DIST_DIR, build_assets as build
+
+        manifest = build(app.static_folder)
+        for name in BUNDLES:
+            click.echo(f'{name} -> {manifest[name]}')
+        click.echo(f'{len(manifest)} files written to {os.path.join(app.static_folder, DIST_DIR)}')
+
+    @app.cli.command('startup-profile')
+    @click.option('--config', 'config_name', default=None,
+                  help='Configuration to boot (default: $FLASK_CONFIG or production)')
+    @click.option('--top', default=15, show_default=True, help='Number of modules to list')
+    def startup_profile(config_name, top):
+        """Report import and create_app timings for a cold application boot"""
+        from app.utils.startup_profile import profile_startup, summarize_imports
+
+        config_name = config_name or os.environ.get('FLASK_CONFIG') or 'production'
+        try:
+            timings = profile_startup(config_name)
+        except RuntimeError as e:
+            raise click.ClickException(f'Application failed to start: {e}')
+        summary = summarize_imports(timings['entries'], top=top)
+
+        click.echo(f"Cold start ({config_name}): import {timings['import_ms']:.0f} ms, "
+                   f"create_app {timings['create_app_ms']:.0f} ms")
+        click.echo(f"Modules imported: {len(timings['entries'])} "
+                   f"({summary['total_ms']:.0f} ms by -X importtime)")
+
+        click.echo('\nSlowest imports (cumulative ms, self ms):')
+        for entry in summary['slowest']:
+            indent = '  ' * min(entry['depth'], 6)
+            click.echo(f"  {entry['cumulative_ms']:9.1f} {entry['self_ms']:8.1f}  "
+                       f"{indent}{entry['module']}")
+
+        click.echo('\nBy top-level package (self ms):')
+        for package, self_ms in summary['packages']:
+            click.echo(f'  {self_ms:9.1f}  {package}')
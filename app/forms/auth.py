@@ -119,15 +119,16 @@ class RegistrationForm(FlaskForm):
     ])
     submit = SubmitField('Register')
 
-    def validate_username(self, field):
-        """Validate username is unique"""
-        if User.query.filter_by(username=field.data).first():
-            raise ValidationError('Username already in use.')
-
-    def validate_email(self, field):
-        """Validate email is unique"""
-        if User.query.filter_by(email=field.data).first():
-            raise ValidationError('Email already registered.')
+    def validate(self, extra_validators=None):
+        """Run the field validators, then check username and email are unique in one query"""
+        from app.utils.registration import MESSAGES, taken_fields
+        valid = super().validate(extra_validators)
+        if self.username.errors or self.email.errors:
+            return False
+        for field in taken_fields(self.username.data, self.email.data):
+            getattr(self, field).errors.append(MESSAGES[field])
+            valid = False
+        return valid
             
     def validate_date_of_birth(self, field):
         """Validate date of birth is in the past"""
@@ -2,9 +2,9 @@
 Schedule forms for Rafad Clinic System
 """
 from flask_wtf import FlaskForm
-from wtforms import SelectField, TimeField, BooleanField, SubmitField, HiddenField
-from wtforms.validators import DataRequired, ValidationError
-from datetime import time
+from wtforms import SelectField, TimeField, BooleanField, SubmitField, HiddenField, DateField, StringField
+from wtforms.validators import DataRequired, Optional, Length, ValidationError
+from datetime import date, time
 
 
 class ScheduleForm(FlaskForm):
@@ -27,8 +27,14 @@ class ScheduleForm(FlaskForm):
     is_available = BooleanField('Available', default=True)
     break_start = TimeField('Break Start (Optional)')
     break_end = TimeField('Break End (Optional)')
+    effective_from = DateField('Changes Apply From', validators=[Optional()])
     submit = SubmitField('Save Schedule')
     
+    def validate_effective_from(self, field):
+        """Validate changes do not rewrite past days"""
+        if field.data and field.data < date.today():
+            raise ValidationError('Changes cannot apply to past days.')
+    
     def validate_end_time(self, field):
         """Validate end time is after start time"""
         if self.start_time.data and field.data:
@@ -61,4 +67,34 @@ class ScheduleDeleteForm(FlaskForm):
     schedule_id = HiddenField(validators=[
         DataRequired(message="Schedule ID is required")
     ])
-    submit = SubmitField('Delete Schedule')
\ No newline at end of file
+    submit = SubmitField('Delete Schedule')
+
+
+class ScheduleExceptionForm(FlaskForm):
+    """Form for adding a holiday, leave or partial closure"""
+    # Filled in by the view: the doctor's own ID, or every doctor plus
+    # clinic-wide (0) for admins
+    doctor_id = SelectField('Applies To', coerce=int, choices=[])
+    kind = SelectField('Type', choices=[
+        ('leave', 'Leave'),
+        ('holiday', 'Holiday'),
+        ('other', 'Other')
+    ])
+    start_date = DateField('From', validators=[DataRequired(message="Start date is required")])
+    end_date = DateField('To', validators=[DataRequired(message="End date is required")])
+    start_time = TimeField('Closed From (Optional)', validators=[Optional()])
+    end_time = TimeField('Closed Until (Optional)', validators=[Optional()])
+    reason = StringField('Reason', validators=[Optional(), Length(max=128)])
+    submit = SubmitField('Add Closure')
+
+    def validate_end_date(self, field):
+        """Validate the range does not end before it starts"""
+        if self.start_date.data and field.data and field.data < self.start_date.data:
+            raise ValidationError('End date cannot be before start date.')
+
+    def validate_end_time(self, field):
+        """Validate partial closures have both times in order"""
+        if bool(field.data) != bool(self.start_time.data):
+            raise ValidationError('Give both times for a partial closure, or neither for full days.')
+        if field.data and field.data <= self.start_time.data:
+            raise ValidationError('End time must be after start time.')
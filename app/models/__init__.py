@@ -18,16 +18,26 @@ def load_models():
     from .patient import Patient
     from .doctor import Doctor
     from .schedule import Schedule
+    from .schedule_exception import ScheduleException
     from .appointment import Appointment
+    from .appointment_archive import ArchivedAppointment
     from .setting import Setting
+    from .job import Job
+    from .reminder import Reminder
+    from .login_throttle import LoginThrottle
     
     return {
         'User': User,
         'Patient': Patient,
         'Doctor': Doctor,
         'Schedule': Schedule,
+        'ScheduleException': ScheduleException,
         'Appointment': Appointment,
+        'ArchivedAppointment': ArchivedAppointment,
         'Setting': Setting,
+        'Job': Job,
+        'Reminder': Reminder,
+        'LoginThrottle': LoginThrottle,
     }
 
 # Make models available at module level
@@ -36,5 +46,10 @@ User = models_dict['User']
 Patient = models_dict['Patient']
 Doctor = models_dict['Doctor']
 Schedule = models_dict['Schedule']
+ScheduleException = models_dict['ScheduleException']
 Appointment = models_dict['Appointment']
-Setting = models_dict['Setting']
\ No newline at end of file
+ArchivedAppointment = models_dict['ArchivedAppointment']
+Setting = models_dict['Setting']
+Job = models_dict['Job']
+Reminder = models_dict['Reminder']
+LoginThrottle = models_dict['LoginThrottle']
@@ -2,6 +2,8 @@
 Appointment model for Rafad Clinic System
 """
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from . import db
 
 
@@ -10,17 +12,29 @@ class Appointment(db.Model):
     __tablename__ = 'appointments'
 
     id = db.Column(db.Integer, primary_key=True)
-    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
+    # active_history keeps the previous value when these change, for the patient counters
+    patient_id = db.column_property(db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False),
+                                    active_history=True)
     doctor_id = db.Column(db.Integer, db.ForeignKey('doctors.id'), nullable=False)
     appointment_date = db.Column(db.Date, nullable=False)
     start_time = db.Column(db.Time, nullable=False)
     end_time = db.Column(db.Time, nullable=False)
-    status = db.Column(db.String(20), default='scheduled')  # scheduled, completed, cancelled, no_show
+    status = db.column_property(db.Column(db.String(20), default='scheduled'),  # scheduled, completed, cancelled, no_show
+                                active_history=True)
     reason = db.Column(db.Text)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Patient dashboard and history pages read a patient's appointments in date order
+        db.Index('ix_appointments_patient_date', 'patient_id', 'appointment_date', 'start_time'),
+        # Reminder runs scan upcoming appointments in time buckets
+        db.Index('ix_appointments_date_start_status', 'appointment_date', 'start_time', 'status'),
+        # Never reuse an ID: archived appointments keep theirs (see ArchivedAppointment)
+        {'sqlite_autoincrement': True},
+    )
+    
     # Property to support code that uses appointment_time
     @property
     def appointment_time(self):
@@ -61,6 +75,9 @@ class Appointment(db.Model):
         """Check if appointment can be cancelled"""
         return self.status == 'scheduled' and not self.is_past
     
+    # Rows moved to appointments_archive are ArchivedAppointment instances
+    is_archived = False
+    
     def __repr__(self):
         return f'<Appointment {self.id}: {self.patient.full_name if self.patient else "Unknown"} with {self.doctor.full_name if self.doctor else "Unknown"} on {self.formatted_date} at {self.formatted_time}>'
         
@@ -96,6 +113,7 @@ class Appointment(db.Model):
         """
         from app.models.schedule import Schedule
         from app.models.doctor import Doctor
+        from app.utils.schedule_exceptions import get_exception_index
         from datetime import datetime, timedelta
         from sqlalchemy import and_, or_
         import calendar
@@ -113,15 +131,13 @@ class Appointment(db.Model):
         dt_end = dt_start + timedelta(minutes=duration_minutes)
         end_time = dt_end.time()
         
-        # Get the day of week (0=Monday, 6=Sunday)
-        day_index = date.weekday()
+        # Holidays and leave (checked in memory, before any query)
+        closure = get_exception_index().blocking(doctor_id, date, time, end_time)
+        if closure:
+            return False, f"Doctor is unavailable: {closure.label}"
         
         # Check if doctor has schedule for this day
-        schedule = Schedule.query.filter_by(
-            doctor_id=doctor_id,
-            day_of_week=day_index,
-            is_active=True
-        ).first()
+        schedule = Schedule.for_date(doctor_id, date)
         
         if not schedule:
             return False, "Doctor does not have office hours on this day"
@@ -170,4 +186,193 @@ class Appointment(db.Model):
             return False, f"Time slot conflicts with existing appointment at {conflicting_appointment.formatted_time}"
             
         # All checks passed
-        return True, None
\ No newline at end of file
+        return True, None
+
+    
+    # Statuses each target status may be reached from in bulk updates
+    STATUS_TRANSITIONS = {
+        'scheduled': ('confirmed', 'cancelled', 'no_show'),
+        'confirmed': ('scheduled',),
+        'completed': ('scheduled', 'confirmed', 'no_show'),
+        'cancelled': ('scheduled', 'confirmed'),
+        'no_show': ('scheduled', 'confirmed'),
+    }
+    
+    @classmethod
+    def _update_returning_patients(cls, criteria, values):
+        """Run one UPDATE and return (id, patient_id) of the rows it changed"""
+        statement = db.update(cls).where(*criteria).values(updated_at=datetime.utcnow(), **values)
+        if db.session.get_bind().dialect.update_returning:
+            return db.session.execute(
+                statement.returning(cls.id, cls.patient_id),
+                execution_options={'synchronize_session': 'fetch'}
+            ).all()
+        
+        # Databases without UPDATE ... RETURNING: lock in the rows first
+        rows = db.session.query(cls.id, cls.patient_id).filter(*criteria).all()
+        if rows:
+            db.session.execute(
+                db.update(cls).where(cls.id.in_([row[0] for row in rows])).values(
+                    updated_at=datetime.utcnow(), **values),
+                execution_options={'synchronize_session': 'fetch'}
+            )
+        return rows
+    
+    @classmethod
+    def bulk_update_status(cls, ids, status, user):
+        """
+        Apply a status change to many appointments in one UPDATE
+        
+        Permissions are part of the WHERE clause: doctors only change their
+        own appointments, patients may only cancel theirs, and only rows in a
+        status listed in STATUS_TRANSITIONS for the target are changed. The
+        patient counters of the changed rows are recalculated and
+        updated_at is set so incremental day sheet refreshes pick them up.
+        
+        Args:
+            ids (list): Appointment IDs
+            status (str): Target status
+            user: The user making the change
+            
+        Returns:
+            tuple: (list of updated IDs, list of skipped IDs)
+            
+        Raises:
+            ValueError: If the status is unknown or not allowed for the user's role
+        """
+        from app.models.patient import Patient
+        
+        if not isinstance(status, str) or status not in cls.STATUS_TRANSITIONS:
+            raise ValueError(f'Invalid status: {status!r}')
+        
+        criteria = [cls.id.in_(ids), cls.status.in_(cls.STATUS_TRANSITIONS[status])]
+        if user.role == 'patient':
+            if status != 'cancelled':
+                raise ValueError('Patients can only cancel appointments')
+            criteria.append(cls.patient_id == user.patient.id)
+        elif user.role == 'doctor':
+            criteria.append(cls.doctor_id == user.doctor.id)
+        elif user.role not in ('admin', 'receptionist'):
+            raise ValueError('Not allowed to change appointment status')
+        
+        rows = cls._update_returning_patients(criteria, {'status': status})
+        db.session.commit()
+        
+        if rows:
+            Patient.recalculate_appointment_counters(sorted({patient_id for _, patient_id in rows}))
+        
+        updated = sorted(appointment_id for appointment_id, _ in rows)
+        skipped = sorted(set(ids) - set(updated))
+        return updated, skipped
+    
+    @classmethod
+    def sweep_no_shows(cls, now=None, grace_minutes=60, chunk_size=500):
+        """
+        Mark scheduled appointments that ended more than grace_minutes ago as no_show
+        
+        Runs chunked UPDATEs (one commit each) so long sweeps never hold a
+        write lock for long, and recalculates the counters of the affected
+        patients after each chunk.
+        
+        Args:
+            now (datetime): Reference time (defaults to the current local time)
+            grace_minutes (int): How long after the end time to wait
+            chunk_size (int): Appointments per UPDATE
+            
+        Returns:
+            int: Number of appointments marked as no_show
+        """
+        from datetime import timedelta
+        from app.models.patient import Patient
+        
+        cutoff = (now or datetime.now()) - timedelta(minutes=grace_minutes)
+        overdue = db.select(cls.id).where(
+            cls.status == 'scheduled',
+            db.or_(
+                cls.appointment_date < cutoff.date(),
+                db.and_(cls.appointment_date == cutoff.date(), cls.end_time <= cutoff.time())
+            )
+        ).order_by(cls.id).limit(chunk_size)
+        
+        total = 0
+        while True:
+            rows = cls._update_returning_patients(
+                [cls.id.in_(overdue), cls.status == 'scheduled'], {'status': 'no_show'}
+            )
+            db.session.commit()
+            if not rows:
+                break
+            Patient.recalculate_appointment_counters(sorted({patient_id for _, patient_id in rows}))
+            total += len(rows)
+            if len(rows) < chunk_size:
+                break
+        return total
+
+
+@event.listens_for(Session, 'before_flush')
+def _update_patient_counters(session, flush_context, instances):
+    """
+    Keep Patient appointment counters in step with inserts, status changes and deletes
+
+    Bulk UPDATE/DELETE statements bypass this hook; call
+    Patient.recalculate_appointment_counters() after them.
+    """
+    from app.models.patient import Patient
+
+    deltas = {}
+
+    def count(patient, status, delta):
+        column = Patient.STATUS_COUNTERS.get(status or 'scheduled')
+        if column is None or patient is None:
+            return
+        per_patient = deltas.setdefault(patient, {})
+        per_patient[column] = per_patient.get(column, 0) + delta
+
+    def patient_of(appointment):
+        # The id, or the Patient itself when it has not been flushed yet;
+        # reads __dict__ so that no lazy load is issued during the flush
+        if appointment.patient_id is not None:
+            return appointment.patient_id
+        patient = appointment.__dict__.get('patient')
+        if patient is None:
+            return None
+        return patient.id if patient.id is not None else patient
+
+    for obj in session.new:
+        if isinstance(obj, Appointment):
+            count(patient_of(obj), obj.status, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Appointment):
+            count(obj.patient_id, obj.status, -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Appointment):
+            continue
+        state = inspect(obj)
+        status = state.attrs.status.history
+        patient_id = state.attrs.patient_id.history
+        if not status.has_changes() and not patient_id.has_changes():
+            continue
+        old_status = status.deleted[0] if status.deleted else obj.status
+        old_patient_id = patient_id.deleted[0] if patient_id.deleted else obj.patient_id
+        count(old_patient_id, old_status, -1)
+        count(patient_of(obj), obj.status, 1)
+
+    table = Patient.__table__
+    for target, changes in deltas.items():
+        changes = {column: delta for column, delta in changes.items() if delta}
+        if not changes:
+            continue
+        if isinstance(target, Patient):
+            # Patient not flushed yet: count on the object itself
+            for column, delta in changes.items():
+                setattr(target, column, (getattr(target, column) or 0) + delta)
+            continue
+        session.execute(
+            table.update().where(table.c.id == target).values(
+                {column: table.c[column] + delta for column, delta in changes.items()})
+        )
+        patient = session.identity_map.get(inspect(Patient).identity_key_from_primary_key((target,)))
+        if patient is not None:
+            session.expire(patient, list(changes))
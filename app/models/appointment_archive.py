@@ -0,0 +1,55 @@
+"""
+Archived appointment model for Rafad Clinic System
+"""
+from datetime import datetime
+from . import db
+from .appointment import Appointment
+
+
+class ArchivedAppointment(db.Model):
+    """
+    Completed, cancelled and no-show appointments moved out of the hot table
+    
+    Rows keep their original IDs and columns so pages showing appointments
+    can render either kind. They are read-only history; see
+    app.utils.appointment_archive for the archiving job and read helpers.
+    """
+    __tablename__ = 'appointments_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
+    doctor_id = db.Column(db.Integer, db.ForeignKey('doctors.id'), nullable=False)
+    appointment_date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    status = db.Column(db.String(20))
+    reason = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    patient = db.relationship('Patient', viewonly=True)
+    doctor = db.relationship('Doctor', viewonly=True)
+    
+    __table_args__ = (
+        db.Index('ix_appointments_archive_patient_date', 'patient_id', 'appointment_date', 'start_time'),
+        db.Index('ix_appointments_archive_doctor_date', 'doctor_id', 'appointment_date'),
+        db.Index('ix_appointments_archive_date', 'appointment_date'),
+    )
+    
+    # Columns copied from the hot table, in INSERT ... SELECT order
+    COPIED_COLUMNS = ('id', 'patient_id', 'doctor_id', 'appointment_date', 'start_time', 'end_time',
+                      'status', 'reason', 'notes', 'created_at', 'updated_at')
+    
+    # Display helpers shared with live appointments
+    appointment_time = Appointment.appointment_time
+    is_past = Appointment.is_past
+    formatted_date = Appointment.formatted_date
+    formatted_time = Appointment.formatted_time
+    
+    is_archived = True
+    can_be_cancelled = False
+    
+    def __repr__(self):
+        return f'<ArchivedAppointment {self.id} on {self.formatted_date} at {self.formatted_time}>'
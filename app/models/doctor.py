@@ -104,4 +104,9 @@ class Doctor(db.Model):
         return True, None
     
     def __repr__(self):
-        return f'<Doctor {self.full_name} - {self.specialization}>'
\ No newline at end of file
+        return f'<Doctor {self.full_name} - {self.specialization}>'
+
+
+# Cached template fragments built from these rows go stale on writes
+from app.utils.fragment_cache import register_invalidation  # noqa: E402
+register_invalidation(Doctor, 'doctors')
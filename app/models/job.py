@@ -0,0 +1,81 @@
+"""
+Background job model for Rafad Clinic System
+"""
+import json
+from datetime import datetime
+from . import db
+
+
+class Job(db.Model):
+    """
+    A queued unit of background work (export, import, archive, ...)
+
+    Jobs are enqueued by web requests and claimed by `flask worker`
+    processes; see app.utils.jobs for the runner and the job kinds.
+    """
+    __tablename__ = 'jobs'
+
+    STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, default='{}')  # JSON
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    message = db.Column(db.String(255))
+    result = db.Column(db.Text)  # JSON summary returned by the job
+    result_file = db.Column(db.String(255))  # name inside JOB_FOLDER
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    worker = db.Column(db.String(100))
+    heartbeat_at = db.Column(db.DateTime)
+    created_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    created_by = db.relationship('User')
+
+    __table_args__ = (
+        # Workers look for the oldest queued job that is due
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    @property
+    def parameters(self):
+        """The job parameters as a dict"""
+        return json.loads(self.params or '{}')
+
+    @property
+    def summary(self):
+        """The result the job returned, or None"""
+        return json.loads(self.result) if self.result else None
+
+    @property
+    def is_finished(self):
+        """Whether the job succeeded or failed for good"""
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self):
+        """Convert the job to a dictionary for API responses"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.parameters,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.summary,
+            'has_file': bool(self.result_file),
+            'error': self.error,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
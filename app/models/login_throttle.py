@@ -0,0 +1,27 @@
+"""
+Login throttle model for Rafad Clinic System
+"""
+from datetime import datetime
+from . import db
+
+
+class LoginThrottle(db.Model):
+    """
+    Failed login counters for one client IP or one email address
+
+    Shared by every worker process; see app.utils.login_throttle for the
+    sliding-window rules.
+    """
+    __tablename__ = 'login_throttle'
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(160), unique=True, nullable=False)  # "ip:<address>" or "email:<address>"
+    window_start = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    count = db.Column(db.Integer, nullable=False, default=0)  # failures in the current window
+    previous_count = db.Column(db.Integer, nullable=False, default=0)  # failures in the window before
+    blocked_until = db.Column(db.DateTime)
+    rejected = db.Column(db.Integer, nullable=False, default=0)  # attempts turned away
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<LoginThrottle {self.key} {self.count}>'
@@ -19,6 +19,21 @@ class Patient(db.Model):
     address = db.Column(db.String(256))
     medical_history = db.Column(db.Text)
     
+    # Appointment totals, maintained on write by the listeners in appointment.py
+    upcoming_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cancelled_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    no_show_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Which counter each appointment status feeds (other statuses are not counted)
+    STATUS_COUNTERS = {
+        'scheduled': 'upcoming_count',
+        'confirmed': 'upcoming_count',
+        'completed': 'completed_count',
+        'cancelled': 'cancelled_count',
+        'no_show': 'no_show_count',
+    }
+    
     # Relationships
     appointments = db.relationship('Appointment', backref='patient', lazy='dynamic',
                                   cascade='all, delete-orphan')
@@ -37,5 +52,47 @@ class Patient(db.Model):
                 (today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day))
         return None
     
+    @property
+    def total_visits(self):
+        """Return the number of counted appointments in any status"""
+        return self.upcoming_count + self.completed_count + self.cancelled_count + self.no_show_count
+    
+    @classmethod
+    def recalculate_appointment_counters(cls, patient_ids=None):
+        """
+        Recompute the appointment counters from the appointments table
+        
+        Use after bulk SQL that bypasses the ORM listeners.
+        
+        Args:
+            patient_ids (list): Limit to these patients (all patients by default)
+            
+        Returns:
+            int: Number of patients updated
+        """
+        from sqlalchemy import func, select
+        from app.models.appointment import Appointment
+        from app.models.appointment_archive import ArchivedAppointment
+        
+        values = {}
+        for column in set(cls.STATUS_COUNTERS.values()):
+            statuses = [s for s, c in cls.STATUS_COUNTERS.items() if c == column]
+            # Counters cover the whole history, archived appointments included
+            counts = [
+                select(func.count(model.id)).where(
+                    model.patient_id == cls.id,
+                    model.status.in_(statuses)
+                ).scalar_subquery()
+                for model in (Appointment, ArchivedAppointment)
+            ]
+            values[column] = counts[0] + counts[1]
+        
+        query = cls.query
+        if patient_ids is not None:
+            query = query.filter(cls.id.in_(patient_ids))
+        updated = query.update(values, synchronize_session=False)
+        db.session.commit()
+        return updated
+    
     def __repr__(self):
         return f'<Patient {self.full_name}>'
\ No newline at end of file
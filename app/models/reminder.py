@@ -0,0 +1,42 @@
+"""
+Reminder outbox model for Rafad Clinic System
+"""
+from datetime import datetime
+from . import db
+
+
+class Reminder(db.Model):
+    """
+    An appointment reminder waiting in (or sent from) the outbox
+
+    dedup_key identifies the reminder for one appointment slot, channel and
+    lead time, so generating reminders again never creates a second copy.
+    See app.utils.reminders for generation and delivery.
+    """
+    __tablename__ = 'reminder_outbox'
+
+    STATUSES = ('pending', 'sending', 'sent', 'failed', 'cancelled')
+
+    id = db.Column(db.Integer, primary_key=True)
+    dedup_key = db.Column(db.String(100), unique=True, nullable=False)
+    appointment_id = db.Column(db.Integer, nullable=False, index=True)
+    patient_id = db.Column(db.Integer, nullable=False)
+    channel = db.Column(db.String(20), nullable=False)  # email, sms
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200))
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255))
+    claim_token = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # Senders pick the oldest pending reminders
+        db.Index('ix_reminder_outbox_status_id', 'status', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<Reminder {self.dedup_key} {self.status}>'
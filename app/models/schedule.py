@@ -1,12 +1,27 @@
 """
 Schedule model for Rafad Clinic System
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from . import db
 
 
+def _weekday(column):
+    """SQL expression for the weekday of a date column (0=Monday, 6=Sunday)"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return db.cast(db.extract('isodow', column), db.Integer) - 1
+    # SQLite: %w counts from Sunday
+    return (db.cast(db.func.strftime('%w', column), db.Integer) + 6) % 7
+
+
 class Schedule(db.Model):
-    """Schedule model for storing doctor's availability"""
+    """
+    Schedule model for storing doctor's availability
+    
+    Rows are effective-dated versions: a change to working hours closes the
+    current row (valid_to) and starts a new one (valid_from), so bookings
+    made under the old hours keep the version they were made against. NULL
+    bounds are open-ended.
+    """
     __tablename__ = 'schedules'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -18,9 +33,16 @@ class Schedule(db.Model):
     appointment_duration = db.Column(db.Integer, default=30)  # in minutes
     break_duration = db.Column(db.Integer, default=0)  # in minutes
     notes = db.Column(db.Text, nullable=True)
+    valid_from = db.Column(db.Date, nullable=True)  # first day this version applies
+    valid_to = db.Column(db.Date, nullable=True)  # last day this version applies (inclusive)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Availability lookups pick a doctor's version for a weekday and date
+        db.Index('ix_schedules_doctor_day_validity', 'doctor_id', 'day_of_week', 'valid_from', 'valid_to'),
+    )
+    
     @property
     def day_name(self):
         """Return name of day of week"""
@@ -40,6 +62,141 @@ class Schedule(db.Model):
         end = self.end_time.strftime("%H:%M")
         return f"{start} - {end}"
     
+    def is_valid_on(self, day):
+        """Check whether this version applies on a date"""
+        return ((self.valid_from is None or self.valid_from <= day) and
+                (self.valid_to is None or self.valid_to >= day))
+    
+    @classmethod
+    def valid_on(cls, day):
+        """
+        Filter criterion for versions that apply on a date
+        
+        Args:
+            day: The date to check
+            
+        Returns:
+            Filter expression usable in Schedule.query.filter()
+        """
+        return db.and_(
+            db.or_(cls.valid_from.is_(None), cls.valid_from <= day),
+            db.or_(cls.valid_to.is_(None), cls.valid_to >= day)
+        )
+    
+    @classmethod
+    def valid_from_date(cls, day):
+        """Filter criterion for versions that apply on a date or later"""
+        return db.or_(cls.valid_to.is_(None), cls.valid_to >= day)
+    
+    @classmethod
+    def valid_between(cls, start, end=None):
+        """Filter criterion for versions that apply on any day from start to end (None = open-ended)"""
+        if end is None:
+            return cls.valid_from_date(start)
+        return db.and_(cls.valid_from_date(start), db.or_(cls.valid_from.is_(None), cls.valid_from <= end))
+    
+    @classmethod
+    def for_date(cls, doctor_id, day):
+        """
+        Get the active schedule version of a doctor on a date
+        
+        Args:
+            doctor_id: The ID of the doctor
+            day: The date to look up
+            
+        Returns:
+            Schedule: The first block of working hours that day, or None
+        """
+        return cls.query.filter(
+            cls.doctor_id == doctor_id,
+            cls.day_of_week == day.weekday(),
+            cls.is_active.is_(True),
+            cls.valid_on(day)
+        ).order_by(cls.start_time).first()
+    
+    def affected_appointments(self, effective_from, day_of_week=None, start_time=None, end_time=None,
+                              is_active=True):
+        """
+        Query the bookings a change to this version would leave outside working hours
+        
+        Only upcoming appointments made within this version's hours, on its
+        weekday and from effective_from to the end of its validity, are
+        considered; those not fitting the new hours are returned. The check
+        runs as a single statement.
+        
+        Args:
+            effective_from: First day the change applies
+            day_of_week: New weekday (defaults to the current one)
+            start_time: New start time (defaults to the current one)
+            end_time: New end time (defaults to the current one)
+            is_active: Whether the new version is active (False affects every booking)
+            
+        Returns:
+            Query: Affected appointments ordered by date and time
+        """
+        from app.models.appointment import Appointment
+        
+        day_of_week = self.day_of_week if day_of_week is None else day_of_week
+        start_time = start_time or self.start_time
+        end_time = end_time or self.end_time
+        
+        query = Appointment.query.filter(
+            Appointment.doctor_id == self.doctor_id,
+            Appointment.status.in_(['scheduled', 'confirmed']),
+            Appointment.appointment_date >= max(effective_from, self.valid_from or effective_from),
+            _weekday(Appointment.appointment_date) == self.day_of_week,
+            Appointment.start_time >= self.start_time,
+            Appointment.end_time <= self.end_time
+        )
+        if self.valid_to is not None:
+            query = query.filter(Appointment.appointment_date <= self.valid_to)
+        
+        # Bookings still inside the new hours on the same day are unaffected
+        if is_active and day_of_week == self.day_of_week:
+            query = query.filter(db.or_(
+                Appointment.start_time < start_time,
+                Appointment.end_time > end_time
+            ))
+        
+        return query.order_by(Appointment.appointment_date, Appointment.start_time)
+    
+    def supersede(self, effective_from, **changes):
+        """
+        Apply changes from a date on, keeping this version for earlier days
+        
+        Versions not yet in effect by then are edited in place; otherwise this
+        version ends the day before and a new version carries the changes.
+        The caller commits.
+        
+        Args:
+            effective_from: First day the changes apply
+            **changes: New column values (day_of_week, start_time, end_time, ...)
+            
+        Returns:
+            Schedule: The version holding the changes
+        """
+        if self.valid_from is not None and self.valid_from >= effective_from:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            return self
+        
+        values = {
+            'doctor_id': self.doctor_id,
+            'day_of_week': self.day_of_week,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'is_active': self.is_active,
+            'appointment_duration': self.appointment_duration,
+            'break_duration': self.break_duration,
+            'notes': self.notes,
+            'valid_to': self.valid_to,
+        }
+        values.update(changes)
+        version = Schedule(valid_from=effective_from, **values)
+        self.valid_to = effective_from - timedelta(days=1)
+        db.session.add(version)
+        return version
+    
     def __repr__(self):
         return f'<Schedule {self.doctor.full_name if self.doctor else "Unknown"}: {self.day_name} {self.time_slot}>'
         
@@ -57,21 +214,21 @@ class Schedule(db.Model):
             list: List of available time slots in 'HH:MM' format
         """
         from app.models.appointment import Appointment
+        from app.utils.schedule_exceptions import get_exception_index
         from datetime import datetime, timedelta
         
         # Convert date string to datetime object if needed
         if isinstance(date, str):
             date = datetime.strptime(date, '%Y-%m-%d').date()
-            
-        # Get the day of week (0 is Monday, 6 is Sunday)
-        day_index = date.weekday()
         
-        # Find the doctor's schedule for this day
-        schedule = cls.query.filter_by(
-            doctor_id=doctor_id,
-            day_of_week=day_index,
-            is_active=True
-        ).first()
+        # Holidays and leave come from the in-memory index, so closed days
+        # return before any query runs
+        closures = get_exception_index().closures(doctor_id, date)
+        if any(closure.full_day for closure in closures):
+            return []
+            
+        # Find the doctor's schedule version for this day
+        schedule = cls.for_date(doctor_id, date)
         
         if not schedule:
             return []
@@ -85,7 +242,10 @@ class Schedule(db.Model):
         break_duration = timedelta(minutes=schedule.break_duration)
         
         while current_time + slot_duration <= end_datetime:
-            all_slots.append(current_time.strftime('%H:%M'))
+            slot_end = (current_time + slot_duration).time()
+            if not any(closure.start_time < slot_end and current_time.time() < closure.end_time
+                       for closure in closures):
+                all_slots.append(current_time.strftime('%H:%M'))
             current_time += slot_duration + break_duration
         
         # Get all appointments for this doctor on this day
@@ -103,4 +263,9 @@ class Schedule(db.Model):
         # Remove booked slots from available slots
         available_slots = [slot for slot in all_slots if slot not in booked_slots]
         
-        return available_slots
\ No newline at end of file
+        return available_slots
+
+
+# Cached template fragments built from these rows go stale on writes
+from app.utils.fragment_cache import register_invalidation  # noqa: E402
+register_invalidation(Schedule, 'schedules')
@@ -0,0 +1,81 @@
+"""
+Schedule exception model for Rafad Clinic System
+"""
+from datetime import datetime
+from . import db
+
+
+class ScheduleException(db.Model):
+    """
+    A closure overriding the weekly schedule for a range of dates
+
+    doctor_id None means clinic-wide (e.g. a public holiday). Without times
+    the closure covers whole days; with start_time/end_time it covers that
+    part of each day in the range (e.g. a training afternoon).
+    """
+    __tablename__ = 'schedule_exceptions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    doctor_id = db.Column(db.Integer, db.ForeignKey('doctors.id'), nullable=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)  # inclusive
+    start_time = db.Column(db.Time, nullable=True)
+    end_time = db.Column(db.Time, nullable=True)
+    kind = db.Column(db.String(20), nullable=False, default='leave')  # holiday, leave, other
+    reason = db.Column(db.String(128))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    doctor = db.relationship('Doctor', backref=db.backref('schedule_exceptions', lazy='dynamic',
+                                                          cascade='all, delete-orphan'))
+
+    __table_args__ = (
+        db.Index('ix_schedule_exceptions_doctor_range', 'doctor_id', 'start_date', 'end_date'),
+        db.Index('ix_schedule_exceptions_end_date', 'end_date'),
+    )
+
+    KINDS = ('holiday', 'leave', 'other')
+
+    @property
+    def is_full_day(self):
+        """Whether the closure covers whole days"""
+        return self.start_time is None or self.end_time is None
+
+    @property
+    def is_clinic_wide(self):
+        """Whether the closure applies to every doctor"""
+        return self.doctor_id is None
+
+    @property
+    def label(self):
+        """Return a short description such as 'Holiday: Eid al-Fitr'"""
+        text = self.kind.capitalize()
+        return f'{text}: {self.reason}' if self.reason else text
+
+    @classmethod
+    def overlapping(cls, doctor_id, start_date, end_date):
+        """
+        Query exceptions affecting a doctor in a date range (database lookup)
+
+        Args:
+            doctor_id: The doctor's ID (clinic-wide exceptions are included)
+            start_date: First day of the range
+            end_date: Last day of the range (inclusive)
+
+        Returns:
+            Query: Matching exceptions ordered by start date
+        """
+        return cls.query.filter(
+            db.or_(cls.doctor_id == doctor_id, cls.doctor_id.is_(None)),
+            cls.start_date <= end_date,
+            cls.end_date >= start_date
+        ).order_by(cls.start_date)
+
+    def __repr__(self):
+        scope = f'doctor {self.doctor_id}' if self.doctor_id else 'clinic'
+        return f'<ScheduleException {scope} {self.start_date} - {self.end_date}>'
+
+
+# Keep the in-memory exception index in step with writes
+from app.utils.schedule_exceptions import register_invalidation  # noqa: E402
+register_invalidation(ScheduleException)
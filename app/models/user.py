@@ -3,11 +3,7 @@ User model for Rafad Clinic System
 """
 from datetime import datetime
 import secrets
-from time import time
-import jwt
-from flask import current_app
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from . import db
 
 
@@ -23,6 +19,7 @@ class User(db.Model, UserMixin):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     last_login = db.Column(db.DateTime)
+    last_seen = db.Column(db.DateTime)  # last request while logged in
     
     # Relationships
     patient = db.relationship('Patient', backref='user', uselist=False, cascade='all, delete-orphan')
@@ -36,11 +33,26 @@ class User(db.Model, UserMixin):
     @password.setter
     def password(self, password):
         """Set password to a hashed password"""
-        self.password_hash = generate_password_hash(password)
+        from app.utils.passwords import hash_password
+        self.password_hash = hash_password(password)
 
     def verify_password(self, password):
-        """Check if password matches the hashed password"""
-        return check_password_hash(self.password_hash, password)
+        """
+        Check if password matches the hashed password
+        
+        A matching hash made with an outdated method is replaced (and
+        committed) with one using the configured method.
+        
+        Raises:
+            VerifierBusy: If too many passwords are being checked at once
+        """
+        from app.utils import passwords
+        if not passwords.verify_password(self.password_hash, password):
+            return False
+        if passwords.needs_rehash(self.password_hash):
+            self.password_hash = passwords.hash_password(password)
+            db.session.commit()
+        return True
     
     def generate_reset_token(self, expires_sec=1800):
         """Generate a token for password reset
@@ -93,9 +105,14 @@ class User(db.Model, UserMixin):
         return self
     
     def update_last_login(self):
-        """Update the last login timestamp"""
-        self.last_login = datetime.utcnow()
-        db.session.commit()
+        """Note the login time; app.utils.activity writes it in its next batch"""
+        from app.utils import activity
+        activity.record_login(self.id)
     
     def __repr__(self):
-        return f'<User {self.username}>'
\ No newline at end of file
+        return f'<User {self.username}>'
+
+
+# Cached template fragments built from these rows go stale on writes
+from app.utils.fragment_cache import register_invalidation  # noqa: E402
+register_invalidation(User, 'users')
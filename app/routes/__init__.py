@@ -38,6 +38,7 @@ def register_blueprints(app: Flask):
     from app.routes.api.appointment import api_bp
     from app.routes.api.validation import validate_bp
     from app.routes.api.schedule import schedule_api_bp
+    from app.routes.api.jobs import jobs_api_bp
     
     # Main routes
     app.register_blueprint(main_bp)
@@ -56,4 +57,5 @@ def register_blueprints(app: Flask):
     # API routes
     app.register_blueprint(api_bp)
     app.register_blueprint(validate_bp)
-    app.register_blueprint(schedule_api_bp)
\ No newline at end of file
+    app.register_blueprint(schedule_api_bp)
+    app.register_blueprint(jobs_api_bp)
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 Admin routes for Rafad Clinic System
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
 from app.decorators import admin_required
 from app.models import db, User, Patient, Doctor, Appointment
@@ -29,8 +29,10 @@ def dashboard():
 @admin_required
 def users():
     """List all users"""
+    from app.utils import activity
     users = User.query.all()
-    return render_template('admin/users.html', users=users)
+    # Include logins this worker has not written to the database yet
+    return render_template('admin/users.html', users=users, activity=activity.pending())
 
 
 @admin_bp.route('/doctors')
@@ -60,6 +62,76 @@ def appointments():
     return render_template('admin/appointments.html', appointments=appointments)
 
 
+@admin_bp.route('/appointments/import', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def import_appointments():
+    """Upload a CSV or JSON Lines file of appointments"""
+    from io import TextIOWrapper
+    from app.utils import appointment_import
+    
+    report = None
+    if request.method == 'POST':
+        request.max_content_length = current_app.config['IMPORT_MAX_CONTENT_LENGTH']
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a file to import.', 'danger')
+            return redirect(url_for('admin.import_appointments'))
+        
+        if request.form.get('background'):
+            job = _enqueue_import(upload, dry_run=bool(request.form.get('dry_run')))
+            flash(f'Import queued as job #{job.id}.', 'success')
+            return redirect(url_for('admin.jobs'))
+        
+        stream = TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        rows = appointment_import.iter_rows(stream, appointment_import.detect_format(upload.filename))
+        try:
+            report = appointment_import.import_appointments(rows, dry_run=bool(request.form.get('dry_run')))
+        except UnicodeDecodeError:
+            flash('The file must be UTF-8 text.', 'danger')
+            return redirect(url_for('admin.import_appointments'))
+    
+    return render_template('admin/import_appointments.html', report=report)
+
+
+def _enqueue_import(upload, dry_run=False):
+    """Save an uploaded import file to the job folder and queue its import"""
+    import os
+    import uuid
+    from app.utils import appointment_import, jobs
+    
+    name = f'upload-{uuid.uuid4().hex}'
+    upload.save(os.path.join(jobs.job_folder(), name))
+    return jobs.enqueue('import_appointments', {
+        'upload': name,
+        'filename': upload.filename,
+        'format': appointment_import.detect_format(upload.filename),
+        'dry_run': dry_run,
+    }, user=current_user)
+
+
+@admin_bp.route('/jobs', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def jobs():
+    """Background jobs: queue one and follow the recent ones"""
+    from app.models import Job
+    from app.utils.jobs import JOB_KINDS, enqueue
+    
+    if request.method == 'POST':
+        kind = request.form.get('kind')
+        if kind not in JOB_KINDS or kind == 'import_appointments':
+            flash('Please choose a job to run.', 'danger')
+        else:
+            params = {key: request.form[key] for key in ('days', 'grace') if request.form.get(key)}
+            job = enqueue(kind, params, user=current_user)
+            flash(f'{JOB_KINDS[kind].label} queued as job #{job.id}.', 'success')
+        return redirect(url_for('admin.jobs'))
+    
+    recent = Job.query.order_by(Job.id.desc()).limit(50).all()
+    return render_template('admin/jobs.html', jobs=recent, kinds=JOB_KINDS)
+
+
 @admin_bp.route('/user/<int:user_id>/toggle-active')
 @login_required
 @admin_required
@@ -12,15 +12,65 @@ from datetime import datetime, date, timedelta
 from sqlalchemy.exc import SQLAlchemyError
 from app.utils.decorators import role_required
 from app.utils.error_handler import ErrorHandler
+from app.utils.serialization import Field, Fieldset, row_serializer, serialize_rows
 
 # Create a blueprint for API routes
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Selectable with ?fields= (dates and times are formatted by the JSON provider)
+APPOINTMENT_FIELDS = Fieldset(Appointment, {
+    'id': Field('id', [Appointment.id]),
+    'patient_id': Field('patient_id', [Appointment.patient_id]),
+    'patient_name': Field('patient.full_name', [Appointment.patient_id],
+                          {'patient': [Patient.first_name, Patient.last_name]}),
+    'doctor_id': Field('doctor_id', [Appointment.doctor_id]),
+    'doctor_name': Field('doctor.full_name', [Appointment.doctor_id],
+                         {'doctor': [Doctor.first_name, Doctor.last_name]}),
+    'appointment_date': Field('appointment_date', [Appointment.appointment_date]),
+    'appointment_time': Field('start_time', [Appointment.start_time]),
+    'end_time': Field('end_time', [Appointment.end_time]),
+    'status': Field('status', [Appointment.status]),
+    'reason': Field('reason', [Appointment.reason]),
+    'formatted_date': Field('formatted_date', [Appointment.appointment_date]),
+    'formatted_time': Field('formatted_time', [Appointment.start_time]),
+    'notes': Field('notes', [Appointment.notes]),
+    'created_at': Field('created_at', [Appointment.created_at]),
+    'updated_at': Field('updated_at', [Appointment.updated_at]),
+})
+
+# The calendar feed's fields when none are requested (the detail endpoint returns all)
+CALENDAR_FIELDS = [
+    'id', 'patient_id', 'patient_name', 'doctor_id', 'doctor_name',
+    'appointment_date', 'appointment_time', 'status', 'reason',
+]
+
+DOCTOR_FIELDS = Fieldset(Doctor, {
+    'id': Field('id', [Doctor.id]),
+    'full_name': Field('full_name', [Doctor.first_name, Doctor.last_name]),
+    'specialization': Field('specialization', [Doctor.specialization]),
+})
+
 
 @api_bp.route('/appointments')
 @login_required
 def get_appointments():
-    """API endpoint to get appointments for the calendar view"""
+    """
+    API endpoint to get appointments for the calendar view
+    
+    Query parameters:
+        start, end: Date range (YYYY-MM-DD, at most 90 days)
+        doctor_id: Only this doctor's appointments (admin and receptionist)
+        fields: Comma-separated fields to return (default: the calendar fields)
+    """
+    try:
+        fields = APPOINTMENT_FIELDS.requested(CALENDAR_FIELDS)
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid fields',
+            'details': str(e)
+        }), 400
+    
     try:
         # Required parameters
         start_date = request.args.get('start')
@@ -98,34 +148,22 @@ def get_appointments():
     else:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    appointments = query.all()
-    
-    # Format appointments for the calendar
-    formatted_appointments = []
-    for appointment in appointments:
-        patient = appointment.patient
-        doctor = appointment.doctor
-        
-        formatted_appointments.append({
-            'id': appointment.id,
-            'patient_id': patient.id,
-            'patient_name': patient.full_name,
-            'doctor_id': doctor.id,
-            'doctor_name': doctor.full_name,
-            'appointment_date': appointment.appointment_date.isoformat(),
-            'appointment_time': appointment.appointment_time.strftime('%H:%M'),
-            'status': appointment.status,
-            'reason': appointment.reason
-        })
-    
-    return jsonify({'appointments': formatted_appointments})
+    # Only the columns and relationships behind the requested fields are loaded
+    query = query.options(*APPOINTMENT_FIELDS.loader_options(fields))
+    return jsonify({'appointments': serialize_rows(query, APPOINTMENT_FIELDS.spec(fields))})
 
 
 @api_bp.route('/appointment/<int:id>')
 @login_required
 def get_appointment(id):
-    """API endpoint to get details of a specific appointment"""
-    appointment = Appointment.query.get_or_404(id)
+    """API endpoint to get details of a specific appointment (``fields`` selects what to return)"""
+    try:
+        fields = APPOINTMENT_FIELDS.requested()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    options = APPOINTMENT_FIELDS.loader_options(fields, Appointment.patient_id, Appointment.doctor_id)
+    appointment = Appointment.query.options(*options).get_or_404(id)
     
     # Check permissions
     if current_user.role == 'patient' and current_user.patient.id != appointment.patient_id:
@@ -133,28 +171,39 @@ def get_appointment(id):
     elif current_user.role == 'doctor' and current_user.doctor.id != appointment.doctor_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Format appointment for response
-    patient = appointment.patient
-    doctor = appointment.doctor
-    
-    formatted_appointment = {
-        'id': appointment.id,
-        'patient_id': patient.id,
-        'patient_name': patient.full_name,
-        'doctor_id': doctor.id,
-        'doctor_name': doctor.full_name,
-        'appointment_date': appointment.appointment_date.isoformat(),
-        'formatted_date': appointment.formatted_date,
-        'appointment_time': appointment.appointment_time.strftime('%H:%M'),
-        'formatted_time': appointment.formatted_time,
-        'status': appointment.status,
-        'reason': appointment.reason,
-        'notes': appointment.notes,
-        'created_at': appointment.created_at.isoformat() if appointment.created_at else None,
-        'updated_at': appointment.updated_at.isoformat() if appointment.updated_at else None
-    }
-    
-    return jsonify({'appointment': formatted_appointment})
+    return jsonify({'appointment': row_serializer(APPOINTMENT_FIELDS.spec(fields))(appointment)})
+
+
+@api_bp.route('/appointments/status', methods=['POST'])
+@login_required
+def bulk_update_status():
+    """
+    API endpoint to change the status of many appointments at once
+    
+    Expects JSON ``{"ids": [...], "status": "completed"}``. Appointments the
+    user may not change, or whose current status does not allow the
+    transition, are returned in ``skipped``.
+    """
+    payload = request.get_json(silent=True) or {}
+    ids = payload.get('ids')
+    status = payload.get('status')
+    
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        return jsonify({'error': 'ids must be a non-empty list of appointment IDs'}), 400
+    if len(ids) > 1000:
+        return jsonify({'error': 'At most 1000 appointments per request'}), 400
+    if not isinstance(status, str) or status not in Appointment.STATUS_TRANSITIONS:
+        return jsonify({'error': f'status must be one of {", ".join(Appointment.STATUS_TRANSITIONS)}'}), 400
+    # Doctors and patients only reach appointments through their profile
+    if current_user.role in ('doctor', 'patient') and getattr(current_user, current_user.role) is None:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    try:
+        updated, skipped = Appointment.bulk_update_status(ids, status, current_user)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'status': status, 'updated': updated, 'skipped': skipped})
 
 
 @api_bp.route('/available-slots')
@@ -182,19 +231,15 @@ def get_available_slots():
 @api_bp.route('/doctors-by-department/<int:department_id>')
 @login_required
 def get_doctors_by_department(department_id):
-    """API endpoint to get doctors filtered by department"""
+    """API endpoint to get doctors filtered by department (``fields`` selects what to return)"""
+    try:
+        fields = DOCTOR_FIELDS.requested()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     doctors = Doctor.query.filter_by(
         department_id=department_id,
         is_active=True
-    ).all()
-    
-    formatted_doctors = [
-        {
-            'id': doctor.id,
-            'full_name': doctor.full_name,
-            'specialization': doctor.specialization
-        }
-        for doctor in doctors
-    ]
-    
-    return jsonify({'doctors': formatted_doctors})
\ No newline at end of file
+    ).options(*DOCTOR_FIELDS.loader_options(fields))
+    
+    return jsonify({'doctors': serialize_rows(doctors, DOCTOR_FIELDS.spec(fields))})
\ No newline at end of file
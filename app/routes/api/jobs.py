@@ -0,0 +1,81 @@
+"""
+API endpoints for background jobs
+"""
+from flask import Blueprint, abort, jsonify, request, send_from_directory, url_for
+from flask_login import current_user, login_required
+from app.decorators import admin_required
+from app.models import Job
+from app.utils.jobs import JOB_KINDS, enqueue, job_folder
+
+# Create a blueprint for job API routes
+jobs_api_bp = Blueprint('jobs_api', __name__, url_prefix='/api')
+
+
+def _job_json(job):
+    data = job.to_dict()
+    data['url'] = url_for('jobs_api.get_job', job_id=job.id)
+    if job.result_file:
+        data['download_url'] = url_for('jobs_api.download_job_result', job_id=job.id)
+    return data
+
+
+@jobs_api_bp.route('/jobs', methods=['POST'])
+@login_required
+@admin_required
+def create_job():
+    """
+    Queue a background job - Admin only
+
+    Expects JSON ``{"kind": "export_appointments", "params": {...}}``.
+    Imports need an uploaded file and are queued from the import page.
+    Responds 202 with the job; poll its ``url`` for progress.
+    """
+    payload = request.get_json(silent=True) or {}
+    kind = payload.get('kind')
+    params = payload.get('params') or {}
+
+    if kind == 'import_appointments':
+        return jsonify({'error': 'Imports are queued by uploading a file on the import page'}), 400
+    if not isinstance(params, dict):
+        return jsonify({'error': 'params must be an object'}), 400
+    try:
+        job = enqueue(kind, params, user=current_user)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'kinds': sorted(JOB_KINDS)}), 400
+
+    response = jsonify({'job': _job_json(job)})
+    response.status_code = 202
+    response.headers['Location'] = url_for('jobs_api.get_job', job_id=job.id)
+    return response
+
+
+@jobs_api_bp.route('/jobs')
+@login_required
+@admin_required
+def list_jobs():
+    """Recent jobs, newest first (``limit`` up to 100, ``status`` to filter) - Admin only"""
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    query = Job.query
+    if request.args.get('status'):
+        query = query.filter(Job.status == request.args['status'])
+    jobs = query.order_by(Job.id.desc()).limit(limit).all()
+    return jsonify({'jobs': [_job_json(job) for job in jobs]})
+
+
+@jobs_api_bp.route('/jobs/<int:job_id>')
+@login_required
+@admin_required
+def get_job(job_id):
+    """Status, progress and result of a job - Admin only"""
+    return jsonify(_job_json(Job.query.get_or_404(job_id)))
+
+
+@jobs_api_bp.route('/jobs/<int:job_id>/download')
+@login_required
+@admin_required
+def download_job_result(job_id):
+    """Download the result file of a job - Admin only"""
+    job = Job.query.get_or_404(job_id)
+    if not job.result_file:
+        abort(404)
+    return send_from_directory(job_folder(), job.result_file, as_attachment=True)
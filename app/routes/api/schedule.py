@@ -1,38 +1,89 @@
 """
 API endpoints for retrieving doctor schedules
 """
+from datetime import date, datetime, timedelta
+
 from flask import Blueprint, jsonify, request
 from flask_login import login_required
+from app.decorators import admin_required
+from app.models import db
 from app.models.schedule import Schedule
 from app.models.doctor import Doctor
+from app.utils.schedule_exceptions import get_exception_index
+from app.utils.serialization import Field, Fieldset, row_serializer
 
 # Create a blueprint for schedule API routes
 schedule_api_bp = Blueprint('schedule_api', __name__, url_prefix='/api')
 
+# Selectable with ?fields=
+SCHEDULE_FIELDS = Fieldset(Schedule, {
+    'id': Field('id', [Schedule.id]),
+    'day_of_week': Field('day_of_week', [Schedule.day_of_week]),
+    'day_name': Field('day_name', [Schedule.day_of_week]),
+    'start_time': Field('start_time', [Schedule.start_time]),
+    'end_time': Field('end_time', [Schedule.end_time]),
+    'appointment_duration': Field('appointment_duration', [Schedule.appointment_duration]),
+    'break_duration': Field('break_duration', [Schedule.break_duration]),
+    'notes': Field('notes', [Schedule.notes]),
+    'valid_from': Field('valid_from', [Schedule.valid_from]),
+    'valid_to': Field('valid_to', [Schedule.valid_to]),
+})
+
+
 @schedule_api_bp.route('/doctor-schedule/<int:doctor_id>')
 @login_required
 def get_doctor_schedule(doctor_id):
-    """API endpoint to get a doctor's schedule for the weekly view"""
+    """
+    API endpoint to get a doctor's schedule for the weekly view
+
+    Query parameters:
+        week: Any date (YYYY-MM-DD) in the week to show closures for (defaults to this week)
+        fields: Comma-separated schedule fields to return (default: all)
+    """
     doctor = Doctor.query.get_or_404(doctor_id)
     
-    schedules = Schedule.query.filter_by(
-        doctor_id=doctor_id,
-        is_active=True
-    ).all()
-    
-    # Format schedules for response
-    formatted_schedules = []
-    for schedule in schedules:
-        formatted_schedules.append({
-            'id': schedule.id,
-            'day_of_week': schedule.day_of_week,
-            'day_name': schedule.day_name,
-            'start_time': schedule.start_time.strftime('%H:%M'),
-            'end_time': schedule.end_time.strftime('%H:%M'),
-            'appointment_duration': schedule.appointment_duration,
-            'break_duration': schedule.break_duration,
-            'notes': schedule.notes
-        })
+    try:
+        fields = SCHEDULE_FIELDS.requested()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        day = datetime.strptime(request.args['week'], '%Y-%m-%d').date() if request.args.get('week') else date.today()
+    except ValueError:
+        return jsonify({'error': 'Invalid week format. Use YYYY-MM-DD'}), 400
+    week_start = day - timedelta(days=day.weekday())
+    
+    week_end = week_start + timedelta(days=6)
+    schedules = Schedule.query.filter(
+        Schedule.doctor_id == doctor_id,
+        Schedule.is_active.is_(True),
+        db.or_(Schedule.valid_from.is_(None), Schedule.valid_from <= week_end),
+        Schedule.valid_from_date(week_start)
+    ).options(*SCHEDULE_FIELDS.loader_options(
+        fields, Schedule.day_of_week, Schedule.valid_from, Schedule.valid_to
+    )).all()
+    
+    # Format schedules for response, keeping the version in effect on each weekday
+    serialize_schedule = row_serializer(SCHEDULE_FIELDS.spec(fields))
+    formatted_schedules = [
+        serialize_schedule(schedule) for schedule in schedules
+        if schedule.is_valid_on(week_start + timedelta(days=schedule.day_of_week))
+    ]
+    
+    # Holidays and leave in the requested week, from the in-memory index
+    index = get_exception_index()
+    exceptions = []
+    for offset in range(7):
+        current = week_start + timedelta(days=offset)
+        for closure in index.closures(doctor_id, current):
+            exceptions.append({
+                'date': current,
+                'day_of_week': offset,
+                'start_time': None if closure.full_day else closure.start_time,
+                'end_time': None if closure.full_day else closure.end_time,
+                'label': closure.label,
+                'clinic_wide': closure.clinic_wide
+            })
     
     return jsonify({
         'doctor': {
@@ -40,5 +91,50 @@ def get_doctor_schedule(doctor_id):
             'name': doctor.full_name,
             'specialization': doctor.specialization
         },
-        'schedules': formatted_schedules
-    })
\ No newline at end of file
+        'schedules': formatted_schedules,
+        'week_start': week_start,
+        'exceptions': exceptions
+    })
+
+
+@schedule_api_bp.route('/schedules/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_schedules():
+    """
+    Create many schedules at once - Admin only
+    
+    Accepts JSON with either ``template`` (days, start, end, duration,
+    break, valid_from) plus ``doctor_ids``, or explicit ``rows``; or a CSV
+    upload in the ``file`` field. ``dry_run`` (JSON field or query
+    parameter) only validates. The batch is all-or-nothing.
+    """
+    from io import TextIOWrapper
+    from app.utils.schedule_builder import build_schedules, expand_template, read_schedule_csv
+    
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    try:
+        if 'file' in request.files:
+            rows = read_schedule_csv(TextIOWrapper(request.files['file'].stream, encoding='utf-8-sig'))
+        else:
+            payload = request.get_json(silent=True) or {}
+            if not isinstance(payload, dict):
+                raise ValueError('Expected a JSON object with rows or template')
+            dry_run = dry_run or bool(payload.get('dry_run'))
+            if 'template' in payload:
+                doctor_ids = payload.get('doctor_ids') or []
+                if not isinstance(payload['template'], dict) or not isinstance(doctor_ids, list):
+                    raise ValueError('template must be an object and doctor_ids a list')
+                rows = expand_template(payload['template'], doctor_ids)
+            else:
+                rows = payload.get('rows') or []
+                if not isinstance(rows, list):
+                    raise ValueError('rows must be a list of objects')
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not rows:
+        return jsonify({'error': 'No schedules given'}), 400
+    
+    report = build_schedules(rows, dry_run=dry_run)
+    return jsonify(report), 400 if report['errors'] else 200
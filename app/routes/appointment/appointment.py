@@ -314,7 +314,11 @@ def edit(id):
 @login_required
 def view(id):
     """View appointment details"""
-    appointment = Appointment.query.get_or_404(id)
+    from app.models.appointment_archive import ArchivedAppointment
+    from app.utils.appointment_archive import get_appointment_or_404, paginate_history
+    
+    # Old appointments may have been archived; they are shown read-only
+    appointment = get_appointment_or_404(id)
     
     # Check permissions
     if current_user.role == 'patient' and current_user.patient.id != appointment.patient_id:
@@ -323,12 +327,11 @@ def view(id):
         abort(403)  # Forbidden
     
     # Get previous appointments for the same patient
-    previous_appointments = Appointment.query.filter_by(
-        patient_id=appointment.patient_id
-    ).order_by(
-        Appointment.appointment_date.desc(), 
-        Appointment.start_time.desc()
-    ).limit(10).all()
+    previous_appointments, _ = paginate_history(
+        Appointment.query.filter_by(patient_id=appointment.patient_id),
+        ArchivedAppointment.query.filter_by(patient_id=appointment.patient_id),
+        10
+    )
     
     return render_template(
         'appointment/view.html',
@@ -388,7 +391,7 @@ def update_status(id):
 @login_required
 def calendar():
     """Display appointments in a calendar view"""
-    doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True).all()
+    doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True)  # run by the template on a cache miss
     
     return render_template('appointment/calendar.html', doctors=doctors)
 
@@ -422,15 +425,8 @@ def available_slots():
             doctor_name = doctor.full_name
             doctor_department = doctor.specialization if doctor.specialization else "No Specialization"
             
-            # Get day of week (0=Monday, 6=Sunday)
-            day_of_week = date_obj.weekday()
-            
-            # Find the doctor's schedule for this day
-            doctor_schedule = Schedule.query.filter_by(
-                doctor_id=doctor_id,
-                day_of_week=day_of_week,
-                is_active=True
-            ).first()
+            # Find the doctor's schedule version for this day
+            doctor_schedule = Schedule.for_date(doctor_id, date_obj)
             
             if doctor_schedule:
                 # Get available slots
@@ -444,7 +440,7 @@ def available_slots():
             current_app.logger.error(f"Error in available_slots: {e}")
     
     today = datetime.now().strftime('%Y-%m-%d')
-    doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True).all()
+    doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True)  # run by the template on a cache miss
     
     return render_template(
         'appointment/available_slots.html',
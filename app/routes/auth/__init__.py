@@ -5,6 +5,9 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_user, logout_user, login_required, current_user
 from app.models import db, User
 from app.forms.auth import LoginForm, RegistrationForm, PasswordResetRequestForm, PasswordResetForm
+from app.utils import login_throttle
+from app.utils.passwords import VerifierBusy
+from app.utils.registration import RegistrationConflict, create_account
 from sqlalchemy.exc import IntegrityError
 
 # Create blueprint
@@ -23,16 +26,28 @@ def login():
         email = form.email.data.strip() if form.email.data else ''
         selected_role = form.role.data
         
+        # Turn away throttled clients before any lookup or hashing
+        retry_after = login_throttle.check(request.remote_addr, email)
+        if retry_after:
+            flash(f'Too many failed login attempts. Please try again in {retry_after} seconds.', 'danger')
+            return render_template('auth/login.html', form=form), 429, {'Retry-After': str(retry_after)}
+        
         user = User.query.filter_by(email=email).first()
         
         # Check if user exists and password is correct
-        if user is not None and user.verify_password(form.password.data):
+        try:
+            password_ok = user is not None and user.verify_password(form.password.data)
+        except VerifierBusy:
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('auth/login.html', form=form), 503
+        if password_ok:
             # Validate that the selected role matches the user's actual role
             if user.role != selected_role:
                 flash(f'Invalid credentials for {selected_role.title()} role. Please select the correct role or check your credentials.', 'danger')
                 return render_template('auth/login.html', form=form)
             
             # Role matches, proceed with login
+            login_throttle.record_success(email)
             login_user(user, form.remember_me.data)
             # Update last login time
             user.update_last_login()
@@ -45,6 +60,7 @@ def login():
                 else:
                     next_page = url_for('patient.dashboard')
             return redirect(next_page)
+        login_throttle.record_failure(request.remote_addr, email)
         flash('Invalid email or password.', 'danger')
     return render_template('auth/login.html', form=form)
 
@@ -66,49 +82,30 @@ def register():
     
     form = RegistrationForm()
     if form.validate_on_submit():
-        try:
-            user = User(
-                username=form.username.data,
-                email=form.email.data,
-                role=form.role.data  # Use the selected role
+        if form.role.data == 'doctor':
+            profile = dict(
+                specialization=form.specialization.data,
+                qualification=form.qualification.data,
+                bio=form.bio.data if form.bio.data else None,
+                experience_years=int(form.experience_years.data) if form.experience_years.data else 0
             )
-            user.password = form.password.data
-            db.session.add(user)
-            db.session.flush()  # Generate user_id for the foreign key relationships
-            
-            # Create the appropriate profile based on role
-            if form.role.data == 'patient':
-                from app.models.patient import Patient
-                patient = Patient(
-                    user_id=user.id,
-                    first_name=form.first_name.data,
-                    last_name=form.last_name.data,
-                    phone=form.phone.data,
-                    date_of_birth=form.date_of_birth.data,
-                    gender=form.gender.data,
-                    address=form.address.data,
-                    medical_history=form.medical_history.data if form.medical_history.data else None
-                )
-                db.session.add(patient)
-            elif form.role.data == 'doctor':
-                from app.models.doctor import Doctor
-                doctor = Doctor(
-                    user_id=user.id,
-                    first_name=form.first_name.data,
-                    last_name=form.last_name.data,
-                    specialization=form.specialization.data,
-                    phone=form.phone.data,
-                    qualification=form.qualification.data,
-                    bio=form.bio.data if form.bio.data else None,
-                    experience_years=int(form.experience_years.data) if form.experience_years.data else 0
-                )
-                db.session.add(doctor)
-            
-            db.session.commit()
+        else:
+            profile = dict(
+                date_of_birth=form.date_of_birth.data,
+                gender=form.gender.data,
+                address=form.address.data,
+                medical_history=form.medical_history.data if form.medical_history.data else None
+            )
+        profile.update(first_name=form.first_name.data, last_name=form.last_name.data, phone=form.phone.data)
+        try:
+            create_account(form.role.data, form.username.data, form.email.data, form.password.data, profile)
             flash(f'You have registered successfully as a {form.role.data.capitalize()}! Please log in.', 'success')
             return redirect(url_for('auth.login'))
+        except RegistrationConflict as e:
+            # Someone took the username or email after the form was checked
+            for field, message in e.errors.items():
+                getattr(form, field).errors.append(message)
         except IntegrityError:
-            db.session.rollback()
             flash('An error occurred during registration. Please try again.', 'danger')
         except Exception as e:
             db.session.rollback()
@@ -152,18 +149,13 @@ def create_admin():
     delattr(form, 'role')
     
     if form.validate_on_submit():
-        user = User(
-            username=form.username.data,
-            email=form.email.data,
-            role='admin'  # Force admin role
-        )
-        user.password = form.password.data
-        db.session.add(user)
-        
         try:
-            db.session.commit()
+            create_account('admin', form.username.data, form.email.data, form.password.data)  # Force admin role
             flash('Administrator account has been created! Please log in.', 'success')
             return redirect(url_for('auth.login'))
+        except RegistrationConflict as e:
+            for field, message in e.errors.items():
+                getattr(form, field).errors.append(message)
         except:
             db.session.rollback()
             flash('An error occurred during admin creation. Please try again.', 'danger')
@@ -1,7 +1,7 @@
 """
 Doctor routes for Rafad Clinic System
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from app.decorators import doctor_required
 from app.models import db, Doctor
@@ -11,44 +11,62 @@ from app.forms.doctor import DoctorProfileForm
 doctor_bp = Blueprint('doctor', __name__)
 
 
+# Days after today shown on the day sheet (and the most a feed may request)
+DAY_SHEET_DAYS = 7
+DAY_SHEET_MAX_DAYS = 31
+
+
 @doctor_bp.route('/dashboard')
 @login_required
 @doctor_required
 def dashboard():
-    """Doctor dashboard route"""
+    """Doctor dashboard route (the day sheet)"""
     doctor = Doctor.query.filter_by(user_id=current_user.id).first()
     if not doctor:
         flash('Doctor profile not found.', 'danger')
         return redirect(url_for('doctor.profile'))
     
-    # Get today's appointments
-    from datetime import date, datetime
-    from sqlalchemy import text
-    from app.models.appointment import Appointment
-    
-    today = date.today()
-    todays_appointments = Appointment.query.filter_by(
-        doctor_id=doctor.id,
-        appointment_date=today,
-        status='scheduled'
-    ).order_by(Appointment.start_time).all()
+    from datetime import datetime
+    from app.utils.day_sheet import load_day_sheet
     
-    # Get upcoming appointments (not today)
-    upcoming_appointments = Appointment.query.filter(
-        Appointment.doctor_id == doctor.id,
-        Appointment.appointment_date > today,
-        Appointment.status == 'scheduled'
-    ).order_by(Appointment.appointment_date, Appointment.start_time).all()
-    
-    # Get all schedules for this doctor
-    from app.models.schedule import Schedule
-    schedules = doctor.schedules.order_by(Schedule.day_of_week, Schedule.start_time).all()
+    # Taken before the query so the first refresh cannot miss a change
+    generated_at = datetime.utcnow()
+    sheet = load_day_sheet(doctor.id, days=DAY_SHEET_DAYS)
     
     return render_template('doctor/dashboard.html',
                           doctor=doctor,
-                          todays_appointments=todays_appointments,
-                          upcoming_appointments=upcoming_appointments,
-                          schedules=schedules)
+                          todays_appointments=sheet['todays_appointments'],
+                          upcoming_appointments=sheet['upcoming_appointments'],
+                          day_sheet_days=DAY_SHEET_DAYS,
+                          today=sheet['today'].isoformat(),
+                          generated_at=generated_at.isoformat())
+
+
+@doctor_bp.route('/day-sheet')
+@login_required
+@doctor_required
+def day_sheet():
+    """
+    Compact JSON feed of the day sheet for incremental refreshes
+    
+    Query parameters: days (after today) and since (generated_at of the
+    previous response; only rows changed after it are sent).
+    """
+    from datetime import datetime
+    from app.utils.day_sheet import load_day_sheet, day_sheet_feed, parse_since
+    
+    doctor = Doctor.query.filter_by(user_id=current_user.id).first_or_404()
+    days = min(max(request.args.get('days', DAY_SHEET_DAYS, type=int), 0), DAY_SHEET_MAX_DAYS)
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError:
+        return jsonify({'error': 'since must be an ISO 8601 datetime'}), 400
+    
+    generated_at = datetime.utcnow()
+    sheet = load_day_sheet(doctor.id, days=days, include_cancelled=since is not None)
+    feed = day_sheet_feed(sheet, since)
+    feed['generated_at'] = generated_at.isoformat()
+    return jsonify(feed)
 
 
 @doctor_bp.route('/profile', methods=['GET', 'POST'])
@@ -1,7 +1,9 @@
 """
 Patient routes for Rafad Clinic System
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from datetime import date
+
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from sqlalchemy import text
 from app.decorators import patient_required
@@ -12,6 +14,49 @@ from app.forms.patient import PatientProfileForm
 patient_bp = Blueprint('patient', __name__)
 
 
+# Rows per section on the dashboard and per "load more" page
+DASHBOARD_PAGE_SIZE = 5
+HISTORY_MAX_PAGE_SIZE = 50
+
+UPCOMING_STATUSES = ('scheduled', 'confirmed')
+PAST_STATUSES = ('completed', 'cancelled', 'no_show')
+
+
+def _appointment_page(patient, kind, limit, cursor=None):
+    """
+    Fetch one page of a patient's upcoming or past appointments, doctor included
+    
+    Args:
+        patient: The Patient whose appointments to list
+        kind (str): 'upcoming' (from today, oldest first) or 'past' (newest first)
+        limit (int): Page size
+        cursor (str): Cursor from the previous page
+        
+    Returns:
+        tuple: (list of appointments, next cursor or None)
+    """
+    from sqlalchemy.orm import joinedload
+    from app.models.appointment import Appointment
+    from app.models.appointment_archive import ArchivedAppointment
+    from app.utils.appointment_archive import paginate_history
+    from app.utils.pagination import paginate_appointments
+    
+    def history_query(model):
+        statuses = UPCOMING_STATUSES if kind == 'upcoming' else PAST_STATUSES
+        return model.query.options(joinedload(model.doctor)).filter(
+            model.patient_id == patient.id,
+            model.status.in_(statuses)
+        )
+    
+    if kind == 'upcoming':
+        # Past-dated bookings not yet swept to a final status must not push
+        # real upcoming visits off the first page
+        query = history_query(Appointment).filter(Appointment.appointment_date >= date.today())
+        return paginate_appointments(query, Appointment, limit, cursor)
+    # Old past appointments may have moved to the archive
+    return paginate_history(history_query(Appointment), history_query(ArchivedAppointment), limit, cursor)
+
+
 @patient_bp.route('/dashboard')
 @login_required
 @patient_required
@@ -22,21 +67,10 @@ def dashboard():
         flash('Patient profile not found.', 'danger')
         return redirect(url_for('patient.profile'))
     
-    # Get upcoming appointments
-    from app.models.appointment import Appointment
-    from sqlalchemy import text
-    upcoming_appointments = Appointment.query.filter_by(
-        patient_id=patient.id,
-        status='scheduled'
-    ).order_by(
-        Appointment.appointment_date, Appointment.start_time
-    ).all()
-    
-    # Get past appointments
-    past_appointments = Appointment.query.filter(
-        Appointment.patient_id == patient.id,
-        Appointment.status.in_(['completed', 'cancelled'])
-    ).order_by(Appointment.appointment_date.desc(), Appointment.start_time).all()
+    # Only the first page of each list; the rest is loaded on demand from
+    # patient.appointment_history, and totals come from the patient counters
+    upcoming_appointments, upcoming_cursor = _appointment_page(patient, 'upcoming', DASHBOARD_PAGE_SIZE)
+    past_appointments, past_cursor = _appointment_page(patient, 'past', DASHBOARD_PAGE_SIZE)
     
     # Medical records will be implemented in the future
     medical_records = []
@@ -44,10 +78,50 @@ def dashboard():
     return render_template('patient/dashboard.html', 
                            patient=patient,
                            upcoming_appointments=upcoming_appointments,
+                           upcoming_cursor=upcoming_cursor,
                            past_appointments=past_appointments,
+                           past_cursor=past_cursor,
                            medical_records=medical_records)
 
 
+@patient_bp.route('/appointments')
+@login_required
+@patient_required
+def appointment_history():
+    """
+    JSON page of the patient's appointments for "load more"
+    
+    Query parameters: kind (upcoming or past), cursor (from the previous
+    page) and limit.
+    """
+    patient = Patient.query.filter_by(user_id=current_user.id).first_or_404()
+    
+    kind = request.args.get('kind', 'upcoming')
+    if kind not in ('upcoming', 'past'):
+        return jsonify({'error': 'kind must be upcoming or past'}), 400
+    limit = min(max(request.args.get('limit', DASHBOARD_PAGE_SIZE, type=int), 1), HISTORY_MAX_PAGE_SIZE)
+    
+    try:
+        appointments, next_cursor = _appointment_page(patient, kind, limit, request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return jsonify({
+        'appointments': [
+            {
+                'id': appointment.id,
+                'date': appointment.appointment_date.strftime('%Y-%m-%d'),
+                'time': appointment.start_time.strftime('%H:%M'),
+                'doctor': appointment.doctor.full_name,
+                'reason': appointment.reason,
+                'status': appointment.status,
+            }
+            for appointment in appointments
+        ],
+        'next_cursor': next_cursor,
+    })
+
+
 @patient_bp.route('/profile', methods=['GET', 'POST'])
 @login_required
 @patient_required
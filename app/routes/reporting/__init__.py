@@ -5,15 +5,43 @@ from flask import Blueprint, render_template, jsonify, request, Response
 from flask_login import login_required, current_user
 from app.decorators import admin_required
 from app.models import db, User, Patient, Doctor, Appointment, Schedule
+from app.utils.appointment_archive import appointment_models
 from sqlalchemy import func
 from datetime import datetime, timedelta
-import csv
-from io import StringIO
 
 # Create blueprint
 reporting_bp = Blueprint('reporting', __name__)
 
 
+def _grouped_counts(build_query, start_date=None):
+    """
+    Sum (key, count) rows over the live table and, when the range reaches
+    past the archive boundary, the archive table
+
+    Args:
+        build_query: Callable taking an appointment model and returning a
+                     query of (key, count) rows
+        start_date (date): First day of the range (None = all time)
+
+    Returns:
+        dict: Count per key, in first-seen order
+    """
+    counts = {}
+    for model in appointment_models(start_date):
+        for key, count in build_query(model):
+            counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def _count_between(start_date, end_date, exclusive_end=False):
+    """Count appointments dated in a range, archived ones included when needed"""
+    total = 0
+    for model in appointment_models(start_date):
+        end_filter = model.appointment_date < end_date if exclusive_end else model.appointment_date <= end_date
+        total += model.query.filter(model.appointment_date >= start_date, end_filter).count()
+    return total
+
+
 @reporting_bp.route('/dashboard')
 @login_required
 @admin_required
@@ -25,10 +53,7 @@ def dashboard():
     end_date = today + timedelta(days=30)
     
     # Total appointments in the 30-day window (past 30 days + next 30 days)
-    total_appointments = Appointment.query.filter(
-        Appointment.appointment_date >= start_date,
-        Appointment.appointment_date <= end_date
-    ).count()
+    total_appointments = _count_between(start_date, end_date)
     
     # New patients - count all patients
     new_patients = Patient.query.count()
@@ -40,10 +65,7 @@ def dashboard():
     # Growth rate (compare current 30-day window to previous 30-day window)
     previous_start = start_date - timedelta(days=30)
     previous_end = start_date
-    previous_appointments = Appointment.query.filter(
-        Appointment.appointment_date >= previous_start,
-        Appointment.appointment_date < previous_end
-    ).count()
+    previous_appointments = _count_between(previous_start, previous_end, exclusive_end=True)
     
     if previous_appointments > 0:
         growth_rate = round(((total_appointments - previous_appointments) / previous_appointments) * 100, 1)
@@ -92,15 +114,15 @@ def api_appointments_daily():
     end_date = today + timedelta(days=30)
     
     # Query to get count of appointments by date
-    results = db.session.query(
-        Appointment.appointment_date,
-        func.count(Appointment.id).label('count')
+    results = sorted(_grouped_counts(lambda model: db.session.query(
+        model.appointment_date,
+        func.count(model.id).label('count')
     ).filter(
-        Appointment.appointment_date >= start_date,
-        Appointment.appointment_date <= end_date
+        model.appointment_date >= start_date,
+        model.appointment_date <= end_date
     ).group_by(
-        Appointment.appointment_date
-    ).all()
+        model.appointment_date
+    ), start_date).items())
     
     # Format the results
     data = {
@@ -115,7 +137,7 @@ def api_appointments_daily():
     
     # Convert query results to chart data
     for date, count in results:
-        data['labels'].append(date.strftime('%Y-%m-%d'))
+        data['labels'].append(date)
         data['datasets'][0]['data'].append(count)
     
     return jsonify(data)
@@ -126,10 +148,10 @@ def api_appointments_daily():
 @admin_required
 def api_appointments_status():
     """Get appointment count by status"""
-    results = db.session.query(
-        Appointment.status,
-        func.count(Appointment.id).label('count')
-    ).group_by(Appointment.status).all()
+    results = _grouped_counts(lambda model: db.session.query(
+        model.status,
+        func.count(model.id).label('count')
+    ).group_by(model.status)).items()
     
     # Format the results
     data = {
@@ -179,22 +201,23 @@ def api_doctor_utilization():
     start_date = end_date - timedelta(days=days)
     
     # Base query for appointments
-    query = db.session.query(
-        Doctor.id,
-        Doctor.specialization,
-        func.count(Appointment.id).label('appointment_count')
-    ).join(
-        Appointment, Appointment.doctor_id == Doctor.id
-    ).filter(
-        Appointment.appointment_date >= start_date,
-        Appointment.appointment_date <= end_date
-    ).group_by(Doctor.id)
-    
-    # Apply doctor filter if specified
-    if doctor_id:
-        query = query.filter(Doctor.id == doctor_id)
+    def build_query(model):
+        query = db.session.query(
+            Doctor.id,
+            func.count(model.id).label('appointment_count')
+        ).join(
+            model, model.doctor_id == Doctor.id
+        ).filter(
+            model.appointment_date >= start_date,
+            model.appointment_date <= end_date
+        ).group_by(Doctor.id)
+        
+        # Apply doctor filter if specified
+        if doctor_id:
+            query = query.filter(Doctor.id == doctor_id)
+        return query
     
-    results = query.all()
+    results = _grouped_counts(build_query, start_date).items()
     
     # Get doctor names from User model
     doctor_info = {}
@@ -217,7 +240,7 @@ def api_doctor_utilization():
     }
     
     # Convert query results to chart data
-    for doctor_id, specialization, count in results:
+    for doctor_id, count in results:
         name = doctor_info.get(doctor_id, {}).get('name', f'Doctor {doctor_id}')
         data['labels'].append(name)
         data['datasets'][0]['data'].append(count)
@@ -230,57 +253,12 @@ def api_doctor_utilization():
 @admin_required
 def export_csv():
     """Export appointments data to CSV"""
-    # Get all appointments with related data
-    appointments = Appointment.query.all()
+    from io import StringIO
+    from app.utils.appointment_export import write_appointments_csv
     
-    # Create CSV in memory
+    # Large exports are better run as a background job (admin.jobs)
     output = StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        'Appointment ID',
-        'Date',
-        'Start Time',
-        'End Time',
-        'Patient Name',
-        'Patient Email',
-        'Doctor Name',
-        'Doctor Specialization',
-        'Status',
-        'Reason',
-        'Notes',
-        'Created At'
-    ])
-    
-    # Write data rows
-    for apt in appointments:
-        # Get patient info
-        patient = Patient.query.get(apt.patient_id)
-        patient_user = User.query.get(patient.user_id) if patient else None
-        patient_name = f"{patient.first_name} {patient.last_name}" if patient else "N/A"
-        patient_email = patient_user.email if patient_user else "N/A"
-        
-        # Get doctor info
-        doctor = Doctor.query.get(apt.doctor_id)
-        doctor_user = User.query.get(doctor.user_id) if doctor else None
-        doctor_name = f"{doctor_user.username}" if doctor_user else "N/A"
-        doctor_spec = doctor.specialization if doctor else "N/A"
-        
-        writer.writerow([
-            apt.id,
-            apt.appointment_date.strftime('%Y-%m-%d') if apt.appointment_date else 'N/A',
-            apt.start_time.strftime('%H:%M') if apt.start_time else 'N/A',
-            apt.end_time.strftime('%H:%M') if apt.end_time else 'N/A',
-            patient_name,
-            patient_email,
-            doctor_name,
-            doctor_spec,
-            apt.status,
-            apt.reason or '',
-            apt.notes or '',
-            apt.created_at.strftime('%Y-%m-%d %H:%M:%S') if apt.created_at else 'N/A'
-        ])
+    write_appointments_csv(output)
     
     # Prepare the response
     output.seek(0)
@@ -300,12 +278,12 @@ def export_csv():
 def api_appointments_by_specialization():
     """Get appointment count grouped by doctor specialization"""
     # Query appointments grouped by doctor specialization
-    results = db.session.query(
+    results = _grouped_counts(lambda model: db.session.query(
         Doctor.specialization,
-        func.count(Appointment.id).label('count')
+        func.count(model.id).label('count')
     ).join(
-        Appointment, Appointment.doctor_id == Doctor.id
-    ).group_by(Doctor.specialization).all()
+        model, model.doctor_id == Doctor.id
+    ).group_by(Doctor.specialization)).items()
     
     # Format the results
     data = {
@@ -3,10 +3,10 @@ Schedule routes for Rafad Clinic System
 """
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
-from app.decorators import doctor_required, admin_required
-from app.models import db, Schedule, Doctor, Appointment
-from app.forms.schedule import ScheduleForm, ScheduleDeleteForm
-from datetime import datetime, time
+from app.decorators import doctor_required, admin_required, staff_required
+from app.models import db, Schedule, ScheduleException, Doctor
+from app.forms.schedule import ScheduleForm, ScheduleDeleteForm, ScheduleExceptionForm
+from datetime import date, datetime, time, timedelta
 
 # Create blueprint
 schedule_bp = Blueprint('schedule', __name__)
@@ -22,9 +22,21 @@ def manage():
         flash('Doctor profile not found.', 'danger')
         return redirect(url_for('doctor.profile'))
     
-    schedules = Schedule.query.filter_by(doctor_id=doctor.id).order_by(Schedule.day_of_week, Schedule.start_time).all()
+    today = date.today()
+    # Versions in effect today fill the week. Left unevaluated: the template
+    # only runs it when its cached grid expired.
+    schedules = Schedule.query.filter(
+        Schedule.doctor_id == doctor.id,
+        Schedule.valid_on(today)
+    ).order_by(Schedule.day_of_week, Schedule.start_time)
+    # Versions starting later are pending changes (not cached)
+    upcoming_changes = Schedule.query.filter(
+        Schedule.doctor_id == doctor.id,
+        Schedule.valid_from > today
+    ).order_by(Schedule.valid_from, Schedule.day_of_week, Schedule.start_time).all()
     
-    return render_template('schedule/weekly_manage.html', schedules=schedules)
+    return render_template('schedule/weekly_manage.html', schedules=schedules,
+                           upcoming_changes=upcoming_changes)
 
 
 @schedule_bp.route('/add', methods=['GET', 'POST'])
@@ -52,7 +64,8 @@ def add():
             day_of_week=form.day_of_week.data
         ).filter(
             (Schedule.start_time <= form.end_time.data) &
-            (Schedule.end_time >= form.start_time.data)
+            (Schedule.end_time >= form.start_time.data) &
+            Schedule.valid_from_date(date.today())
         ).first()
         
         if existing_schedule:
@@ -105,43 +118,53 @@ def edit(schedule_id):
         if hasattr(form, 'break_end') and hasattr(schedule, 'break_end'):
             form.break_end.data = schedule.break_end
     
+    if request.method == 'GET':
+        form.effective_from.data = max(date.today(), schedule.valid_from or date.today())
+    
     if form.validate_on_submit():
-        # Check for overlapping schedules
+        effective_from = form.effective_from.data or date.today()
+        
+        # Check for overlapping schedules while the changes apply: from that day
+        # until this version ends (a pending successor takes over after that)
         overlapping = Schedule.query.filter_by(
             doctor_id=doctor.id,
             day_of_week=form.day_of_week.data
         ).filter(
             (Schedule.start_time <= form.end_time.data) &
             (Schedule.end_time >= form.start_time.data) &
-            (Schedule.id != schedule_id)  # Exclude the current schedule
+            (Schedule.id != schedule_id) &  # Exclude the current schedule
+            Schedule.valid_between(effective_from, schedule.valid_to)
         ).first()
         
         if overlapping:
             flash('This schedule overlaps with another schedule for the same day.', 'danger')
             return render_template('schedule/edit.html', form=form, schedule=schedule)
         
-        # Check for appointments affected by this schedule change
-        affected_appointments = Appointment.query.filter_by(
-            doctor_id=doctor.id,
-            status='booked'
-        ).filter(
-            # Appointments on the scheduled day of week
-            # Will need to check this in the template (can't filter by day of week directly)
+        # Bookings the new hours would no longer cover
+        affected = schedule.affected_appointments(
+            effective_from,
+            day_of_week=form.day_of_week.data,
+            start_time=form.start_time.data,
+            end_time=form.end_time.data,
+            is_active=form.is_available.data
         ).all()
         
-        # For now just warn about potential conflicts
-        if affected_appointments:
-            flash('Warning: Changing this schedule may affect existing appointments.', 'warning')
-        
-        # Update schedule
-        schedule.day_of_week = form.day_of_week.data
-        schedule.start_time = form.start_time.data
-        schedule.end_time = form.end_time.data
-        if hasattr(form, 'is_available'):
-            schedule.is_active = form.is_available.data
-        
+        # Earlier days keep the current hours
+        schedule.supersede(
+            effective_from,
+            day_of_week=form.day_of_week.data,
+            start_time=form.start_time.data,
+            end_time=form.end_time.data,
+            is_active=form.is_available.data
+        )
         db.session.commit()
-        flash('Schedule updated successfully.', 'success')
+        
+        if affected:
+            dates = ', '.join(f'{a.formatted_date} {a.formatted_time}' for a in affected[:5])
+            more = f' and {len(affected) - 5} more' if len(affected) > 5 else ''
+            flash(f'Warning: {len(affected)} existing appointment(s) fall outside the new hours: '
+                  f'{dates}{more}. Please reschedule them.', 'warning')
+        flash(f'Schedule updated from {effective_from.strftime("%d/%m/%Y")}.', 'success')
         return redirect(url_for('schedule.manage'))
     
     return render_template('schedule/edit.html', form=form, schedule=schedule)
@@ -166,18 +189,22 @@ def delete(schedule_id):
     form = ScheduleDeleteForm()
     
     if form.validate_on_submit():
-        # Check for appointments affected by this schedule deletion
-        # Just warn for now about potential conflicts
-        affected_appointments = Appointment.query.filter_by(
-            doctor_id=doctor.id,
-            status='booked'
-        ).all()
+        today = date.today()
+        affected = schedule.affected_appointments(today, is_active=False).count()
         
-        if affected_appointments:
-            flash('Warning: Deleting this schedule may affect existing appointments.', 'warning')
-        
-        db.session.delete(schedule)
+        if schedule.valid_from is not None and schedule.valid_from >= today:
+            # Never in effect, so there is no history to keep
+            db.session.delete(schedule)
+        else:
+            # End the version yesterday; past days keep their hours. A version
+            # that already ended keeps its end date so it is not revived.
+            yesterday = today - timedelta(days=1)
+            schedule.valid_to = min(schedule.valid_to or yesterday, yesterday)
         db.session.commit()
+        
+        if affected:
+            flash(f'Warning: {affected} upcoming appointment(s) were booked in these hours. '
+                  'Please reschedule them.', 'warning')
         flash('Schedule deleted successfully.', 'success')
         return redirect(url_for('schedule.manage'))
     
@@ -195,7 +222,11 @@ def doctor_schedule(doctor_id):
         flash('This doctor is not currently available.', 'warning')
         return redirect(url_for('main.index'))
     
-    schedules = Schedule.query.filter_by(doctor_id=doctor.id, is_available=True).order_by(Schedule.day_of_week, Schedule.start_time).all()
+    schedules = Schedule.query.filter(
+        Schedule.doctor_id == doctor.id,
+        Schedule.is_active.is_(True),
+        Schedule.valid_on(date.today())
+    ).order_by(Schedule.day_of_week, Schedule.start_time).all()
     
     return render_template('schedule/doctor_schedule.html', doctor=doctor, schedules=schedules)
 
@@ -203,13 +234,77 @@ def doctor_schedule(doctor_id):
 @login_required
 def weekly():
     """Weekly schedule view"""
-    return render_template('schedule/weekly_view.html')
+    # Left unevaluated: the template only runs it when its cached options expired
+    doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True)
+    return render_template('schedule/weekly_view.html', doctors=doctors)
 
 @schedule_bp.route('/list')
 @login_required
 @admin_required
 def list():
     """Display a list of schedules - Admin only"""
-    doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True).all()
-    schedules = Schedule.query.all()
-    return render_template('schedule/list.html', doctors=doctors, schedules=schedules)
\ No newline at end of file
+    doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True)  # run by the template on a cache miss
+    schedules = Schedule.query.filter(Schedule.valid_on(date.today())).all()
+    return render_template('schedule/list.html', doctors=doctors, schedules=schedules)
+
+
+@schedule_bp.route('/exceptions', methods=['GET', 'POST'])
+@login_required
+@staff_required
+def exceptions():
+    """List and add holidays, leave and partial closures"""
+    form = ScheduleExceptionForm()
+    
+    if current_user.role == 'admin':
+        doctors = Doctor.query.join(Doctor.user).filter_by(is_active=True).all()
+        form.doctor_id.choices = [(0, 'Whole clinic')] + [(d.id, d.full_name) for d in doctors]
+        query = ScheduleException.query
+    else:
+        doctor = Doctor.query.filter_by(user_id=current_user.id).first()
+        if not doctor:
+            flash('Doctor profile not found.', 'danger')
+            return redirect(url_for('doctor.profile'))
+        form.doctor_id.choices = [(doctor.id, doctor.full_name)]
+        query = ScheduleException.query.filter(
+            (ScheduleException.doctor_id == doctor.id) | ScheduleException.doctor_id.is_(None)
+        )
+    
+    if form.validate_on_submit():
+        exception = ScheduleException(
+            doctor_id=form.doctor_id.data or None,
+            kind=form.kind.data,
+            start_date=form.start_date.data,
+            end_date=form.end_date.data,
+            start_time=form.start_time.data,
+            end_time=form.end_time.data,
+            reason=form.reason.data or None
+        )
+        db.session.add(exception)
+        db.session.commit()
+        flash('Closure added successfully.', 'success')
+        return redirect(url_for('schedule.exceptions'))
+    
+    upcoming = query.filter(
+        ScheduleException.end_date >= datetime.utcnow().date()
+    ).order_by(ScheduleException.start_date).all()
+    
+    return render_template('schedule/exceptions.html', form=form, exceptions=upcoming)
+
+
+@schedule_bp.route('/exceptions/<int:exception_id>/delete', methods=['POST'])
+@login_required
+@staff_required
+def delete_exception(exception_id):
+    """Remove a closure"""
+    exception = ScheduleException.query.get_or_404(exception_id)
+    
+    # Doctors may only remove their own closures; clinic-wide ones are admin-only
+    if not current_user.role == 'admin':
+        doctor = Doctor.query.filter_by(user_id=current_user.id).first()
+        if not doctor or exception.doctor_id != doctor.id:
+            abort(403)
+    
+    db.session.delete(exception)
+    db.session.commit()
+    flash('Closure removed.', 'success')
+    return redirect(url_for('schedule.exceptions'))
@@ -34,7 +34,7 @@ function initializeScheduleCalendar() {
  * @param {number} doctorId - The doctor ID
  */
 function fetchDoctorSchedule(doctorId) {
-    fetch(`/api/doctor-schedule/${doctorId}`)
+    fetch(`/api/doctor-schedule/${doctorId}?fields=id,day_of_week,start_time,end_time,appointment_duration`)
         .then(response => {
             if (!response.ok) {
                 throw new Error('Failed to fetch doctor schedule');
@@ -42,7 +42,7 @@ function fetchDoctorSchedule(doctorId) {
             return response.json();
         })
         .then(data => {
-            renderWeeklySchedule(data.schedules);
+            renderWeeklySchedule(data.schedules, data.exceptions || []);
         })
         .catch(error => {
             console.error('Error fetching schedule:', error);
@@ -53,8 +53,9 @@ function fetchDoctorSchedule(doctorId) {
 /**
  * Render weekly schedule in the calendar
  * @param {Array} schedules - Array of schedule objects
+ * @param {Array} exceptions - Holidays and leave in the shown week
  */
-function renderWeeklySchedule(schedules) {
+function renderWeeklySchedule(schedules, exceptions = []) {
     const weeklyViewElement = document.getElementById('weekly-schedule');
     if (!weeklyViewElement) return;
     
@@ -112,7 +113,26 @@ function renderWeeklySchedule(schedules) {
                 parseInt(s.end_time.split(':')[0]) > hour
             );
             
-            if (schedule) {
+            // Closures cover the whole day or overlap this hour
+            const closure = exceptions.find(e =>
+                e.day_of_week === day && (
+                    e.start_time === null || (
+                        parseInt(e.start_time.split(':')[0]) <= hour &&
+                        e.end_time > `${hour.toString().padStart(2, '0')}:00`
+                    )
+                )
+            );
+            
+            if (closure) {
+                dayCol.classList.add('closed');
+                dayCol.title = closure.label;
+                if (hour === 8 || (closure.start_time && parseInt(closure.start_time.split(':')[0]) === hour)) {
+                    const closureInfo = document.createElement('div');
+                    closureInfo.className = 'closure-info small text-danger';
+                    closureInfo.textContent = closure.label;
+                    dayCol.appendChild(closureInfo);
+                }
+            } else if (schedule) {
                 dayCol.classList.add('scheduled');
                 dayCol.dataset.scheduleId = schedule.id;
                 
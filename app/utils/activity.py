@@ -0,0 +1,148 @@
+"""
+Write-behind tracking of user logins and activity
+
+Logins and requests only note the time in memory. Every
+ACTIVITY_FLUSH_INTERVAL seconds a background thread writes everything noted
+since the last flush to the users table in one batched UPDATE, and whatever
+is left is written when the process exits. A login therefore costs no write
+transaction of its own, and a worker writes at most one small transaction per
+interval however busy it is.
+
+Pages that show activity merge in the times this process has not written
+yet (see pending()), so they are current within one interval for the other
+workers and exact for this one. A crash loses at most one interval of
+timestamps, which are informational only.
+"""
+import atexit
+import os
+import threading
+from datetime import datetime
+
+from flask import current_app
+
+
+class ActivityTracker:
+    """Timestamps waiting to be written, by user ID"""
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.entries = {}  # user_id -> {'last_login': datetime or None, 'last_seen': datetime}
+        self.thread = None
+        self.pid = None
+        self.exit_hook = False
+        self.stopping = threading.Event()
+
+    def record(self, user_id, now, login=False):
+        with self.lock:
+            entry = self.entries.setdefault(user_id, {'last_login': None, 'last_seen': now})
+            entry['last_seen'] = now
+            if login:
+                entry['last_login'] = now
+        self._ensure_thread()
+
+    def pending(self):
+        with self.lock:
+            return {user_id: dict(entry) for user_id, entry in self.entries.items()}
+
+    def flush(self):
+        """
+        Write the noted timestamps in one batched UPDATE
+
+        Returns:
+            int: Users updated
+        """
+        from sqlalchemy import bindparam, func
+        from app.models import db, User
+
+        with self.lock:
+            entries, self.entries = self.entries, {}
+        if not entries:
+            return 0
+
+        users = User.__table__
+        statement = users.update().where(users.c.id == bindparam('user_id')).values(
+            last_seen=bindparam('seen'),
+            last_login=func.coalesce(bindparam('login'), users.c.last_login))
+        try:
+            # Activity times are not shown in cached fragments, so they stay valid
+            db.session.execute(statement, [
+                {'user_id': user_id, 'seen': entry['last_seen'], 'login': entry['last_login']}
+                for user_id, entry in entries.items()
+            ], execution_options={'invalidates_fragments': False})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # Keep the times for the next flush unless newer ones arrived meanwhile
+            with self.lock:
+                for user_id, entry in entries.items():
+                    newer = self.entries.setdefault(user_id, entry)
+                    if newer is not entry and newer['last_login'] is None:
+                        newer['last_login'] = entry['last_login']
+            raise
+        return len(entries)
+
+    def _ensure_thread(self):
+        interval = self.app.config['ACTIVITY_FLUSH_INTERVAL']
+        # Threads do not survive a fork, so a forked worker starts its own
+        if not interval or (self.thread is not None and self.pid == os.getpid()):
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self._run, args=(interval,),
+                                           name='activity-flush', daemon=True)
+            self.thread.start()
+            if not self.exit_hook:
+                atexit.register(self.shutdown)
+                self.exit_hook = True
+
+    def _run(self, interval):
+        while not self.stopping.wait(interval):
+            self._flush_in_context()
+
+    def _flush_in_context(self):
+        from app.models import db
+
+        with self.app.app_context():
+            try:
+                self.flush()
+            except Exception as e:
+                self.app.logger.warning(f'Activity flush failed, will retry: {e}')
+            finally:
+                db.session.remove()
+
+    def shutdown(self):
+        """Stop the flush thread and write what is left"""
+        self.stopping.set()
+        if self.pid == os.getpid():
+            self._flush_in_context()
+
+
+def tracker():
+    """The activity tracker of the current application"""
+    tracker = current_app.extensions.get('activity')
+    if tracker is None:
+        tracker = current_app.extensions.setdefault('activity', ActivityTracker(current_app._get_current_object()))
+    return tracker
+
+
+def record_login(user_id, now=None):
+    """Note a login (which also counts as activity)"""
+    tracker().record(user_id, now or datetime.utcnow(), login=True)
+
+
+def record_seen(user_id, now=None):
+    """Note a request by a logged-in user"""
+    tracker().record(user_id, now or datetime.utcnow())
+
+
+def pending():
+    """Timestamps this process has noted but not written, by user ID"""
+    return tracker().pending()
+
+
+def flush():
+    """Write the noted timestamps now; returns the number of users updated"""
+    return tracker().flush()
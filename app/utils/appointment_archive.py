@@ -0,0 +1,173 @@
+"""
+Archival of historical appointments into appointments_archive
+
+Completed, cancelled and no-show appointments older than
+APPOINTMENT_ARCHIVE_DAYS are moved to the archive table in chunks by
+`flask archive-appointments`, keeping the hot table small. Before moving
+rows the job records the archive boundary (every archived appointment is
+dated before it), so read paths only look in the archive when the range
+they need reaches back past the boundary. Processes re-read the boundary
+every BOUNDARY_CACHE_TTL seconds, so right after the boundary moves other
+workers may briefly not show the newly archived rows.
+"""
+import time as timer
+from datetime import date, datetime, timedelta
+
+from flask import abort, current_app
+
+ARCHIVABLE_STATUSES = ('completed', 'cancelled', 'no_show')
+
+# Setting holding the archive boundary (ISO date)
+BOUNDARY_SETTING = 'appointments_archive_boundary'
+
+# Seconds a process trusts its copy of the boundary
+BOUNDARY_CACHE_TTL = 300
+
+
+def archive_boundary():
+    """
+    Return the date before which appointments may be in the archive
+
+    Returns:
+        date: The boundary, or None when nothing was ever archived
+    """
+    from app.models import Setting
+
+    cached = current_app.extensions.get('appointment_archive')
+    if cached is not None and timer.monotonic() - cached[1] < BOUNDARY_CACHE_TTL:
+        return cached[0]
+
+    value = Setting.get_value(BOUNDARY_SETTING)
+    boundary = date.fromisoformat(value) if value else None
+    current_app.extensions['appointment_archive'] = (boundary, timer.monotonic())
+    return boundary
+
+
+def needs_archive(start_date=None):
+    """Whether a range starting at start_date (None = all time) can include archived rows"""
+    boundary = archive_boundary()
+    return boundary is not None and (start_date is None or start_date < boundary)
+
+
+def appointment_models(start_date=None):
+    """
+    The appointment models to query for a range starting at start_date
+
+    Returns:
+        tuple: (Appointment,) or (Appointment, ArchivedAppointment)
+    """
+    from app.models import Appointment, ArchivedAppointment
+
+    return (Appointment, ArchivedAppointment) if needs_archive(start_date) else (Appointment,)
+
+
+def get_appointment_or_404(appointment_id):
+    """Load a live appointment, falling back to the archive"""
+    from app.models import db, Appointment, ArchivedAppointment
+
+    appointment = db.session.get(Appointment, appointment_id)
+    if appointment is None and archive_boundary() is not None:
+        appointment = db.session.get(ArchivedAppointment, appointment_id)
+    if appointment is None:
+        abort(404)
+    return appointment
+
+
+def _sort_key(appointment):
+    return appointment.appointment_date, appointment.start_time, appointment.id
+
+
+def paginate_history(query, archive_query, limit, cursor=None):
+    """
+    Newest-first keyset page over live and archived appointments
+
+    The archive is only queried when the live page runs out or reaches
+    back past the archive boundary.
+
+    Args:
+        query: Live Appointment query (filters and loader options applied)
+        archive_query: The same query against ArchivedAppointment
+        limit (int): Page size
+        cursor (str): Cursor from the previous page
+
+    Returns:
+        tuple: (list of appointments, next cursor or None)
+    """
+    from app.models import Appointment, ArchivedAppointment
+    from app.utils.pagination import encode_cursor, paginate_appointments
+
+    rows, next_cursor = paginate_appointments(query, Appointment, limit, cursor, descending=True)
+    boundary = archive_boundary()
+    if boundary is None or (next_cursor and rows[-1].appointment_date >= boundary):
+        return rows, next_cursor
+
+    archived, archive_cursor = paginate_appointments(archive_query, ArchivedAppointment, limit, cursor,
+                                                     descending=True)
+    merged = sorted(rows + archived, key=_sort_key, reverse=True)
+    page = merged[:limit]
+    more = len(merged) > limit or next_cursor is not None or archive_cursor is not None
+    return page, encode_cursor(page[-1]) if more and page else None
+
+
+def archive_appointments(before, chunk_size=1000, dry_run=False, progress=None):
+    """
+    Move finished appointments dated before a day into the archive
+
+    Each chunk is copied with INSERT ... SELECT and deleted from the hot
+    table in one transaction. Patient counters are unchanged because they
+    count archived rows too.
+
+    Args:
+        before (date): Archive appointments dated before this day
+        chunk_size (int): Appointments per chunk
+        dry_run (bool): Only count what would move
+        progress: Optional callable receiving the number moved so far after each chunk
+
+    Returns:
+        dict: moved (or eligible on a dry run), boundary and seconds
+    """
+    from app.models import db, Appointment, ArchivedAppointment, Setting
+
+    started = timer.perf_counter()
+    # Archived rows keep their IDs; appointments is AUTOINCREMENT on SQLite
+    # (a sequence elsewhere), so the next booking never gets one of them again
+    eligible = [Appointment.appointment_date < before, Appointment.status.in_(ARCHIVABLE_STATUSES)]
+
+    if dry_run:
+        count = db.session.query(db.func.count(Appointment.id)).filter(*eligible).scalar()
+        return {'moved': count, 'boundary': before, 'seconds': timer.perf_counter() - started}
+
+    # Publish the boundary first so readers look in the archive while rows move
+    current = archive_boundary()
+    if current is None or before > current:
+        Setting.set_value(BOUNDARY_SETTING, before.isoformat(), is_public=False,
+                          description='Appointments before this date may be in appointments_archive')
+        current_app.extensions.pop('appointment_archive', None)
+
+    hot = Appointment.__table__
+    archive = ArchivedAppointment.__table__
+    columns = ArchivedAppointment.COPIED_COLUMNS
+
+    moved = 0
+    while True:
+        ids = [row[0] for row in db.session.query(Appointment.id).filter(*eligible)
+               .order_by(Appointment.id).limit(chunk_size)]
+        if not ids:
+            break
+        source = db.select(*[hot.c[name] for name in columns],
+                           db.literal(datetime.utcnow()).label('archived_at')).where(hot.c.id.in_(ids))
+        db.session.execute(archive.insert().from_select(list(columns) + ['archived_at'], source))
+        db.session.execute(hot.delete().where(hot.c.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+        if progress:
+            progress(moved)
+
+    db.session.expire_all()
+    return {'moved': moved, 'boundary': max(before, current) if current else before,
+            'seconds': timer.perf_counter() - started}
+
+
+def default_archive_date():
+    """The archive horizon from APPOINTMENT_ARCHIVE_DAYS, counted back from today"""
+    return date.today() - timedelta(days=current_app.config['APPOINTMENT_ARCHIVE_DAYS'])
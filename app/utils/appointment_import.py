@@ -0,0 +1,277 @@
+"""
+Bulk import of appointments from CSV or JSON Lines files
+
+Used when migrating clinics from legacy systems. Rows are read one at a
+time, patients and doctors are resolved through lookup dicts built with one
+query each, overlaps are checked per doctor and day in memory, and valid
+rows are written with executemany INSERTs in chunks (one commit per chunk).
+Rows that fail are collected with their line number and reason.
+
+Historical rows are imported as recorded: weekly schedules and holidays
+are not checked, only clashes between appointments of the same doctor.
+"""
+import csv
+import json
+import time as timer
+from datetime import date, datetime, timedelta
+
+# Statuses a legacy row may carry
+VALID_STATUSES = ('scheduled', 'confirmed', 'completed', 'cancelled', 'no_show')
+
+# Appointments in these statuses occupy the doctor's time
+OCCUPYING_STATUSES = ('scheduled', 'confirmed', 'completed')
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Patients per counter recalculation (keeps IN lists under SQLite's limits)
+COUNTER_BATCH_SIZE = 500
+
+# Doctor-days per overlap query (two parameters each, same limits)
+DOCTOR_DAY_BATCH_SIZE = 400
+
+
+def iter_rows(stream, format='csv'):
+    """
+    Yield (line number, row dict) from an open text file without reading it all
+
+    Args:
+        stream: Text file object
+        format (str): 'csv' (header row required) or 'jsonl' (one object per line)
+
+    Raises:
+        ValueError: For an unknown format
+    """
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else {'_invalid': line.strip()}
+    else:
+        raise ValueError(f'Unknown import format: {format}')
+
+
+def detect_format(filename):
+    """Pick the import format from a file name (.jsonl/.ndjson/.json or CSV)"""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def build_lookups():
+    """
+    Build the reference lookup dicts used to resolve rows
+
+    Returns:
+        dict: 'patient' and 'doctor', each mapping str(id) and lowercase
+              email to the profile ID
+    """
+    from app.models import db, Doctor, Patient, User
+
+    lookups = {}
+    for name, model in (('patient', Patient), ('doctor', Doctor)):
+        mapping = {}
+        for profile_id, email in db.session.query(model.id, User.email).join(User, model.user_id == User.id):
+            mapping[str(profile_id)] = profile_id
+            if email:
+                mapping[email.lower()] = profile_id
+        lookups[name] = mapping
+    return lookups
+
+
+def _resolve(row, name, lookups):
+    reference = (row.get(f'{name}_id') or row.get(f'{name}_email') or '')
+    profile_id = lookups[name].get(str(reference).strip().lower())
+    if profile_id is None:
+        raise ValueError(f'Unknown {name}: {reference}' if reference else f'Missing {name}')
+    return profile_id
+
+
+def clean_row(row, lookups):
+    """
+    Convert an import row to appointment column values
+
+    Expected keys: patient_id or patient_email, doctor_id or doctor_email,
+    date (YYYY-MM-DD), start (HH:MM), end (HH:MM) or duration (minutes),
+    and optionally status, reason and notes.
+
+    Raises:
+        ValueError: With the reason the row is rejected
+    """
+    if '_invalid' in row:
+        raise ValueError('Invalid JSON')
+
+    patient_id = _resolve(row, 'patient', lookups)
+    doctor_id = _resolve(row, 'doctor', lookups)
+
+    try:
+        day = date.fromisoformat(str(row.get('date', '')).strip())
+    except ValueError:
+        raise ValueError('Date must be YYYY-MM-DD')
+    try:
+        start_time = datetime.strptime(str(row.get('start', '')).strip(), '%H:%M').time()
+        if row.get('end'):
+            end_time = datetime.strptime(str(row['end']).strip(), '%H:%M').time()
+        else:
+            minutes = int(row.get('duration') or 30)
+            end_time = (datetime.combine(day, start_time) + timedelta(minutes=minutes)).time()
+    except (TypeError, ValueError):
+        raise ValueError('Times must be HH:MM and duration whole minutes')
+    if end_time <= start_time:
+        raise ValueError('End time must be after start time')
+
+    status = str(row.get('status') or 'scheduled').strip().lower()
+    if status not in VALID_STATUSES:
+        raise ValueError(f'Invalid status: {status}')
+
+    return {
+        'patient_id': patient_id,
+        'doctor_id': doctor_id,
+        'appointment_date': day,
+        'start_time': start_time,
+        'end_time': end_time,
+        'status': status,
+        'reason': str(row['reason']) if row.get('reason') else None,
+        'notes': str(row['notes']) if row.get('notes') else None,
+    }
+
+
+class _DoctorDays:
+    """Occupied time ranges per doctor and day, loaded from the database on demand"""
+
+    def __init__(self):
+        self.ranges = {}
+
+    def load(self, keys):
+        """Fetch existing appointments for doctor-days not seen yet, in one query"""
+        from app.models import db, Appointment
+
+        missing = sorted(key for key in keys if key not in self.ranges)
+        for key in missing:
+            self.ranges[key] = []
+        # Exact doctor-day pairs: an unsorted file spreads a chunk over years
+        for offset in range(0, len(missing), DOCTOR_DAY_BATCH_SIZE):
+            existing = db.session.query(
+                Appointment.doctor_id, Appointment.appointment_date, Appointment.start_time, Appointment.end_time
+            ).filter(
+                db.tuple_(Appointment.doctor_id, Appointment.appointment_date).in_(
+                    missing[offset:offset + DOCTOR_DAY_BATCH_SIZE]),
+                Appointment.status.in_(OCCUPYING_STATUSES)
+            )
+            for doctor_id, day, start_time, end_time in existing:
+                self.ranges[(doctor_id, day)].append((start_time, end_time))
+
+    def claim(self, values):
+        """Record an appointment, returning the start of a clashing one if any"""
+        if values['status'] not in OCCUPYING_STATUSES:
+            return None
+        ranges = self.ranges[(values['doctor_id'], values['appointment_date'])]
+        for start_time, end_time in ranges:
+            if start_time < values['end_time'] and values['start_time'] < end_time:
+                return start_time
+        ranges.append((values['start_time'], values['end_time']))
+        return None
+
+
+def import_appointments(rows, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, progress=None):
+    """
+    Validate and insert appointments in chunks
+
+    Bulk INSERTs bypass the ORM listeners, so the patient counters of the
+    imported patients are recalculated at the end.
+
+    Args:
+        rows: Iterable of (line number, row dict), e.g. from iter_rows
+        chunk_size (int): Rows per executemany INSERT and commit
+        dry_run (bool): Validate only
+        progress: Optional callable receiving the report so far after each chunk
+
+    Returns:
+        dict: total, inserted, rejected (list of line, error, row), seconds
+              and rows_per_second
+    """
+    from app.models import db, Appointment, Patient
+
+    started = timer.perf_counter()
+    lookups = build_lookups()
+    doctor_days = _DoctorDays()
+    table = Appointment.__table__
+    now = datetime.utcnow()
+
+    report = {'total': 0, 'inserted': 0, 'rejected': [], 'dry_run': dry_run}
+    patient_ids = set()
+
+    def flush(chunk):
+        valid = []
+        cleaned = []
+        for number, row in chunk:
+            try:
+                cleaned.append((number, row, clean_row(row, lookups)))
+            except ValueError as e:
+                report['rejected'].append({'line': number, 'error': str(e), 'row': row})
+
+        doctor_days.load({(v['doctor_id'], v['appointment_date']) for _, _, v in cleaned})
+        for number, row, values in cleaned:
+            clash = doctor_days.claim(values)
+            if clash is not None:
+                report['rejected'].append({'line': number, 'row': row,
+                                           'error': f"Conflicts with appointment at {clash.strftime('%H:%M')}"})
+                continue
+            values['created_at'] = values['updated_at'] = now
+            valid.append(values)
+
+        if valid and not dry_run:
+            db.session.execute(table.insert(), valid)
+            db.session.commit()
+        report['inserted'] += len(valid)
+        patient_ids.update(v['patient_id'] for v in valid)
+        if progress:
+            progress(report)
+
+    chunk = []
+    for item in rows:
+        report['total'] += 1
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    if patient_ids and not dry_run:
+        ordered = sorted(patient_ids)
+        for i in range(0, len(ordered), COUNTER_BATCH_SIZE):
+            Patient.recalculate_appointment_counters(ordered[i:i + COUNTER_BATCH_SIZE])
+
+    if dry_run:
+        report['valid'] = report.pop('inserted')
+        report['inserted'] = 0
+
+    report['rejected'].sort(key=lambda item: item['line'])
+    report['seconds'] = timer.perf_counter() - started
+    report['rows_per_second'] = report['total'] / report['seconds'] if report['seconds'] else 0.0
+    return report
+
+
+def write_rejects(rejected, stream):
+    """
+    Write rejected rows as CSV (line, error and the original columns)
+
+    Args:
+        rejected (list): report['rejected'] from import_appointments
+        stream: Text file object to write to
+    """
+    columns = []
+    for item in rejected:
+        for key in item['row']:
+            if key not in columns and key != '_invalid':
+                columns.append(key)
+    writer = csv.writer(stream)
+    writer.writerow(['line', 'error'] + columns)
+    for item in rejected:
+        writer.writerow([item['line'], item['error']] + [item['row'].get(key, '') for key in columns])
@@ -23,8 +23,10 @@ def is_valid_appointment_time(doctor_schedule, appointment_time):
         return False
     
     # If schedule has a break, check if time falls within break time
-    if (doctor_schedule.break_start and doctor_schedule.break_end and
-            doctor_schedule.break_start <= appointment_time < doctor_schedule.break_end):
+    # (Schedule has no break_start/break_end columns yet, so guard the lookup)
+    break_start = getattr(doctor_schedule, 'break_start', None)
+    break_end = getattr(doctor_schedule, 'break_end', None)
+    if break_start and break_end and break_start <= appointment_time < break_end:
         return False
     
     return True
@@ -82,19 +84,15 @@ def check_appointment_conflicts(doctor_id, date, time, duration_minutes, exclude
     if exclude_appointment_id:
         query = query.filter(Appointment.id != exclude_appointment_id)
     
+    # Appointment lengths come from the doctor's schedule version that day
+    from app.models.schedule import Schedule
+    doctor_schedule = Schedule.for_date(doctor_id, date)
+    
     # Check for time conflicts
     conflicts = []
     for appt in query.all():
         appt_start = appt.appointment_time
         
-        # Calculate appointment end time based on doctor's schedule
-        from app.models.schedule import Schedule
-        doctor_schedule = Schedule.query.filter_by(
-            doctor_id=doctor_id,
-            day_of_week=date.weekday(),
-            is_active=True
-        ).first()
-        
         appt_duration = doctor_schedule.appointment_duration if doctor_schedule else 30
         appt_end_datetime = datetime.combine(date, appt_start) + timedelta(minutes=appt_duration)
         appt_end = appt_end_datetime.time()
@@ -131,15 +129,8 @@ def validate_appointment_request(doctor_id, date, time, duration_minutes=None, e
     if date < datetime.now().date():
         return False, "Cannot book appointments in the past"
     
-    # Get the day of week (0=Monday, 6=Sunday)
-    day_of_week = date.weekday()
-    
     # Check if doctor has a schedule for this day
-    doctor_schedule = Schedule.query.filter_by(
-        doctor_id=doctor_id,
-        day_of_week=day_of_week,
-        is_active=True
-    ).first()
+    doctor_schedule = Schedule.for_date(doctor_id, date)
     
     if not doctor_schedule:
         return False, "Doctor is not available on this day"
@@ -0,0 +1,270 @@
+"""
+Static asset pipeline
+
+`flask build-assets` concatenates and minifies the stylesheets and scripts
+listed in BUNDLES, copies the remaining static files, and writes everything
+under static/dist/ with a content hash in the file name
+(css/app.3f9c1b2e4d.css). A gzip sibling (.gz) is written next to each text
+file, and a brotli sibling (.br) when the optional ``brotli`` package is
+installed. dist/manifest.json maps each logical name ("app.css",
+"img/logo.svg") to its built file.
+
+Templates link assets through asset_url() and asset_urls(). With
+ASSET_BUNDLES on and a manifest present they resolve to the fingerprinted
+files. Otherwise they fall back to the source files, so a checkout works
+without a build and edits show up at once in development.
+
+Files under /static/dist/ never change under the same name. They are served
+with an immutable one-year Cache-Control, and the precompressed sibling is
+used when the browser accepts its encoding.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import current_app, request, send_from_directory, url_for
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Bundle name -> source files, in the order base.html used to link them
+BUNDLES = {
+    'app.css': [
+        'css/main.css',
+        'css/schedule.css',
+        'css/forms.css',
+        'css/navigation.css',
+        'css/dashboard.css',
+        'css/auth-buttons-fix.css',
+    ],
+    'app.js': [
+        'js/main.js',
+        'js/schedule.js',
+        'js/auth-buttons-fix.js',
+    ],
+}
+
+# Static folders that are not part of the build (user content, the output)
+SKIP_DIRS = ('uploads', DIST_DIR)
+
+HASH_LENGTH = 10
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Preferred first: (Accept-Encoding token, sibling suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+
+
+def minify_css(source):
+    """
+    Strip comments and redundant whitespace from a stylesheet
+
+    Quoted strings (content values, data URIs) are kept as written.
+    Whitespace before a colon is left alone, since "a :hover" and
+    "a:hover" are different selectors.
+    """
+    parts = []
+    pending = []  # text since the last string, comments dropped
+    position = 0
+    for match in _CSS_TOKENS.finditer(source):
+        pending.append(source[position:match.start()])
+        if match.group(1):
+            parts.extend([_squeeze_css(''.join(pending)), match.group(1)])
+            pending = []
+        position = match.end()
+    pending.append(source[position:])
+    parts.append(_squeeze_css(''.join(pending)))
+    return ''.join(parts).strip() + '\n'
+
+
+def _squeeze_css(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    return re.sub(r':\s+', ':', text).replace(';}', '}')
+
+
+def minify_js(source):
+    """
+    Drop indentation, blank lines and whole-line comments from a script
+
+    Deliberately conservative: nothing inside a line is rewritten, so
+    strings, regular expressions and automatic semicolon insertion behave
+    exactly as in the source.
+    """
+    lines = []
+    in_comment = False
+    for line in source.splitlines():
+        line = line.strip()
+        if in_comment:
+            in_comment = '*/' not in line
+            continue
+        if line.startswith('/*'):
+            in_comment = '*/' not in line
+            continue
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+def fingerprint(name, content):
+    """Return name with a hash of content before its extension (css/app.css -> css/app.<hash>.css)"""
+    stem, extension = os.path.splitext(name)
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{extension}'
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def _write_variants(path, content, brotli):
+    """Write a file and, for text types, its precompressed siblings"""
+    _write(path, content)
+    if not path.endswith(COMPRESSIBLE):
+        return
+    # mtime=0 keeps the .gz identical between builds of the same content
+    _write(path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write(path + '.br', brotli.compress(content, quality=11))
+
+
+def build_assets(static_folder, clean=True):
+    """
+    Build bundles and fingerprinted copies of static files into static/dist/
+
+    Args:
+        static_folder (str): The application's static folder
+        clean (bool): Remove the previous build first
+
+    Returns:
+        dict: The manifest (logical name -> path relative to static_folder)
+    """
+    output = os.path.join(static_folder, DIST_DIR)
+    if clean and os.path.isdir(output):
+        shutil.rmtree(output)
+    brotli = _brotli()
+    manifest = {}
+
+    def emit(name, content, path=None):
+        built = fingerprint(path or name, content)
+        _write_variants(os.path.join(output, built), content, brotli)
+        manifest[name] = f'{DIST_DIR}/{built}'
+
+    bundled = set()
+    for bundle, sources in BUNDLES.items():
+        extension = os.path.splitext(bundle)[1]
+        minify = MINIFIERS.get(extension, lambda text: text)
+        chunks = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                chunks.append(minify(f.read()))
+            bundled.add(source)
+        # app.css is built as css/app.<hash>.css
+        emit(bundle, ''.join(chunks).encode('utf-8'), path=f'{extension[1:]}/{bundle}')
+
+    for root, dirs, files in os.walk(static_folder):
+        relative = os.path.relpath(root, static_folder)
+        if relative == '.':
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for filename in sorted(files):
+            name = os.path.normpath(os.path.join(relative, filename)).replace(os.sep, '/')
+            if name in bundled or filename.startswith('.'):
+                continue
+            with open(os.path.join(root, filename), 'rb') as f:
+                emit(name, f.read())
+
+    _write(os.path.join(output, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def load_manifest():
+    """
+    Return the built manifest of the current application ({} when off or not built)
+
+    Read once per process; restart the workers after a new build.
+    """
+    manifest = current_app.extensions.get('assets')
+    if manifest is None:
+        manifest = {}
+        path = os.path.join(current_app.static_folder, DIST_DIR, MANIFEST_NAME)
+        if current_app.config['ASSET_BUNDLES'] and os.path.isfile(path):
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        manifest = current_app.extensions.setdefault('assets', manifest)
+    return manifest
+
+
+def asset_url(name):
+    """url_for('static', ...) that resolves a static file to its fingerprinted copy when built"""
+    return url_for('static', filename=load_manifest().get(name, name))
+
+
+def asset_urls(name):
+    """
+    URLs to link for a bundle or a single static file
+
+    A built bundle is one URL. Before a build (or with ASSET_BUNDLES off) a
+    bundle expands to its source files.
+    """
+    manifest = load_manifest()
+    if name in manifest or name not in BUNDLES:
+        return [asset_url(name)]
+    return [asset_url(source) for source in BUNDLES[name]]
+
+
+def serve_static(filename):
+    """
+    The static view: built files are cached for a year and sent precompressed
+
+    Anything outside dist/ is served by Flask as before.
+    """
+    if not filename.startswith(DIST_DIR + '/'):
+        return current_app.send_static_file(filename)
+
+    folder = current_app.static_folder
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(folder, filename + suffix)):
+            response = send_from_directory(folder, filename + suffix, mimetype=mimetype,
+                                           max_age=IMMUTABLE_MAX_AGE)
+            response.content_encoding = encoding
+            break
+    else:
+        response = send_from_directory(folder, filename, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_assets(app):
+    """
+    Register the template helpers and the static view
+
+    Args:
+        app: The Flask application instance
+    """
+    app.jinja_env.globals.update(asset_url=asset_url, asset_urls=asset_urls)
+    if app.has_static_folder:
+        app.view_functions['static'] = serve_static
@@ -0,0 +1,173 @@
+"""
+Response compression
+
+An after_request hook installed by the app factory. It compresses HTML, JSON,
+CSV and other text responses with brotli (when the optional ``brotli``
+package is installed) or gzip, whichever the client's Accept-Encoding prefers.
+Ties go to the order of COMPRESS_ALGORITHMS.
+
+Responses are left alone when they are:
+    - not in COMPRESS_MIMETYPES
+    - already encoded
+    - marked Cache-Control: no-transform
+    - file passthroughs (static files have precompressed siblings, see
+      app/utils/assets.py)
+    - buffered bodies smaller than COMPRESS_MIN_SIZE bytes
+
+Streamed responses are compressed chunk by chunk. Each chunk is flushed, so
+the client still receives data as it is produced.
+
+Compressible responses always get ``Vary: Accept-Encoding``, so shared caches
+keep the encoded and plain variants apart.
+"""
+import zlib
+
+from flask import current_app, request
+from werkzeug.wsgi import ClosingIterator
+
+
+class GzipCompressor:
+    """gzip via zlib, usable in one shot or incrementally"""
+
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        # wbits=31: gzip header and trailer
+        self._stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._stream.compress(data)
+
+    def flush(self):
+        return self._stream.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._stream.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    """brotli via the optional ``brotli`` package"""
+
+    encoding = 'br'
+
+    def __init__(self, level):
+        import brotli
+
+        self._stream = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._stream.process(data)
+
+    def flush(self):
+        return self._stream.flush()
+
+    def finish(self):
+        return self._stream.finish()
+
+
+def _brotli_available():
+    from importlib.util import find_spec
+
+    return find_spec('brotli') is not None
+
+
+# Accept-Encoding token -> (compressor class, level config key)
+COMPRESSORS = {
+    'br': (BrotliCompressor, 'COMPRESS_BR_LEVEL'),
+    'gzip': (GzipCompressor, 'COMPRESS_LEVEL'),
+}
+
+
+def available_algorithms(config):
+    """COMPRESS_ALGORITHMS in preference order, without brotli when it is not installed"""
+    names = [name.strip() for name in config['COMPRESS_ALGORITHMS'] if name.strip() in COMPRESSORS]
+    if 'br' in names and not _brotli_available():
+        names.remove('br')
+    return names
+
+
+def choose_encoding(accept_encodings, algorithms):
+    """
+    Pick the encoding to use for a request
+
+    Args:
+        accept_encodings: The request's parsed Accept-Encoding header
+        algorithms (list): Supported encodings in server preference order
+
+    Returns:
+        str: The encoding with the highest client quality, or None
+    """
+    best, best_quality = None, 0
+    for name in algorithms:
+        quality = accept_encodings[name]
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def make_compressor(encoding, config):
+    """Return a fresh compressor for an encoding at the configured level"""
+    compressor_class, level_key = COMPRESSORS[encoding]
+    return compressor_class(config[level_key])
+
+
+def _compress_stream(chunks, compressor):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compress_response(response):
+    """after_request hook: compress the response body when worthwhile"""
+    config = current_app.config
+    if (not config['COMPRESS_ENABLED']
+            or response.mimetype not in config['COMPRESS_MIMETYPES']
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.cache_control.no_transform):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if request.method == 'HEAD':
+        return response
+    encoding = choose_encoding(request.accept_encodings, available_algorithms(config))
+    if encoding is None:
+        return response
+    compressor = make_compressor(encoding, config)
+
+    if response.is_streamed:
+        # Length unknown up front: always compress, flushing every chunk
+        original = response.response
+        response.response = ClosingIterator(_compress_stream(original, compressor),
+                                            getattr(original, 'close', None))
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(compressor.compress(body) + compressor.finish())
+
+    response.content_encoding = encoding
+    # A strong ETag must differ between encodings of the same resource
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    return response
+
+
+def init_compression(app):
+    """
+    Install the compression hook
+
+    Registered before the blueprints, so it runs after every other
+    after_request function.
+
+    Args:
+        app: The Flask application instance
+    """
+    app.after_request(compress_response)
@@ -0,0 +1,130 @@
+"""
+Doctor day sheet: today's and the coming days' appointments in one query
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import contains_eager, load_only
+
+# Statuses shown on the day sheet; cancelled rows are only sent to clients
+# refreshing incrementally so they can drop them
+TODAY_STATUSES = ('scheduled', 'confirmed', 'completed', 'no_show')
+UPCOMING_STATUSES = ('scheduled', 'confirmed')
+
+# Column order of the rows in the compact JSON feed
+FEED_FIELDS = ('id', 'date', 'start', 'end', 'status', 'patient', 'reason')
+
+
+def load_day_sheet(doctor_id, days=7, today=None, include_cancelled=False):
+    """
+    Load a doctor's appointments for today and the next ``days`` days
+
+    A single query joins the patient and loads only the columns the day
+    sheet shows.
+
+    Args:
+        doctor_id (int): The doctor's ID
+        days (int): Number of days after today to include
+        today (date): Reference day (defaults to today)
+        include_cancelled (bool): Also return cancelled appointments
+
+    Returns:
+        dict: today, end, todays_appointments and upcoming_appointments (lists
+              of Appointment ordered by date and time)
+    """
+    from app.models.appointment import Appointment
+    from app.models.patient import Patient
+
+    today = today or date.today()
+    end = today + timedelta(days=days)
+
+    statuses = set(TODAY_STATUSES)
+    if include_cancelled:
+        statuses.add('cancelled')
+
+    appointments = Appointment.query.join(Appointment.patient).options(
+        load_only(Appointment.id, Appointment.appointment_date, Appointment.start_time,
+                  Appointment.end_time, Appointment.status, Appointment.reason,
+                  Appointment.updated_at),
+        contains_eager(Appointment.patient).load_only(Patient.id, Patient.first_name, Patient.last_name)
+    ).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.appointment_date >= today,
+        Appointment.appointment_date <= end,
+        Appointment.status.in_(statuses)
+    ).order_by(Appointment.appointment_date, Appointment.start_time).all()
+
+    todays, upcoming = [], []
+    for appointment in appointments:
+        if appointment.appointment_date == today:
+            todays.append(appointment)
+        elif appointment.status in UPCOMING_STATUSES or appointment.status == 'cancelled':
+            upcoming.append(appointment)
+
+    return {
+        'today': today,
+        'end': end,
+        'todays_appointments': todays,
+        'upcoming_appointments': upcoming,
+    }
+
+
+def day_sheet_feed(sheet, since=None):
+    """
+    Build the compact JSON feed for a day sheet
+
+    Rows are arrays in FEED_FIELDS order. With ``since`` only rows updated
+    after that time are sent; ``ids`` always lists every appointment on the
+    sheet so clients can drop rows that disappeared.
+
+    Args:
+        sheet (dict): Output of load_day_sheet (with include_cancelled=True)
+        since (datetime): Time of the client's previous refresh
+
+    Returns:
+        dict: Feed payload
+    """
+    appointments = sheet['todays_appointments'] + sheet['upcoming_appointments']
+    visible = [a for a in appointments if a.status != 'cancelled']
+
+    rows = []
+    for appointment in appointments:
+        if since is not None and appointment.updated_at and appointment.updated_at <= since:
+            continue
+        if since is None and appointment.status == 'cancelled':
+            continue
+        rows.append([
+            appointment.id,
+            appointment.appointment_date.isoformat(),
+            appointment.start_time.strftime('%H:%M'),
+            appointment.end_time.strftime('%H:%M'),
+            appointment.status,
+            appointment.patient.full_name,
+            appointment.reason or '',
+        ])
+
+    return {
+        'today': sheet['today'].isoformat(),
+        'end': sheet['end'].isoformat(),
+        'fields': list(FEED_FIELDS),
+        'rows': rows,
+        'ids': [a.id for a in visible],
+        'full': since is None,
+    }
+
+
+def parse_since(value):
+    """
+    Parse the ``since`` query parameter (ISO 8601, as sent back from generated_at)
+
+    Args:
+        value (str): Raw parameter value
+
+    Returns:
+        datetime: Parsed value, or None when empty
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 datetime
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
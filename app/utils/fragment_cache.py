@@ -0,0 +1,216 @@
+"""
+Template fragment caching
+
+Wrap a rarely-changing part of a page in a cache block:
+
+    {% cache 'doctor-options', 600, depends=['doctors', 'users'], vary=selected %}
+        ... expensive markup ...
+    {% endcache %}
+
+The first argument names the fragment and the second is its lifetime in
+seconds (default FRAGMENT_CACHE_TTL). The stored key also holds the
+current user's role, the ``vary`` value and the version stamp of every
+topic in ``depends``. Writing a Doctor, Schedule or User bumps the stamp
+of its topic ('doctors', 'schedules', 'users'), whether the row is saved
+through the ORM or by a bulk INSERT, UPDATE or DELETE run with
+db.session.execute(). Fragments built from the old data then are never
+served again and age out of the backend. A bulk write that changes nothing
+shown in fragments can pass execution_options={'invalidates_fragments': False}.
+
+Stamps live in each process, so a change made by another worker shows up
+once the fragment's lifetime ends. Keep lifetimes short for fragments that
+other workers' writes should refresh quickly. Pass queries into the
+template unevaluated, so a cache hit also skips the query.
+
+FRAGMENT_CACHE_BACKEND picks the storage: "lru" (in-process, the default,
+holding FRAGMENT_CACHE_SIZE fragments), "null" (caching off) or a
+"module:Class" path to a FragmentCacheBackend subclass.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from flask import current_app, has_app_context, has_request_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class FragmentCacheBackend:
+    """Stores rendered fragments; subclasses implement get() and set()"""
+
+    def get(self, key):
+        """Return the stored fragment or None"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store a fragment for ttl seconds"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Drop every fragment"""
+
+
+class NullBackend(FragmentCacheBackend):
+    """Stores nothing (caching off)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+
+class LRUBackend(FragmentCacheBackend):
+    """In-process store that drops the least recently used fragment when full"""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or current_app.config['FRAGMENT_CACHE_SIZE']
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires at, fragment)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+BACKENDS = {
+    'lru': LRUBackend,
+    'null': NullBackend,
+}
+
+
+class FragmentCache:
+    """The backend, topic version stamps and hit counters of one application"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.versions = Counter()
+        self.stats = Counter()
+
+    def bump(self, topics):
+        for topic in topics:
+            self.versions[topic] += 1
+
+    def key(self, name, depends, vary):
+        from flask_login import current_user
+
+        role = current_user.role if current_user.is_authenticated else 'anonymous'
+        stamps = ','.join(f'{topic}{self.versions[topic]}' for topic in depends)
+        return f'{name}|{role}|{stamps}|{vary!r}'
+
+
+def get_fragment_cache():
+    """
+    Return the fragment cache of the current application
+
+    Raises:
+        ImportError: If FRAGMENT_CACHE_BACKEND is a path that cannot be imported
+    """
+    cache = current_app.extensions.get('fragment_cache')
+    if cache is None:
+        from werkzeug.utils import import_string
+
+        name = current_app.config['FRAGMENT_CACHE_BACKEND']
+        backend_class = BACKENDS.get(name) or import_string(name)
+        cache = current_app.extensions.setdefault('fragment_cache', FragmentCache(backend_class()))
+    return cache
+
+
+class FragmentCacheExtension(Extension):
+    """Adds the {% cache name[, ttl][, depends=[...]][, vary=...] %} block"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        kwargs = []
+        while parser.stream.skip_if('comma'):
+            if parser.stream.current.type == 'name' and parser.stream.look().type == 'assign':
+                name = next(parser.stream).value
+                next(parser.stream)
+                kwargs.append(nodes.Keyword(name, parser.parse_expression()))
+            else:
+                args.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', args, kwargs), [], [], body).set_lineno(lineno)
+
+    def _render(self, name, ttl=None, depends=(), vary=None, caller=None):
+        # Outside a request (e.g. the boot warm-up) there is no user to key on
+        if not has_request_context():
+            return caller()
+        cache = get_fragment_cache()
+        key = cache.key(name, depends, vary)
+        fragment = cache.backend.get(key)
+        if fragment is not None:
+            cache.stats['hits'] += 1
+            return Markup(fragment)
+        cache.stats['misses'] += 1
+        fragment = caller()
+        cache.backend.set(key, str(fragment), ttl or current_app.config['FRAGMENT_CACHE_TTL'])
+        return Markup(fragment)
+
+
+def _bump_current(topics):
+    if has_app_context() and topics:
+        get_fragment_cache().bump(topics)
+
+
+# Table name -> topic, for bulk statements that bypass the mapper events
+_TABLE_TOPICS = {}
+
+
+def _changed(session, topic):
+    if session is not None:
+        session.info.setdefault('fragment_topics', set()).add(topic)
+    _bump_current([topic])
+
+
+def register_invalidation(model, topic):
+    """Bump a topic's stamp when a model row changes, and again when the transaction ends"""
+
+    def changed(mapper, connection, target):
+        _changed(Session.object_session(target), topic)
+
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, name, changed)
+    _TABLE_TOPICS[model.__table__.name] = topic
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bulk_write(state):
+    # ORM bulk and Core INSERT/UPDATE/DELETE statements run through session.execute()
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    if not state.execution_options.get('invalidates_fragments', True):
+        return
+    topic = _TABLE_TOPICS.get(getattr(getattr(state.statement, 'table', None), 'name', None))
+    if topic is not None:
+        _changed(state.session, topic)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _transaction_ended(session, transaction):
+    # A page rendered mid-transaction may have cached rows that were then rolled back
+    _bump_current(session.info.pop('fragment_topics', None))
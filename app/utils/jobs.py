@@ -0,0 +1,429 @@
+"""
+Database-backed background jobs
+
+Long admin operations (exports, imports, archiving, counter rebuilds) are
+enqueued as rows of the jobs table and run by `flask worker`, which claims
+due jobs and runs them on a pool of worker processes, so no message broker
+is needed. Failed jobs are retried with exponential backoff up to their
+max_attempts. Jobs report progress as they go and may leave one result file
+in JOB_FOLDER for download. The worker deletes files older than
+JOB_RETENTION_DAYS once an hour.
+"""
+import io
+import json
+import os
+import socket
+import time as timer
+import traceback
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+# Seconds before the first retry; doubled for every later attempt
+RETRY_DELAY = 30
+
+# Seconds without a heartbeat before a running job counts as abandoned
+# (the worker refreshes the heartbeat of its jobs on every poll)
+STALE_AFTER = 300
+
+# Seconds between sweeps of old files in JOB_FOLDER by the worker
+PRUNE_INTERVAL = 3600
+
+
+JobKind = namedtuple('JobKind', 'label handler max_attempts')
+
+
+class JobContext:
+    """Passed to job handlers for progress reporting and result files"""
+
+    def __init__(self, job):
+        self.job = job
+
+    def progress(self, percent, message=None):
+        """Record progress (0-100) and an optional status message; commits the session"""
+        from app.models import db
+
+        self.job.progress = max(0, min(100, int(percent)))
+        if message is not None:
+            self.job.message = message[:255]
+        self.job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+    def result_path(self, filename):
+        """Path to write the job's result file to, recorded for download"""
+        from werkzeug.utils import secure_filename
+
+        self.job.result_file = f'job-{self.job.id}-{secure_filename(filename)}'
+        return os.path.join(job_folder(), self.job.result_file)
+
+
+def job_folder():
+    """The directory for job uploads and result files, created on first use"""
+    path = current_app.config['JOB_FOLDER']
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _export_appointments(context, params):
+    from app.utils.appointment_export import write_appointments_csv
+
+    with open(context.result_path('appointments.csv'), 'w', newline='', encoding='utf-8') as stream:
+        written = write_appointments_csv(stream, progress=context.progress)
+    return {'appointments': written}
+
+
+def _import_appointments(context, params):
+    from app.utils import appointment_import
+
+    path = os.path.join(job_folder(), params['upload'])
+    size = os.path.getsize(path) or 1
+    file_format = params.get('format') or appointment_import.detect_format(params.get('filename') or path)
+
+    # Imports are never retried, so the upload is not needed after this run
+    try:
+        with open(path, 'rb') as raw:
+            stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+            report = appointment_import.import_appointments(
+                appointment_import.iter_rows(stream, file_format),
+                dry_run=bool(params.get('dry_run')),
+                progress=lambda so_far: context.progress(raw.tell() * 100 // size, f"{so_far['total']} rows read")
+            )
+    finally:
+        os.remove(path)
+
+    if report['rejected']:
+        with open(context.result_path('rejected.csv'), 'w', newline='', encoding='utf-8') as stream:
+            appointment_import.write_rejects(report['rejected'], stream)
+    report['rejected'] = len(report['rejected'])
+    return report
+
+
+def _archive_appointments(context, params):
+    from app.utils import appointment_archive
+
+    if params.get('days') is not None:
+        before = datetime.now().date() - timedelta(days=int(params['days']))
+    else:
+        before = appointment_archive.default_archive_date()
+    total = appointment_archive.archive_appointments(before, dry_run=True)['moved'] or 1
+    report = appointment_archive.archive_appointments(
+        before, progress=lambda moved: context.progress(moved * 100 // total, f'{moved} appointments moved')
+    )
+    return {'moved': report['moved'], 'before': before.isoformat()}
+
+
+def _sweep_no_shows(context, params):
+    from app.models import Appointment
+
+    grace = int(params.get('grace') or current_app.config['NO_SHOW_GRACE_MINUTES'])
+    return {'marked': Appointment.sweep_no_shows(grace_minutes=grace)}
+
+
+def _recount_patient_counters(context, params):
+    from app.models import Patient
+
+    return {'patients': Patient.recalculate_appointment_counters()}
+
+
+def _send_reminders(context, params):
+    from app.utils import reminders
+
+    generated = reminders.generate_reminders(lead_hours=params.get('hours'))
+    context.progress(50, f"{generated['created']} reminders queued")
+    delivered = reminders.deliver_reminders()
+    return {'queued': generated['created'], 'sent': delivered['sent'],
+            'failed': delivered['failed'] + delivered['given_up']}
+
+
+# Imports are not retried: a failed run may already have committed some chunks
+JOB_KINDS = {
+    'export_appointments': JobKind('Export appointments (CSV)', _export_appointments, 3),
+    'import_appointments': JobKind('Import appointments', _import_appointments, 1),
+    'archive_appointments': JobKind('Archive old appointments', _archive_appointments, 3),
+    'sweep_no_shows': JobKind('Mark no-shows', _sweep_no_shows, 3),
+    'recount_patient_counters': JobKind('Rebuild patient appointment counters', _recount_patient_counters, 3),
+    'send_reminders': JobKind('Send appointment reminders', _send_reminders, 3),
+}
+
+
+def enqueue(kind, params=None, user=None):
+    """
+    Add a job to the queue
+
+    Args:
+        kind (str): A key of JOB_KINDS
+        params (dict): JSON-serialisable parameters for the handler
+        user: The user requesting the job, if any
+
+    Returns:
+        Job: The queued job
+
+    Raises:
+        ValueError: For an unknown kind
+    """
+    from app.models import db, Job
+
+    if kind not in JOB_KINDS:
+        raise ValueError(f'Unknown job kind: {kind}')
+
+    job = Job(
+        kind=kind,
+        params=json.dumps(params or {}),
+        max_attempts=JOB_KINDS[kind].max_attempts,
+        created_by_id=user.id if user is not None else None
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def claim_job(worker):
+    """
+    Atomically take the oldest due job off the queue
+
+    The conditional UPDATE only succeeds for one of several competing
+    workers; the losers simply look for the next job.
+
+    Args:
+        worker (str): Name recorded on the job
+
+    Returns:
+        int: The claimed job ID, or None when nothing is due
+    """
+    from app.models import db, Job
+
+    while True:
+        now = datetime.utcnow()
+        job_id = db.session.query(Job.id).filter(
+            Job.status == 'queued', Job.run_after <= now
+        ).order_by(Job.run_after, Job.id).limit(1).scalar()
+        if job_id is None:
+            db.session.commit()
+            return None
+
+        claimed = db.session.query(Job).filter(Job.id == job_id, Job.status == 'queued').update({
+            'status': 'running',
+            'worker': worker,
+            'attempts': Job.attempts + 1,
+            'progress': 0,
+            'message': 'Started',
+            'started_at': now,
+            'heartbeat_at': now,
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            return job_id
+
+
+def run_job(job_id):
+    """
+    Run a claimed job in the current application context
+
+    Returns:
+        bool: Whether the job succeeded
+    """
+    from app.models import db, Job
+
+    job = db.session.get(Job, job_id)
+    kind = JOB_KINDS.get(job.kind)
+    try:
+        if kind is None:
+            raise ValueError(f'Unknown job kind: {job.kind}')
+        result = kind.handler(JobContext(job), job.parameters)
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception(f'Job {job_id} ({job.kind}) failed')
+        fail_job(job_id, traceback.format_exc(limit=5))
+        return False
+
+    job.status = 'succeeded'
+    job.progress = 100
+    job.message = 'Done'
+    job.result = json.dumps(result, default=str)
+    job.error = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return True
+
+
+def fail_job(job_id, error):
+    """Record a failed attempt, queueing a retry while attempts remain"""
+    from app.models import db, Job
+
+    job = db.session.get(Job, job_id)
+    now = datetime.utcnow()
+    job.error = error
+    if job.attempts < job.max_attempts:
+        job.status = 'queued'
+        job.run_after = now + timedelta(seconds=RETRY_DELAY * 2 ** max(job.attempts - 1, 0))
+        job.message = f'Attempt {job.attempts} of {job.max_attempts} failed; retrying'
+    else:
+        job.status = 'failed'
+        job.message = 'Failed'
+        job.finished_at = now
+    db.session.commit()
+
+
+def touch_jobs(job_ids):
+    """Refresh the heartbeat of jobs this worker is still running"""
+    from app.models import db, Job
+
+    if job_ids:
+        db.session.query(Job).filter(Job.id.in_(job_ids)).update(
+            {'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+
+
+def requeue_stale(stale_after=STALE_AFTER):
+    """
+    Treat running jobs whose worker stopped sending heartbeats as failed attempts
+
+    Returns:
+        int: Number of jobs affected
+    """
+    from app.models import db, Job
+
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale = [job_id for (job_id,) in db.session.query(Job.id).filter(
+        Job.status == 'running', Job.heartbeat_at < cutoff)]
+    for job_id in stale:
+        fail_job(job_id, 'The worker running this job stopped responding')
+    return len(stale)
+
+
+def prune_job_files(retention_days=None):
+    """
+    Delete files in JOB_FOLDER older than JOB_RETENTION_DAYS
+
+    Uploads of queued or running jobs are kept. Jobs whose result file is
+    deleted keep their row but no longer offer a download.
+
+    Returns:
+        int: Number of files deleted
+    """
+    from app.models import db, Job
+
+    days = retention_days if retention_days is not None else current_app.config['JOB_RETENTION_DAYS']
+    cutoff = timer.time() - days * 86400
+    folder = job_folder()
+    needed = {job.parameters.get('upload') for job in Job.query.filter(Job.status.in_(('queued', 'running')))}
+
+    deleted = []
+    for entry in os.scandir(folder):
+        if entry.is_file() and entry.name not in needed and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            deleted.append(entry.name)
+    for start in range(0, len(deleted), 500):
+        db.session.query(Job).filter(Job.result_file.in_(deleted[start:start + 500])).update(
+            {'result_file': None}, synchronize_session=False)
+    db.session.commit()
+    return len(deleted)
+
+
+# Application used by pool processes, created once per process
+_child_app = None
+
+
+def _init_child(config_name):
+    global _child_app
+    from app import create_app
+
+    _child_app = create_app(config_name)
+
+
+def _run_in_child(job_id):
+    with _child_app.app_context():
+        return run_job(job_id)
+
+
+def _make_pool(config_name, processes):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Spawned (not forked) processes never share the parent's DB connections
+    return ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_child, initargs=(config_name,))
+
+
+def run_worker(config_name, processes=2, poll_interval=2.0, once=False, log=print):
+    """
+    Claim and run jobs until interrupted
+
+    Args:
+        config_name (str): Configuration the pool processes create their app with
+        processes (int): Jobs run at the same time; 0 runs them one by one
+                         in this process (for development: no heartbeats are
+                         sent while a job runs, so use a single worker)
+        poll_interval (float): Seconds between queue polls when idle
+        once (bool): Stop as soon as the queue is empty
+        log: Callable receiving progress lines
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    log(f'Worker {worker} started with {processes or "no"} pool processes')
+    next_prune = 0
+
+    def housekeeping():
+        nonlocal next_prune
+        requeue_stale()
+        if timer.monotonic() >= next_prune:
+            pruned = prune_job_files()
+            if pruned:
+                log(f'Deleted {pruned} old job files')
+            next_prune = timer.monotonic() + PRUNE_INTERVAL
+
+    if not processes:
+        while True:
+            housekeeping()
+            job_id = claim_job(worker)
+            if job_id is None:
+                if once:
+                    return
+                timer.sleep(poll_interval)
+                continue
+            log(f'Job {job_id} {"succeeded" if run_job(job_id) else "failed"}')
+
+    pool = _make_pool(config_name, processes)
+    running = {}
+    try:
+        while True:
+            housekeeping()
+            while len(running) < processes:
+                job_id = claim_job(worker)
+                if job_id is None:
+                    break
+                running[pool.submit(_run_in_child, job_id)] = job_id
+                log(f'Job {job_id} started')
+
+            if not running:
+                if once:
+                    return
+                timer.sleep(poll_interval)
+                continue
+
+            done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            touch_jobs([job_id for future, job_id in running.items() if future not in done])
+
+            broken = False
+            for future in done:
+                job_id = running.pop(future)
+                try:
+                    succeeded = future.result()
+                except Exception as e:
+                    # The pool process died (e.g. killed for memory) before recording anything
+                    fail_job(job_id, f'Worker process failed: {e!r}')
+                    succeeded = False
+                    broken = True
+                log(f'Job {job_id} {"succeeded" if succeeded else "failed"}')
+
+            if broken:
+                # A dead process breaks the whole pool; its other jobs are failed too
+                for future, job_id in running.items():
+                    fail_job(job_id, 'Worker pool restarted')
+                running.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = _make_pool(config_name, processes)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
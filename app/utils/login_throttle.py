@@ -0,0 +1,327 @@
+"""
+Login throttling
+
+Failed logins are counted per client IP and per email address in sliding
+windows of LOGIN_THROTTLE_WINDOW seconds. The estimate weighs the previous
+fixed window by how much of it still overlaps the sliding one, so a burst at
+a window boundary does not get a fresh allowance.
+
+Once a key has used half of its limit every further failure blocks it for a
+doubling delay (1 s, 2 s, 4 s, ...); at the limit it is blocked for a whole
+window. A blocked login is turned away with 429 before the user is looked up
+or any password is hashed, so guessing costs the attacker time but the
+server almost no CPU.
+
+The counters live in the login_throttle table by default, shared by every
+worker. LOGIN_THROTTLE_BACKEND = 'memory' keeps them per process instead
+(single-process development servers). Either way each process remembers the
+blocks it has seen, so repeated attempts from a blocked client are rejected
+without a database read.
+"""
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+KINDS = ('ip', 'email')
+
+
+def _key(kind, value):
+    return f'{kind}:{value.strip().lower()}'[:160]
+
+
+def _keys(ip, email):
+    """Throttle keys for a login attempt by kind"""
+    keys = {}
+    if ip:
+        keys['ip'] = _key('ip', ip)
+    if email:
+        keys['email'] = _key('email', email)
+    return keys
+
+
+def _limit(kind):
+    return current_app.config['LOGIN_THROTTLE_IP_LIMIT' if kind == 'ip' else 'LOGIN_THROTTLE_EMAIL_LIMIT']
+
+
+def _window():
+    return timedelta(seconds=current_app.config['LOGIN_THROTTLE_WINDOW'])
+
+
+class _State:
+    """Per-process blocks and metrics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.blocked = {}  # key -> blocked_until
+        self.metrics = Counter()
+        self.rows = {}  # memory backend only: key -> LoginThrottle (never added to a session)
+
+
+def _state():
+    state = current_app.extensions.get('login_throttle')
+    if state is None:
+        state = current_app.extensions.setdefault('login_throttle', _State())
+    return state
+
+
+def _use_database():
+    return current_app.config['LOGIN_THROTTLE_BACKEND'] == 'database'
+
+
+def _load(keys):
+    """Existing counter rows for keys, by key"""
+    from app.models import LoginThrottle
+
+    if _use_database():
+        return {row.key: row for row in LoginThrottle.query.filter(LoginThrottle.key.in_(keys))}
+    state = _state()
+    return {key: state.rows[key] for key in keys if key in state.rows}
+
+
+def _roll(row, now, window):
+    """Move a row's windows forward so that now falls in the current one"""
+    elapsed = now - row.window_start
+    if elapsed < window:
+        return
+    windows = int(elapsed / window)
+    row.previous_count = row.count if windows == 1 else 0
+    row.count = 0
+    row.window_start += window * windows
+
+
+def estimate(row, now, window):
+    """Failures within the sliding window ending at now"""
+    _roll(row, now, window)
+    overlap = 1 - (now - row.window_start) / window
+    return row.count + row.previous_count * overlap
+
+
+def _delay(failures, limit, window):
+    """Seconds a key is blocked after its latest failure"""
+    if failures >= limit:
+        return window.total_seconds()
+    free = limit // 2
+    if failures <= free:
+        return 0
+    return min(current_app.config['LOGIN_THROTTLE_BASE_DELAY'] * 2 ** int(failures - free - 1),
+               window.total_seconds())
+
+
+def check(ip, email, now=None):
+    """
+    Decide whether a login attempt may go ahead
+
+    Call before looking up the user. A rejected attempt is counted in the
+    metrics but does not extend the block.
+
+    Returns:
+        int: 0 to go ahead, otherwise seconds until the client may retry
+    """
+    from app.models import db, LoginThrottle
+
+    now = now or datetime.utcnow()
+    keys = _keys(ip, email)
+    state = _state()
+    state.metrics['checked'] += 1
+
+    blocks = {}
+    with state.lock:
+        for kind, key in keys.items():
+            until = state.blocked.get(key)
+            if until is not None and until > now:
+                blocks[kind] = until
+            elif until is not None:
+                del state.blocked[key]
+    if not blocks:
+        for row in _load(list(keys.values())).values():
+            if row.blocked_until is not None and row.blocked_until > now:
+                blocks[row.key.split(':', 1)[0]] = row.blocked_until
+        with state.lock:
+            for kind, until in blocks.items():
+                state.blocked[keys[kind]] = until
+    if not blocks:
+        return 0
+
+    for kind in blocks:
+        state.metrics[f'rejected_{kind}'] += 1
+    state.metrics['rejected'] += 1
+    blocked_keys = [keys[kind] for kind in blocks]
+    if _use_database():
+        db.session.query(LoginThrottle).filter(LoginThrottle.key.in_(blocked_keys)).update(
+            {'rejected': LoginThrottle.rejected + 1}, synchronize_session=False)
+        db.session.commit()
+    else:
+        for key in blocked_keys:
+            if key in state.rows:
+                state.rows[key].rejected += 1
+    return max(1, int((max(blocks.values()) - now).total_seconds() + 0.999))
+
+
+def _insert_missing(table):
+    """INSERT that skips a key another worker has just created"""
+    from app.models import db
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return table.insert()
+    return insert(table).on_conflict_do_nothing(index_elements=['key'])
+
+
+def _stored(table, key):
+    """A detached copy of a counter row as the database holds it now"""
+    from app.models import db, LoginThrottle
+
+    row = db.session.execute(db.select(table.c.window_start, table.c.count, table.c.previous_count)
+                             .where(table.c.key == key)).one()
+    return LoginThrottle(key=key, window_start=row.window_start, count=row.count,
+                         previous_count=row.previous_count)
+
+
+def _add_failure_database(key, now, window):
+    """
+    Count one failure in the shared table and return the row as stored
+
+    Workers may record failures for the same key at once, so the count is
+    incremented in SQL rather than read and written back.
+    """
+    from app.models import db, LoginThrottle
+
+    table = LoginThrottle.__table__
+    db.session.execute(_insert_missing(table), {'key': key, 'window_start': now, 'count': 0,
+                                                'previous_count': 0, 'rejected': 0, 'updated_at': now})
+    row = _stored(table, key)
+    started = row.window_start
+    _roll(row, now, window)
+    if row.window_start != started:
+        # Only the first worker to see the new window moves the row forward
+        db.session.execute(table.update().where(table.c.key == key, table.c.window_start == started)
+                           .values(window_start=row.window_start, count=0, previous_count=row.previous_count))
+    db.session.execute(table.update().where(table.c.key == key)
+                       .values(count=table.c.count + 1, updated_at=now))
+    return _stored(table, key)
+
+
+def _add_failure_memory(state, key, now, window):
+    """Count one failure in this process and return its row"""
+    from app.models import LoginThrottle
+
+    row = state.rows.get(key)
+    if row is None:
+        row = state.rows[key] = LoginThrottle(key=key, window_start=now, count=0, previous_count=0, rejected=0)
+    _roll(row, now, window)
+    row.count += 1
+    row.updated_at = now
+    return row
+
+
+def record_failure(ip, email, now=None):
+    """
+    Count a failed login against the client IP and the email address
+
+    Returns:
+        int: Seconds the client now has to wait (0 if it may retry at once)
+    """
+    from app.models import db, LoginThrottle
+
+    now = now or datetime.utcnow()
+    window = _window()
+    keys = _keys(ip, email)
+    state = _state()
+    state.metrics['failures'] += 1
+    use_database = _use_database()
+
+    wait = 0
+    for kind, key in keys.items():
+        if use_database:
+            row = _add_failure_database(key, now, window)
+        else:
+            with state.lock:
+                row = _add_failure_memory(state, key, now, window)
+        delay = _delay(estimate(row, now, window), _limit(kind), window)
+        if not delay:
+            continue
+        until = now + timedelta(seconds=delay)
+        if use_database:
+            db.session.query(LoginThrottle).filter_by(key=key).update(
+                {'blocked_until': until, 'updated_at': now}, synchronize_session=False)
+        else:
+            row.blocked_until = until
+        with state.lock:
+            state.blocked[key] = until
+        wait = max(wait, delay)
+    if use_database:
+        db.session.commit()
+    return int(wait + 0.999)
+
+
+def record_success(email):
+    """Forget the failed logins of an email address after a correct password"""
+    from app.models import db, LoginThrottle
+
+    key = _key('email', email)
+    state = _state()
+    with state.lock:
+        state.blocked.pop(key, None)
+        if not _use_database():
+            state.rows.pop(key, None)
+            return
+    # Most logins have nothing to forget; only write when there is
+    if db.session.query(LoginThrottle.id).filter_by(key=key).first() is not None:
+        db.session.query(LoginThrottle).filter_by(key=key).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def metrics(now=None):
+    """
+    Throttling counters
+
+    Returns:
+        dict: process (counts seen by this process since it started),
+              rejected (all rejections by key kind, from the shared store),
+              blocked (keys blocked right now by kind)
+    """
+    from app.models import db, LoginThrottle
+
+    now = now or datetime.utcnow()
+    state = _state()
+    if _use_database():
+        rows = db.session.query(LoginThrottle.key, LoginThrottle.rejected, LoginThrottle.blocked_until).all()
+    else:
+        rows = [(row.key, row.rejected, row.blocked_until) for row in state.rows.values()]
+
+    rejected = dict.fromkeys(KINDS, 0)
+    blocked = dict.fromkeys(KINDS, 0)
+    for key, count, until in rows:
+        kind = key.split(':', 1)[0]
+        rejected[kind] += count or 0
+        if until is not None and until > now:
+            blocked[kind] += 1
+    return {'process': dict(state.metrics), 'rejected': rejected, 'blocked': blocked}
+
+
+def prune(now=None):
+    """Delete counters that are unblocked and have no failures left in the window"""
+    from app.models import db, LoginThrottle
+
+    now = now or datetime.utcnow()
+    cutoff = now - 2 * _window()
+    if not _use_database():
+        state = _state()
+        with state.lock:
+            stale = [key for key, row in state.rows.items()
+                     if row.updated_at < cutoff and (row.blocked_until is None or row.blocked_until <= now)]
+            for key in stale:
+                del state.rows[key]
+        return len(stale)
+    deleted = db.session.query(LoginThrottle).filter(
+        LoginThrottle.updated_at < cutoff,
+        db.or_(LoginThrottle.blocked_until.is_(None), LoginThrottle.blocked_until <= now)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
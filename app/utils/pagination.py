@@ -0,0 +1,70 @@
+"""
+Utility functions for keyset (cursor) pagination of appointment lists
+"""
+import base64
+from datetime import date, time
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(appointment):
+    """
+    Build an opaque cursor pointing just after an appointment
+
+    Args:
+        appointment: The last appointment of the current page
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = f'{appointment.appointment_date.isoformat()}|{appointment.start_time.strftime("%H:%M:%S")}|{appointment.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor (str): Cursor string from a previous page
+
+    Returns:
+        tuple: (date, time, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        day, start, appointment_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return date.fromisoformat(day), time.fromisoformat(start), int(appointment_id)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def paginate_appointments(query, model, limit, cursor=None, descending=False):
+    """
+    Fetch one page of appointments ordered by date, start time and id
+
+    Args:
+        query: Base appointment query (filters and loader options applied)
+        model: The Appointment model class
+        limit (int): Page size
+        cursor (str): Cursor returned with the previous page, if any
+        descending (bool): Newest first instead of oldest first
+
+    Returns:
+        tuple: (list of appointments, next cursor or None)
+    """
+    key = tuple_(model.appointment_date, model.start_time, model.id)
+    if cursor:
+        position = tuple_(*decode_cursor(cursor))
+        query = query.filter(key < position if descending else key > position)
+
+    columns = (model.appointment_date, model.start_time, model.id)
+    order = [column.desc() for column in columns] if descending else list(columns)
+    # One extra row tells us whether another page exists
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
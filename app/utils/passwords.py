@@ -0,0 +1,74 @@
+"""
+Password hashing policy
+
+The hash method comes from PASSWORD_HASH_METHOD, so each environment picks
+its own cost (the test suite uses a cheap one). Hashes made with another
+method are upgraded when their owner next logs in.
+
+Verification is the most CPU-heavy thing a request can do, so each process
+lets at most PASSWORD_VERIFY_CONCURRENCY checks run at once. Further logins
+wait for a slot for up to PASSWORD_VERIFY_TIMEOUT seconds and are then
+turned away, which keeps threads free for booking and calendar requests
+during a login storm.
+"""
+import threading
+
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class VerifierBusy(Exception):
+    """Raised when no verification slot frees up in time"""
+
+
+def _normalize(method):
+    """Spell out the defaults Werkzeug fills in, e.g. "pbkdf2" -> "pbkdf2:sha256:600000" """
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else str(DEFAULT_PBKDF2_ITERATIONS)
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if parts[0] == 'scrypt':
+        defaults = ['32768', '8', '1']
+        return ':'.join(['scrypt'] + parts[1:] + defaults[len(parts) - 1:])
+    return method
+
+
+def hash_method():
+    """The configured hash method with its defaults spelled out"""
+    return _normalize(current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256'))
+
+
+def hash_password(password):
+    """Hash a password with the configured method"""
+    return generate_password_hash(password, method=hash_method())
+
+
+def needs_rehash(password_hash):
+    """Whether a stored hash was made with a method other than the configured one"""
+    return password_hash.split('$', 1)[0] != hash_method()
+
+
+def _semaphore():
+    semaphore = current_app.extensions.get('password_verifier')
+    if semaphore is None:
+        semaphore = current_app.extensions.setdefault(
+            'password_verifier',
+            threading.BoundedSemaphore(current_app.config['PASSWORD_VERIFY_CONCURRENCY']))
+    return semaphore
+
+
+def verify_password(password_hash, password):
+    """
+    Check a password against a stored hash, waiting for a free slot first
+
+    Raises:
+        VerifierBusy: If no slot frees up within PASSWORD_VERIFY_TIMEOUT
+    """
+    semaphore = _semaphore()
+    if not semaphore.acquire(timeout=current_app.config['PASSWORD_VERIFY_TIMEOUT']):
+        raise VerifierBusy()
+    try:
+        return check_password_hash(password_hash, password)
+    finally:
+        semaphore.release()
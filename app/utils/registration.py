@@ -0,0 +1,270 @@
+"""
+Account registration: uniqueness checks, account creation and bulk onboarding
+
+The unique indexes on users.username and users.email are the source of
+truth. Forms check both fields with one query so users get a friendly error
+up front, and a signup that loses a race past that check is still mapped to
+the field that clashed from the IntegrityError.
+
+Bulk registration reads patient rows from CSV or JSON Lines files (see
+appointment_import.iter_rows), checks each chunk against existing accounts
+with one query, and inserts users and patient profiles with one executemany
+INSERT each per chunk. Rows without a password get an unusable hash, so those
+patients set their password through the reset page. This also skips the
+hashing cost for large lists.
+"""
+import re
+import time as timer
+from datetime import date, datetime
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Stored for accounts without a password; no password ever verifies against it
+UNUSABLE_PASSWORD = '!'
+
+UNIQUE_FIELDS = ('username', 'email')
+
+MESSAGES = {
+    'username': 'Username already in use.',
+    'email': 'Email already registered.',
+}
+
+GENDERS = ('male', 'female', 'other', 'prefer_not_to_say')
+
+USERNAME_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9_.]*$')
+
+
+class RegistrationConflict(Exception):
+    """Raised when a username or email is already taken"""
+
+    def __init__(self, fields):
+        super().__init__(', '.join(MESSAGES[field] for field in fields))
+        self.fields = fields
+
+    @property
+    def errors(self):
+        """Error message by form field"""
+        return {field: MESSAGES[field] for field in self.fields}
+
+
+def taken_fields(username, email):
+    """
+    Which of username and email already belong to an account, in one query
+
+    Returns:
+        list: 'username' and/or 'email'
+    """
+    from app.models import db, User
+
+    taken = set()
+    for existing_username, existing_email in db.session.query(User.username, User.email).filter(
+            db.or_(User.username == username, User.email == email)):
+        if existing_username == username:
+            taken.add('username')
+        if existing_email == email:
+            taken.add('email')
+    return [field for field in UNIQUE_FIELDS if field in taken]
+
+
+def conflict_fields(error):
+    """
+    The users columns named by a unique constraint IntegrityError
+
+    Understands SQLite ("UNIQUE constraint failed: users.email") and
+    PostgreSQL ("Key (email)=(...) already exists" or the index name).
+
+    Returns:
+        list: 'username' and/or 'email'; empty for other integrity errors
+    """
+    message = str(getattr(error, 'orig', error))
+    return [field for field in UNIQUE_FIELDS
+            if re.search(rf'users\.{field}\b|\({field}\)|ix_users_{field}\b|users_{field}_key', message)]
+
+
+def create_account(role, username, email, password, profile=None):
+    """
+    Create a user and its patient or doctor profile in one transaction
+
+    Args:
+        role (str): 'patient', 'doctor' or 'admin'
+        profile (dict): Patient or Doctor column values (not used for admins)
+
+    Returns:
+        User: The committed user
+
+    Raises:
+        RegistrationConflict: If the username or email is taken
+        IntegrityError: For any other constraint failure
+    """
+    from sqlalchemy.exc import IntegrityError
+    from app.models import db, Doctor, Patient, User
+
+    user = User(username=username, email=email, role=role)
+    user.password = password
+    # The relationship inserts the profile with the user's new ID at commit;
+    # no separate flush is needed to learn it
+    if role == 'patient':
+        user.patient = Patient(**profile)
+    elif role == 'doctor':
+        user.doctor = Doctor(**profile)
+    db.session.add(user)
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        fields = conflict_fields(e)
+        if fields:
+            raise RegistrationConflict(fields) from e
+        raise
+    return user
+
+
+def _username_from_email(email):
+    local, domain = email.split('@', 1)
+    username = re.sub(r'[^A-Za-z0-9_.]', '_', local)
+    if not username[:1].isalpha():
+        username = f'p{username}'
+    if len(username) < 3:
+        username = f"{username}_{re.sub(r'[^A-Za-z0-9]', '', domain.split('.')[0])}"
+    return username[:64]
+
+
+def clean_patient_row(row):
+    """
+    Convert an onboarding row to user and patient column values
+
+    Expected keys: email, first_name, last_name, phone, date_of_birth
+    (YYYY-MM-DD), gender, and optionally username (default: from the email),
+    password, address and medical_history.
+
+    Raises:
+        ValueError: With the reason the row is rejected
+    """
+    if '_invalid' in row:
+        raise ValueError('Invalid JSON')
+
+    def value(key):
+        return str(row.get(key) or '').strip()
+
+    email = value('email').lower()
+    if not re.match(r'^[^@\s]+@[^@\s]+\.[^@\s]+$', email) or len(email) > 120:
+        raise ValueError(f'Invalid email: {email}' if email else 'Missing email')
+    username = value('username') or _username_from_email(email)
+    if not USERNAME_PATTERN.match(username) or not 3 <= len(username) <= 64:
+        raise ValueError(f'Invalid username: {username}')
+    for key in ('first_name', 'last_name', 'phone'):
+        if not value(key):
+            raise ValueError(f'Missing {key}')
+    try:
+        date_of_birth = date.fromisoformat(value('date_of_birth'))
+    except ValueError:
+        raise ValueError('Date of birth must be YYYY-MM-DD')
+    if date_of_birth > date.today():
+        raise ValueError('Date of birth must be in the past')
+    gender = value('gender').lower() or 'prefer_not_to_say'
+    if gender not in GENDERS:
+        raise ValueError(f'Invalid gender: {gender}')
+
+    return {
+        'user': {'username': username, 'email': email, 'password': value('password') or None},
+        'patient': {
+            'first_name': value('first_name')[:64],
+            'last_name': value('last_name')[:64],
+            'phone': value('phone')[:20],
+            'date_of_birth': date_of_birth,
+            'gender': gender,
+            'address': value('address')[:256] or None,
+            'medical_history': value('medical_history') or None,
+        },
+    }
+
+
+def register_patients(rows, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Create patient accounts in chunks
+
+    Args:
+        rows: Iterable of (line number, row dict), e.g. from iter_rows
+        chunk_size (int): Rows per existence query, executemany INSERT and commit
+        dry_run (bool): Validate only
+
+    Returns:
+        dict: total, created, rejected (list of line, error, row), seconds
+              and rows_per_second
+    """
+    from app.models import db, Patient, User
+    from app.utils.passwords import hash_password
+
+    started = timer.perf_counter()
+    users = User.__table__
+    patients = Patient.__table__
+    now = datetime.utcnow()
+    report = {'total': 0, 'created': 0, 'rejected': [], 'dry_run': dry_run}
+    seen = {'username': set(), 'email': set()}
+
+    def flush(chunk):
+        cleaned = []
+        for number, row in chunk:
+            try:
+                cleaned.append((number, row, clean_patient_row(row)))
+            except ValueError as e:
+                report['rejected'].append({'line': number, 'error': str(e), 'row': row})
+        if not cleaned:
+            return
+
+        # One query for the whole chunk; earlier chunks and rows are in `seen`
+        usernames = [values['user']['username'] for _, _, values in cleaned]
+        emails = [values['user']['email'] for _, _, values in cleaned]
+        for existing_username, existing_email in db.session.query(User.username, User.email).filter(
+                db.or_(User.username.in_(usernames), User.email.in_(emails))):
+            seen['username'].add(existing_username)
+            seen['email'].add(existing_email)
+
+        valid = []
+        for number, row, values in cleaned:
+            taken = [field for field in UNIQUE_FIELDS if values['user'][field] in seen[field]]
+            if taken:
+                report['rejected'].append({'line': number, 'row': row,
+                                           'error': ' '.join(MESSAGES[field] for field in taken)})
+                continue
+            for field in UNIQUE_FIELDS:
+                seen[field].add(values['user'][field])
+            valid.append(values)
+
+        if valid and not dry_run:
+            user_rows = [{
+                'username': values['user']['username'],
+                'email': values['user']['email'],
+                'password_hash': hash_password(values['user']['password'])
+                if values['user']['password'] else UNUSABLE_PASSWORD,
+                'role': 'patient',
+                'is_active': True,
+                'created_at': now,
+            } for values in valid]
+            user_ids = db.session.execute(
+                users.insert().returning(users.c.id, sort_by_parameter_order=True), user_rows
+            ).scalars().all()
+            db.session.execute(patients.insert(), [
+                dict(values['patient'], user_id=user_id) for user_id, values in zip(user_ids, valid)
+            ])
+            db.session.commit()
+        report['created'] += len(valid)
+
+    chunk = []
+    for item in rows:
+        report['total'] += 1
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+
+    if dry_run:
+        report['valid'] = report.pop('created')
+        report['created'] = 0
+
+    report['rejected'].sort(key=lambda item: item['line'])
+    report['seconds'] = timer.perf_counter() - started
+    report['rows_per_second'] = report['total'] / report['seconds'] if report['seconds'] else 0.0
+    return report
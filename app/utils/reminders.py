@@ -0,0 +1,351 @@
+"""
+Appointment reminders: generation into the outbox and delivery
+
+Generation scans the upcoming appointments in time buckets (one indexed
+range query per bucket on appointment_date, start_time and status), renders
+the messages of a bucket in one go and inserts them into the
+reminder_outbox table with a dedup key per appointment slot, channel and
+lead time. Running it again, or on two machines at once, never creates a
+second reminder.
+
+Delivery claims pending reminders in batches and hands them to a transport.
+Reminders whose appointment was cancelled, deleted or moved to another slot
+since they were queued are marked cancelled instead of sent.
+No SMS or email service is wired in: the "console" transport prints the
+messages and the "file" transport appends them to REMINDER_OUTBOX_FILE as
+JSON lines. A real gateway is plugged in through REMINDER_TRANSPORT as a
+"module:Class" path to a Transport subclass.
+"""
+import json
+import os
+import sys
+import time as timer
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+ACTIVE_STATUSES = ('scheduled', 'confirmed')
+
+DEFAULT_BUCKET_MINUTES = 60
+
+# Reminders per delivery batch
+DEFAULT_BATCH_SIZE = 500
+
+# Failed deliveries are retried until this many attempts
+MAX_ATTEMPTS = 3
+
+# Seconds before reminders claimed by a sender that died are released
+CLAIM_TIMEOUT = 600
+
+
+class Transport:
+    """Delivers reminders; subclasses implement send()"""
+
+    def send(self, reminder):
+        """Deliver one reminder, raising an exception when it fails"""
+        raise NotImplementedError
+
+    def send_batch(self, reminders):
+        """
+        Deliver a batch of reminders
+
+        Returns:
+            dict: Error message by reminder ID for the ones that failed
+        """
+        failures = {}
+        for reminder in reminders:
+            try:
+                self.send(reminder)
+            except Exception as e:
+                failures[reminder.id] = str(e)[:255] or type(e).__name__
+        return failures
+
+
+class ConsoleTransport(Transport):
+    """Prints reminders to standard output (development stand-in)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, reminder):
+        self.stream.write(f'[{reminder.channel} to {reminder.recipient}] {reminder.subject or ""}\n'
+                          f'{reminder.body}\n\n')
+
+
+class FileTransport(Transport):
+    """Appends reminders to a JSON Lines file (local stand-in for a gateway)"""
+
+    def __init__(self, path=None):
+        self.path = path or current_app.config['REMINDER_OUTBOX_FILE']
+
+    def send(self, reminder):
+        self.send_batch([reminder])
+
+    def send_batch(self, reminders):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as stream:
+            for reminder in reminders:
+                stream.write(json.dumps({
+                    'dedup_key': reminder.dedup_key,
+                    'channel': reminder.channel,
+                    'recipient': reminder.recipient,
+                    'subject': reminder.subject,
+                    'body': reminder.body,
+                }) + '\n')
+        return {}
+
+
+TRANSPORTS = {
+    'console': ConsoleTransport,
+    'file': FileTransport,
+}
+
+
+def get_transport(name=None):
+    """
+    Build the transport named by REMINDER_TRANSPORT (or name)
+
+    Raises:
+        ImportError: If a "module:Class" path cannot be imported
+    """
+    from werkzeug.utils import import_string
+
+    name = name or current_app.config['REMINDER_TRANSPORT']
+    transport_class = TRANSPORTS.get(name) or import_string(name)
+    return transport_class()
+
+
+def _buckets(start, end, minutes):
+    """
+    Split [start, end) into (day, from time, to time) ranges within single days
+
+    The last range of a day has to_time None, meaning "until midnight".
+    """
+    step = timedelta(minutes=minutes)
+    current = start
+    while current < end:
+        midnight = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
+        stop = min(current + step, end, midnight)
+        yield current.date(), current.time(), None if stop == midnight else stop.time()
+        current = stop
+
+
+def _slot(appointment_date, start_time):
+    """The appointment slot part of a dedup key"""
+    return f'{appointment_date.isoformat()}T{start_time.strftime("%H%M")}'
+
+
+def _recipient(channel, email, phone):
+    return email if channel == 'email' else phone
+
+
+def _insert_ignoring_duplicates(table):
+    """INSERT that skips rows whose dedup_key already exists (a concurrent run)"""
+    from app.models import db
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return table.insert()
+    return insert(table).on_conflict_do_nothing(index_elements=['dedup_key'])
+
+
+def generate_reminders(now=None, lead_hours=None, bucket_minutes=DEFAULT_BUCKET_MINUTES, channels=None):
+    """
+    Queue reminders for appointments starting within the next lead_hours
+
+    Args:
+        now (datetime): Start of the window (defaults to the current local time)
+        lead_hours (int): Length of the window (default: REMINDER_LEAD_HOURS)
+        bucket_minutes (int): Window slice scanned and inserted at a time
+        channels (list): 'email' and/or 'sms' (default: REMINDER_CHANNELS)
+
+    Returns:
+        dict: scanned appointments, created reminders, skipped (already
+              queued or no address), seconds
+    """
+    from app.models import db, Appointment, Doctor, Patient, Reminder, User
+
+    started = timer.perf_counter()
+    config = current_app.config
+    now = now or datetime.now()
+    lead_hours = lead_hours if lead_hours is not None else config['REMINDER_LEAD_HOURS']
+    channels = [channel.strip() for channel in (channels or config['REMINDER_CHANNELS']) if channel.strip()]
+    templates = {channel: current_app.jinja_env.get_template(f'reminders/appointment_{channel}.txt')
+                 for channel in channels}
+
+    table = Reminder.__table__
+    insert = _insert_ignoring_duplicates(table)
+    report = {'scanned': 0, 'created': 0, 'skipped': 0}
+
+    for day, from_time, to_time in _buckets(now, now + timedelta(hours=lead_hours), bucket_minutes):
+        query = db.session.query(
+            Appointment.id, Appointment.patient_id, Appointment.appointment_date, Appointment.start_time,
+            Patient.first_name, Patient.last_name, Patient.phone, User.email,
+            Doctor.first_name, Doctor.last_name
+        ).join(Patient, Appointment.patient_id == Patient.id
+        ).join(User, Patient.user_id == User.id
+        ).join(Doctor, Appointment.doctor_id == Doctor.id
+        ).filter(
+            Appointment.appointment_date == day,
+            Appointment.start_time >= from_time,
+            Appointment.status.in_(ACTIVE_STATUSES)
+        )
+        if to_time is not None:
+            query = query.filter(Appointment.start_time < to_time)
+        rows = query.all()
+        report['scanned'] += len(rows)
+        if not rows:
+            continue
+
+        candidates = {}
+        for (appointment_id, patient_id, appointment_date, start_time, first_name, last_name, phone, email,
+             doctor_first, doctor_last) in rows:
+            context = {
+                'patient_name': f'{first_name} {last_name}',
+                'doctor_name': f'Dr. {doctor_first} {doctor_last}',
+                'day': appointment_date.strftime('%A %d/%m/%Y'),
+                'time': start_time.strftime('%H:%M'),
+            }
+            for channel in channels:
+                recipient = _recipient(channel, email, phone)
+                if not recipient:
+                    report['skipped'] += 1
+                    continue
+                # Rescheduling changes the key, so the new slot gets its own reminder
+                key = f'{appointment_id}:{_slot(appointment_date, start_time)}:{lead_hours}h:{channel}'
+                candidates[key] = {
+                    'dedup_key': key,
+                    'appointment_id': appointment_id,
+                    'patient_id': patient_id,
+                    'channel': channel,
+                    'recipient': recipient,
+                    'subject': f'Appointment reminder: {context["day"]} at {context["time"]}' if channel == 'email' else None,
+                    'body': templates[channel].render(context),
+                    'status': 'pending',
+                    'attempts': 0,
+                    'created_at': datetime.utcnow(),
+                }
+
+        existing = {key for (key,) in db.session.query(Reminder.dedup_key).filter(
+            Reminder.dedup_key.in_(list(candidates)))}
+        values = [value for key, value in candidates.items() if key not in existing]
+        report['skipped'] += len(existing)
+        if values:
+            db.session.execute(insert, values)
+        db.session.commit()
+        report['created'] += len(values)
+
+    report['seconds'] = timer.perf_counter() - started
+    return report
+
+
+def _claim_batch(batch_size, after_id):
+    """
+    Mark up to batch_size pending reminders after after_id as being sent by this call
+
+    Claimed reminders whose appointment is no longer active or no longer in
+    the slot they were written for are marked cancelled.
+
+    Returns:
+        tuple: (reminders to send, number cancelled, highest claimed ID or None)
+    """
+    from app.models import db, Appointment, Reminder
+
+    token = uuid.uuid4().hex
+    pending = db.select(Reminder.id).where(
+        Reminder.status == 'pending', Reminder.id > after_id
+    ).order_by(Reminder.id).limit(batch_size)
+    db.session.query(Reminder).filter(Reminder.id.in_(pending), Reminder.status == 'pending').update(
+        {'status': 'sending', 'claim_token': token, 'claimed_at': datetime.utcnow()},
+        synchronize_session=False)
+    db.session.commit()
+
+    rows = db.session.query(
+        Reminder, Appointment.appointment_date, Appointment.start_time, Appointment.status
+    ).outerjoin(Appointment, Appointment.id == Reminder.appointment_id
+    ).filter(Reminder.claim_token == token, Reminder.status == 'sending').order_by(Reminder.id).all()
+    batch, stale_ids = [], []
+    for reminder, appointment_date, start_time, status in rows:
+        # Deleted or archived appointments have no row to join
+        if status in ACTIVE_STATUSES and reminder.dedup_key.split(':')[1] == _slot(appointment_date, start_time):
+            batch.append(reminder)
+        else:
+            stale_ids.append(reminder.id)
+    if stale_ids:
+        db.session.query(Reminder).filter(Reminder.id.in_(stale_ids)).update(
+            {'status': 'cancelled', 'claim_token': None}, synchronize_session=False)
+        db.session.commit()
+    return batch, len(stale_ids), rows[-1][0].id if rows else None
+
+
+def release_stale_claims(timeout=CLAIM_TIMEOUT):
+    """Return reminders claimed by a sender that stopped to the pending pool"""
+    from app.models import db, Reminder
+
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+    released = db.session.query(Reminder).filter(
+        Reminder.status == 'sending', Reminder.claimed_at < cutoff
+    ).update({'status': 'pending', 'claim_token': None}, synchronize_session=False)
+    db.session.commit()
+    return released
+
+
+def deliver_reminders(transport=None, batch_size=DEFAULT_BATCH_SIZE, limit=None):
+    """
+    Send pending reminders through a transport
+
+    Each batch is claimed with a token first, so concurrent senders never
+    pick up the same reminder.
+
+    Args:
+        transport (Transport): Defaults to get_transport()
+        batch_size (int): Reminders claimed and sent at a time
+        limit (int): Stop after about this many reminders (None = all pending)
+
+    Returns:
+        dict: sent, failed (retried later), given_up and cancelled (appointment
+              cancelled or moved) counts, seconds
+    """
+    from app.models import db, Reminder
+
+    started = timer.perf_counter()
+    transport = transport or get_transport()
+    release_stale_claims()
+    report = {'sent': 0, 'failed': 0, 'given_up': 0, 'cancelled': 0}
+
+    # Walk forward by ID so reminders that fail are retried on the next run,
+    # not again within this one
+    last_id = 0
+    while limit is None or sum(report.values()) < limit:
+        batch, cancelled, claimed_id = _claim_batch(batch_size, last_id)
+        if claimed_id is None:
+            break
+        last_id = claimed_id
+        report['cancelled'] += cancelled
+        if not batch:
+            continue
+
+        failures = transport.send_batch(batch)
+        now = datetime.utcnow()
+        sent_ids = [reminder.id for reminder in batch if reminder.id not in failures]
+        if sent_ids:
+            db.session.query(Reminder).filter(Reminder.id.in_(sent_ids)).update(
+                {'status': 'sent', 'sent_at': now, 'attempts': Reminder.attempts + 1, 'error': None},
+                synchronize_session=False)
+        for reminder in batch:
+            if reminder.id in failures:
+                reminder.attempts += 1
+                reminder.error = failures[reminder.id]
+                reminder.status = 'failed' if reminder.attempts >= MAX_ATTEMPTS else 'pending'
+                report['given_up' if reminder.status == 'failed' else 'failed'] += 1
+            reminder.claim_token = None
+        db.session.commit()
+        report['sent'] += len(sent_ids)
+
+    report['seconds'] = timer.perf_counter() - started
+    return report
@@ -0,0 +1,243 @@
+"""
+Bulk creation of weekly schedules from a template or a CSV file
+
+A batch is validated in memory against a single fetch of the doctors'
+current and future schedules, then inserted in one transaction. Batches
+with any invalid row are rejected as a whole so a partial week is never
+left behind.
+"""
+import csv
+from datetime import date, datetime
+
+DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Columns of the schedule CSV; the last three are optional
+CSV_FIELDS = ('doctor_id', 'day', 'start', 'end', 'duration', 'break', 'valid_from')
+
+
+def parse_day(value):
+    """
+    Parse a weekday given as 0-6 (Monday first), a name or a three-letter abbreviation
+
+    Raises:
+        ValueError: If the value is not a weekday
+    """
+    text = str(value).strip().lower()
+    if text.isdigit() and 0 <= int(text) <= 6:
+        return int(text)
+    for index, name in enumerate(DAY_NAMES):
+        if text in (name, name[:3]):
+            return index
+    raise ValueError(f'Unknown day: {value}')
+
+
+def parse_days(value):
+    """
+    Parse a list of weekdays such as "mon-fri", "mon,wed,fri" or [0, 2, 4]
+
+    Returns:
+        list: Sorted weekday numbers
+
+    Raises:
+        ValueError: If a day or range is invalid
+    """
+    parts = value if isinstance(value, (list, tuple)) else str(value).split(',')
+    days = set()
+    for part in parts:
+        part = str(part).strip()
+        if '-' in part:
+            first, last = (parse_day(p) for p in part.split('-', 1))
+            if last < first:
+                raise ValueError(f'Invalid day range: {part}')
+            days.update(range(first, last + 1))
+        elif part:
+            days.add(parse_day(part))
+    if not days:
+        raise ValueError('No days given')
+    return sorted(days)
+
+
+def _parse_time(value):
+    return value if hasattr(value, 'hour') else datetime.strptime(str(value).strip(), '%H:%M').time()
+
+
+def _parse_date(value):
+    if value in (None, ''):
+        return None
+    return value if isinstance(value, date) else date.fromisoformat(str(value).strip())
+
+
+def expand_template(template, doctor_ids):
+    """
+    Turn a weekly template into one schedule row per doctor and day
+
+    Args:
+        template (dict): days, start, end, and optionally duration, break
+                         and valid_from
+        doctor_ids (list): Doctors to apply the template to
+
+    Returns:
+        list: Row dicts for build_schedules
+    """
+    days = parse_days(template.get('days', 'mon-fri'))
+    return [
+        {
+            'doctor_id': doctor_id,
+            'day': day,
+            'start': template.get('start'),
+            'end': template.get('end'),
+            'duration': template.get('duration'),
+            'break': template.get('break'),
+            'valid_from': template.get('valid_from'),
+        }
+        for doctor_id in doctor_ids
+        for day in days
+    ]
+
+
+def read_schedule_csv(stream):
+    """
+    Read schedule rows from a CSV file with a header row (see CSV_FIELDS)
+
+    Args:
+        stream: Text file object
+
+    Returns:
+        list: Row dicts for build_schedules
+
+    Raises:
+        ValueError: If a required column is missing
+    """
+    reader = csv.DictReader(stream)
+    missing = {'doctor_id', 'day', 'start', 'end'} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+    return [{key: row.get(key) for key in CSV_FIELDS} for row in reader]
+
+
+def _clean_row(row, doctors):
+    """Convert a raw row to Schedule column values, raising ValueError when invalid"""
+    try:
+        doctor_id = int(row.get('doctor_id'))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid doctor_id: {row.get('doctor_id')}")
+    if doctor_id not in doctors:
+        raise ValueError(f'Doctor {doctor_id} not found')
+
+    try:
+        start_time = _parse_time(row.get('start'))
+        end_time = _parse_time(row.get('end'))
+    except (TypeError, ValueError):
+        raise ValueError('Times must be HH:MM')
+    if end_time <= start_time:
+        raise ValueError('End time must be after start time')
+
+    try:
+        duration = int(row.get('duration') or 30)
+        break_duration = int(row.get('break') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('Duration and break must be whole minutes')
+    if duration <= 0 or break_duration < 0:
+        raise ValueError('Duration must be positive and break not negative')
+
+    try:
+        valid_from = _parse_date(row.get('valid_from'))
+    except (TypeError, ValueError):
+        raise ValueError('valid_from must be YYYY-MM-DD')
+
+    return {
+        'doctor_id': doctor_id,
+        'day_of_week': parse_day(row.get('day')),
+        'start_time': start_time,
+        'end_time': end_time,
+        'appointment_duration': duration,
+        'break_duration': break_duration,
+        'valid_from': valid_from,
+        'is_active': True,
+    }
+
+
+def build_schedules(rows, dry_run=False):
+    """
+    Validate and insert a batch of schedules
+
+    Existing schedules of the doctors involved are fetched once; overlaps
+    with them and within the batch are checked in memory using the same
+    rule as the schedule form. A version that ends before a row's
+    valid_from does not clash with it, so successors can be scheduled. Nothing is written on a dry run or when any
+    row is invalid.
+
+    Args:
+        rows (list): Row dicts (doctor_id, day, start, end, duration, break, valid_from)
+        dry_run (bool): Only validate and report
+
+    Returns:
+        dict: total, valid, created, dry_run and errors (row number and message)
+    """
+    from app.models import db, Doctor, Schedule
+
+    today = date.today()
+    doctor_ids = set()
+    for row in rows:
+        try:
+            doctor_ids.add(int(row.get('doctor_id')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+    doctors = {doctor_id for (doctor_id,) in
+               db.session.query(Doctor.id).filter(Doctor.id.in_(doctor_ids))} if doctor_ids else set()
+
+    values, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({'row': number, 'error': 'Each row must be an object'})
+            continue
+        try:
+            values.append((number, _clean_row(row, doctors)))
+        except ValueError as e:
+            errors.append({'row': number, 'error': str(e)})
+
+    # New rows are open-ended from valid_from (today when blank), so only
+    # versions still in effect on the earliest start can clash with them
+    first_day = min((cleaned['valid_from'] or today for _, cleaned in values), default=today)
+
+    # Blocks keyed by doctor and weekday, with the last day they apply (None = open-ended)
+    blocks = {}
+    if values:
+        existing = db.session.query(
+            Schedule.doctor_id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time,
+            Schedule.valid_to
+        ).filter(Schedule.doctor_id.in_(doctors), Schedule.valid_between(first_day, None))
+        for doctor_id, day, start_time, end_time, valid_to in existing:
+            blocks.setdefault((doctor_id, day), []).append(
+                (start_time, end_time, valid_to, 'an existing schedule'))
+
+    valid = []
+    for number, cleaned in values:
+        key = (cleaned['doctor_id'], cleaned['day_of_week'])
+        valid_from = cleaned['valid_from'] or today
+        clash = next((source for start_time, end_time, valid_to, source in blocks.get(key, ())
+                      if (valid_to is None or valid_to >= valid_from)
+                      and start_time <= cleaned['end_time'] and end_time >= cleaned['start_time']), None)
+        if clash:
+            errors.append({'row': number, 'error': f'{DAY_NAMES[key[1]].capitalize()} overlaps {clash}'})
+            continue
+
+        blocks.setdefault(key, []).append((cleaned['start_time'], cleaned['end_time'], None, f'row {number}'))
+        valid.append(cleaned)
+    errors.sort(key=lambda error: error['row'])
+    values = valid
+
+    created = 0
+    if values and not errors and not dry_run:
+        db.session.execute(db.insert(Schedule), values)
+        db.session.commit()
+        created = len(values)
+
+    return {
+        'total': len(rows),
+        'valid': len(values),
+        'created': created,
+        'dry_run': dry_run,
+        'errors': errors,
+    }
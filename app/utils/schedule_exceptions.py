@@ -0,0 +1,167 @@
+"""
+In-memory interval index of schedule exceptions (holidays, leave)
+
+Availability checks run on every slot search and booking, while exceptions
+change rarely. Each process keeps all exceptions in sorted interval lists per
+doctor (plus one for clinic-wide closures), so checking a day costs a bisect
+instead of a query. The index is dropped whenever a ScheduleException is
+written in this process and reloaded after SCHEDULE_EXCEPTION_CACHE_TTL
+seconds to pick up changes made by other workers.
+"""
+import bisect
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class Closure(namedtuple('Closure', ['start_time', 'end_time', 'label', 'clinic_wide'])):
+    """A closure on one day; full-day closures have no times"""
+    __slots__ = ()
+
+    @property
+    def full_day(self):
+        return self.start_time is None or self.end_time is None
+
+
+class _IntervalList:
+    """Date intervals sorted by start, with a running maximum of end dates"""
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals, key=lambda item: item[0])
+        self.starts = [item[0] for item in intervals]
+        self.intervals = intervals
+        self.max_end = []
+        running = None
+        for item in intervals:
+            running = item[1] if running is None or item[1] > running else running
+            self.max_end.append(running)
+
+    def covering(self, day):
+        """Yield the payload of every interval containing day"""
+        i = bisect.bisect_right(self.starts, day) - 1
+        # Walk left only while an earlier interval can still reach this day
+        while i >= 0 and self.max_end[i] >= day:
+            start, end, payload = self.intervals[i]
+            if end >= day:
+                yield payload
+            i -= 1
+
+
+class ExceptionIndex:
+    """Per-process index of schedule exceptions keyed by doctor (None = clinic-wide)"""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._lists = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        """Drop the index; the next lookup reloads it"""
+        self._lists = None
+
+    def _load(self):
+        from app.models.schedule_exception import ScheduleException
+
+        rows = ScheduleException.query.with_entities(
+            ScheduleException.doctor_id, ScheduleException.start_date, ScheduleException.end_date,
+            ScheduleException.start_time, ScheduleException.end_time,
+            ScheduleException.kind, ScheduleException.reason
+        ).all()
+
+        grouped = {}
+        for doctor_id, start_date, end_date, start_time, end_time, kind, reason in rows:
+            label = f'{kind.capitalize()}: {reason}' if reason else kind.capitalize()
+            closure = Closure(start_time, end_time, label, doctor_id is None)
+            grouped.setdefault(doctor_id, []).append((start_date, end_date, closure))
+        return {key: _IntervalList(items) for key, items in grouped.items()}
+
+    def _lists_for_lookup(self):
+        lists = self._lists
+        if lists is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return lists
+        with self._lock:
+            if self._lists is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._lists = self._load()
+                self._loaded_at = time.monotonic()
+            return self._lists
+
+    def closures(self, doctor_id, day):
+        """
+        Get the closures affecting a doctor on a day
+
+        Args:
+            doctor_id (int): The doctor's ID
+            day (date): The day to check
+
+        Returns:
+            list: Closure tuples (full-day closures have no times)
+        """
+        lists = self._lists_for_lookup()
+        found = []
+        for key in (doctor_id, None):
+            if key in lists:
+                found.extend(lists[key].covering(day))
+        return found
+
+    def blocking(self, doctor_id, day, start_time=None, end_time=None):
+        """
+        Find a closure that blocks a time range (or any of the day without times)
+
+        Args:
+            doctor_id (int): The doctor's ID
+            day (date): The day to check
+            start_time (time): Start of the range to book
+            end_time (time): End of the range to book
+
+        Returns:
+            Closure: The first blocking closure, or None
+        """
+        for closure in self.closures(doctor_id, day):
+            if closure.full_day or start_time is None or end_time is None:
+                return closure
+            if closure.start_time < end_time and start_time < closure.end_time:
+                return closure
+        return None
+
+
+def get_exception_index():
+    """
+    Return the exception index of the current application
+
+    Returns:
+        ExceptionIndex: The index stored in app.extensions
+    """
+    index = current_app.extensions.get('schedule_exceptions')
+    if index is None:
+        index = ExceptionIndex(ttl=current_app.config.get('SCHEDULE_EXCEPTION_CACHE_TTL', 60))
+        current_app.extensions['schedule_exceptions'] = index
+    return index
+
+
+def _invalidate_current():
+    if has_app_context() and 'schedule_exceptions' in current_app.extensions:
+        current_app.extensions['schedule_exceptions'].invalidate()
+
+
+def register_invalidation(model):
+    """Drop the index when exceptions change, and again when the transaction ends"""
+
+    def changed(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is not None:
+            session.info['schedule_exceptions_changed'] = True
+        _invalidate_current()
+
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, name, changed)
+
+    @event.listens_for(Session, 'after_transaction_end')
+    def transaction_ended(session, transaction):
+        # Reloads made mid-transaction may have seen rows that were rolled back
+        if session.info.pop('schedule_exceptions_changed', False):
+            _invalidate_current()
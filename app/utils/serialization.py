@@ -0,0 +1,236 @@
+"""
+JSON serialization
+
+AppJSONProvider replaces Flask's default JSON provider, so jsonify() and
+request.get_json() go through it. It encodes with orjson when the package is
+installed, and with the standard library otherwise (JSON_BACKEND picks
+explicitly: "auto", "orjson" or "stdlib"). Both backends produce the same
+values:
+
+    date      "2026-10-19"
+    datetime  "2026-10-19T09:30:00" (isoformat)
+    time      "09:30", or "09:30:15" when it has seconds
+
+Routes therefore return date and time columns as they are instead of calling
+isoformat()/strftime() per row. row_serializer() builds the dicts from ORM
+objects or result rows with a field spec:
+
+    APPOINTMENT_FIELDS = {
+        'id': 'id',
+        'patient_name': 'patient.full_name',   # dotted attribute path
+        'appointment_time': 'start_time',
+    }
+    serialize_rows(query, APPOINTMENT_FIELDS)
+
+A Fieldset adds ``?fields=`` selection to an endpoint. Each Field names the
+columns and relationships its value needs. Only the requested fields are
+loaded (load_only / joinedload) and serialized:
+
+    APPOINTMENTS = Fieldset(Appointment, {
+        'id': Field('id', [Appointment.id]),
+        'doctor_name': Field('doctor.full_name', [Appointment.doctor_id],
+                             {'doctor': [Doctor.first_name, Doctor.last_name]}),
+    })
+    keys = APPOINTMENTS.requested()        # ValueError on unknown names
+    query = query.options(*APPOINTMENTS.loader_options(keys))
+    serialize_rows(query, APPOINTMENTS.spec(keys))
+"""
+from datetime import date, datetime, time
+from operator import attrgetter
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider, _default as _flask_default
+from sqlalchemy.orm import joinedload, load_only
+
+JSON_BACKENDS = ('auto', 'orjson', 'stdlib')
+
+
+def _format_time(value):
+    if value.second or value.microsecond:
+        return value.isoformat()
+    return value.isoformat('minutes')
+
+
+# Exact-type lookup first: orjson calls the default once per date or time value
+_FORMATTERS = {
+    date: date.isoformat,
+    datetime: datetime.isoformat,
+    time: _format_time,
+}
+
+
+def _json_default(value):
+    """Encode the types neither backend handles the way the API wants"""
+    formatter = _FORMATTERS.get(type(value))
+    if formatter is not None:
+        return formatter(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, time):
+        return _format_time(value)
+    # Decimal, UUID, dataclasses and Markup as Flask does
+    return _flask_default(value)
+
+
+def _import_orjson():
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when available"""
+
+    default = staticmethod(_json_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get('JSON_BACKEND', 'auto')
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f'JSON_BACKEND must be one of {", ".join(JSON_BACKENDS)}, not {backend!r}')
+        self.orjson = _import_orjson() if backend != 'stdlib' else None
+        if backend == 'orjson' and self.orjson is None:
+            raise RuntimeError('JSON_BACKEND is "orjson" but orjson is not installed')
+
+    @property
+    def backend(self):
+        return 'orjson' if self.orjson is not None else 'stdlib'
+
+    def _options(self, indent=False):
+        orjson = self.orjson
+        # Dates and times go through _json_default so both backends agree
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # Options such as cls= or separators= only the stdlib understands
+        if self.orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.orjson.dumps(obj, default=_json_default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if self.orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return self.orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if self.orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = self.orjson.dumps(obj, default=_json_default, option=self._options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def row_serializer(fields):
+    """
+    Build a function turning one ORM object or result row into a dict
+
+    Args:
+        fields: Attribute names, or a dict of output key -> attribute name,
+            dotted path ('doctor.full_name') or callable taking the row
+
+    Returns:
+        callable: row -> dict with the keys in field order
+    """
+    if not isinstance(fields, dict):
+        fields = {name: name for name in fields}
+    getters = [(key, source if callable(source) else attrgetter(source))
+               for key, source in fields.items()]
+
+    def serialize(row):
+        return {key: get(row) for key, get in getters}
+
+    return serialize
+
+
+def serialize_rows(rows, fields):
+    """Serialize every row of an iterable (a query, a result or a list) with one field spec"""
+    serialize = row_serializer(fields)
+    return [serialize(row) for row in rows]
+
+
+class Field:
+    """
+    One field of a Fieldset
+
+    Args:
+        source: Attribute name, dotted path or callable, as in row_serializer()
+        columns: Columns of the queried model the value needs
+        related (dict): Relationship name -> columns of the related model to load with it
+    """
+
+    def __init__(self, source, columns=(), related=None):
+        self.source = source
+        self.columns = tuple(columns)
+        self.related = related or {}
+
+
+class Fieldset:
+    """
+    The fields an endpoint can return, selectable with ?fields=a,b,c
+
+    Args:
+        model: The queried model class
+        fields (dict): Output key -> Field, in output order
+        default (list): Keys returned when no fields are requested (all of them by default)
+    """
+
+    def __init__(self, model, fields, default=None):
+        self.model = model
+        self.fields = fields
+        self.default = list(default or fields)
+
+    def requested(self, default=None):
+        """
+        Keys asked for in the request's ``fields`` argument
+
+        Raises:
+            ValueError: If a requested name is not a field of this set
+        """
+        value = request.args.get('fields', '').strip()
+        if not value:
+            return list(default or self.default)
+        keys = list(dict.fromkeys(key.strip() for key in value.split(',') if key.strip()))
+        unknown = [key for key in keys if key not in self.fields]
+        if unknown:
+            raise ValueError(f'Unknown field(s): {", ".join(unknown)}. '
+                             f'Available: {", ".join(self.fields)}')
+        return keys
+
+    def spec(self, keys=None):
+        """Field spec for row_serializer()/serialize_rows()"""
+        return {key: self.fields[key].source for key in keys or self.default}
+
+    def loader_options(self, keys, *required):
+        """
+        Loader options that fetch only what the keys need
+
+        Args:
+            keys (list): Requested keys
+            *required: Columns the route itself reads (filters, permission checks)
+
+        Returns:
+            list: Options for Query.options()
+        """
+        columns = list(required)
+        related = {}
+        for key in keys:
+            field = self.fields[key]
+            columns.extend(field.columns)
+            for name, related_columns in field.related.items():
+                related.setdefault(name, []).extend(related_columns)
+        options = [load_only(*dict.fromkeys(columns))] if columns else []
+        # Named, since backref attributes only exist once the mappers are configured
+        for name, related_columns in related.items():
+            loader = joinedload(getattr(self.model, name))
+            options.append(loader.load_only(*dict.fromkeys(related_columns)) if related_columns else loader)
+        return options
@@ -0,0 +1,95 @@
+"""
+Utility functions for profiling application startup (import time and create_app)
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Runs in a fresh interpreter so nothing is already imported
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app(sys.argv[1])
+finished = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000,
+                  'create_app_ms': (finished - imported) * 1000}))
+"""
+
+
+def parse_importtime(output):
+    """
+    Parse the stderr of ``python -X importtime``
+
+    Args:
+        output (str): Raw stderr text
+
+    Returns:
+        list: Dicts with module, depth, self_ms and cumulative_ms, in import order
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        name = parts[2].rstrip()
+        module = name.lstrip()
+        entries.append({
+            'module': module,
+            'depth': (len(name) - len(module) - 1) // 2,
+            'self_ms': int(parts[0]) / 1000,
+            'cumulative_ms': int(parts[1]) / 1000,
+        })
+    return entries
+
+
+def summarize_imports(entries, top=20):
+    """
+    Summarize import timings by slowest modules and by top-level package
+
+    Args:
+        entries (list): Output of parse_importtime
+        top (int): Number of modules/packages to keep
+
+    Returns:
+        dict: total_ms, slowest (by cumulative time) and packages (by self time)
+    """
+    packages = {}
+    for entry in entries:
+        package = entry['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + entry['self_ms']
+
+    slowest = sorted(entries, key=lambda e: e['cumulative_ms'], reverse=True)[:top]
+    return {
+        'total_ms': sum(e['self_ms'] for e in entries),
+        'slowest': slowest,
+        'packages': sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top],
+    }
+
+
+def profile_startup(config_name, root=None):
+    """
+    Boot the application in a fresh interpreter with ``-X importtime``
+
+    Args:
+        config_name (str): Configuration to pass to create_app
+        root (str): Project root (defaults to the directory containing app/)
+
+    Returns:
+        dict: import_ms and create_app_ms wall times plus the import summary entries
+    """
+    root = root or str(Path(__file__).resolve().parents[2])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE, config_name],
+        cwd=root, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'startup failed')
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['entries'] = parse_importtime(result.stderr)
+    return timings
@@ -0,0 +1,109 @@
+"""
+Utility functions for warming up the application before it takes traffic
+"""
+import time
+
+
+def warm_up(app):
+    """
+    Pay the first-request costs up front
+
+    Configures the ORM mappers, compiles every template and runs the queries
+    behind the doctor directory and clinic settings once, so that SQLAlchemy's
+    statement cache and SQLite's page cache are populated. Warming is
+    best-effort: a step that raises is logged and the app starts cold, so a
+    missing table or a broken template never stops gunicorn's master.
+
+    Args:
+        app: The Flask application instance
+
+    Returns:
+        dict: Milliseconds spent per step (a step that failed reports None)
+    """
+    from sqlalchemy.orm import configure_mappers
+    from app.models import db, Setting
+    from app.forms.appointment.appointment import get_doctors
+
+    timings = {}
+
+    def run(name, func):
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            # e.g. tables not created yet, or a template that does not compile
+            app.logger.exception(f'Warm-up step {name} failed')
+            db.session.rollback()
+            timings[name] = None
+            return
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    with app.app_context():
+        run('mappers', configure_mappers)
+        run('templates', lambda: _compile_templates(app))
+        run('doctor_directory', get_doctors)
+        run('settings', lambda: Setting.query.all())
+        db.session.remove()
+
+    return timings
+
+
+# Template files (pages, e-mails and text messages)
+TEMPLATE_EXTENSIONS = ('html', 'txt')
+
+
+def _compile_templates(app):
+    """Load every template into the Jinja environment's cache"""
+    env = app.jinja_env
+    for name in env.list_templates(extensions=TEMPLATE_EXTENSIONS):
+        env.get_template(name)
+
+
+def precompile_templates(app, clear=False):
+    """
+    Compile every template into the bytecode cache (JINJA_BYTECODE_CACHE_DIR)
+
+    Meant for build time, so workers of a fresh deploy load compiled
+    templates from disk instead of compiling them on first use.
+
+    Args:
+        app: The Flask application instance
+        clear (bool): Empty the cache first
+
+    Returns:
+        dict: templates compiled and milliseconds taken
+
+    Raises:
+        RuntimeError: If no bytecode cache is configured
+    """
+    env = app.jinja_env
+    if env.bytecode_cache is None:
+        raise RuntimeError('JINJA_BYTECODE_CACHE_DIR is not set')
+    if clear:
+        env.bytecode_cache.clear()
+
+    started = time.perf_counter()
+    names = env.list_templates(extensions=TEMPLATE_EXTENSIONS)
+    for name in names:
+        # The loader, unlike get_template(), skips the in-memory cache and
+        # writes a cache entry for any template compiled
+        env.loader.load(env, name, env.make_globals(None))
+    return {'templates': len(names), 'ms': round((time.perf_counter() - started) * 1000, 1)}
+
+
+def dispose_engines(app, close=True):
+    """
+    Drop pooled database connections
+
+    Call with close=False right after a fork: the child discards the pool it
+    inherited without closing sockets that still belong to the parent.
+
+    Args:
+        app: The Flask application instance
+        close (bool): Whether to close the pooled connections
+    """
+    from app.models import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for Rafad Clinic System
+
+Run with ``python -m benchmarks``. See benchmarks/README.md for details.
+"""
@@ -0,0 +1,148 @@
+"""
+Benchmark runner for Rafad Clinic System
+
+Usage:
+    python -m benchmarks                       # run and compare to baseline
+    python -m benchmarks --update-baseline     # record a new baseline
+    python -m benchmarks --scale small --only api.appointments_30d
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_DIR = BENCH_DIR / '.data'
+DEFAULT_BASELINE = BENCH_DIR / 'baseline.json'
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='large', help='Dataset scale: small, medium or large')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed iterations per path')
+    parser.add_argument('--heavy-repeat', type=int, default=3,
+                        help='Timed iterations for whole-table paths')
+    parser.add_argument('--only', action='append', default=[],
+                        help='Run only the named path (may be repeated)')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+    parser.add_argument('--output', help='Also write this run\'s results to a JSON file')
+    parser.add_argument('--threshold', type=float,
+                        default=float(os.environ.get('BENCH_THRESHOLD', 25)),
+                        help='Allowed regression in percent (default: $BENCH_THRESHOLD or 25)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store this run as the new baseline instead of comparing')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the dataset from scratch')
+    return parser.parse_args(argv)
+
+
+def prepare_database(args):
+    """
+    Point the testing configuration at a dataset file, building it if needed
+
+    The file is reused between runs while the scale, seed and reference date
+    still match, since building the large scale takes a while.
+
+    Returns:
+        tuple: (app, db, summary)
+    """
+    from datetime import date
+
+    DATA_DIR.mkdir(exist_ok=True)
+    db_file = DATA_DIR / f'bench_{args.scale}_{args.seed}.sqlite'
+    meta_file = db_file.with_suffix('.json')
+
+    summary = None
+    if meta_file.exists() and db_file.exists() and not args.rebuild:
+        summary = json.loads(meta_file.read_text())
+        if summary.get('today') != date.today().isoformat():
+            summary = None
+    if summary is None and db_file.exists():
+        db_file.unlink()
+
+    # Must be set before config.py is imported
+    os.environ['TEST_DATABASE_URL'] = f'sqlite:///{db_file}'
+    sys.path.insert(0, str(BENCH_DIR.parent))
+
+    from app import create_app, db
+    from benchmarks.dataset import build_dataset
+
+    app = create_app('testing')
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['SERVER_NAME'] = 'localhost'
+
+    with app.app_context():
+        if summary is None:
+            db.create_all()
+            print(f'Building {args.scale} dataset in {db_file} ...', flush=True)
+            summary = build_dataset(db, scale=args.scale, seed=args.seed)
+            meta_file.write_text(json.dumps(summary, indent=2))
+
+    return app, db, summary
+
+
+def main(argv=None):
+    """Run the benchmarks and compare or store the baseline"""
+    args = parse_args(argv)
+    app, db, summary = prepare_database(args)
+
+    from benchmarks.harness import compare, measure
+    from benchmarks.hot_paths import build_cases
+
+    print(f"Dataset: {summary['appointments']} appointments, {summary['patients']} patients, "
+          f"{summary['doctors']} doctors ({summary['scale']})")
+
+    with app.app_context():
+        engine = db.engine
+        cases = build_cases(app, summary, heavy_repeat=args.heavy_repeat)
+
+    results = {}
+    for case in cases:
+        if args.only and case.name not in args.only:
+            continue
+        repeat = case.repeat or args.repeat
+        results[case.name] = measure(case.func, engine, repeat=repeat, warmup=case.warmup)
+        r = results[case.name]
+        print(f"{case.name:40s} median {r['median_ms']:10.2f} ms  p95 {r['p95_ms']:10.2f} ms  "
+              f"queries {r['queries']:7d}  peak {r['peak_kb']:10.1f} KiB", flush=True)
+
+    report = {'scale': summary['scale'], 'seed': summary['seed'], 'results': results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + '\n')
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        if baseline_path.exists() and args.only:
+            # Merge a partial run into the existing baseline
+            stored = json.loads(baseline_path.read_text())
+            stored['results'].update(results)
+            report['results'] = stored['results']
+        baseline_path.write_text(json.dumps(report, indent=2) + '\n')
+        print(f'Baseline written to {baseline_path}')
+        return 0
+
+    if not baseline_path.exists():
+        print(f'No baseline at {baseline_path}; run with --update-baseline first')
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get('scale') != summary['scale']:
+        print(f"Baseline was recorded at scale {baseline.get('scale')!r}; skipping comparison")
+        return 0
+
+    regressions = compare(results, baseline['results'], args.threshold)
+    if not regressions:
+        print(f'No regressions above {args.threshold}%')
+        return 0
+
+    print(f'\nRegressions above {args.threshold}%:')
+    for name, metric, old, new, change in regressions:
+        print(f'  {name:40s} {metric:10s} {old} -> {new} (+{change}%)')
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
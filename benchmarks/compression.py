@@ -0,0 +1,97 @@
+"""
+Response compression benchmark for Rafad Clinic System
+
+Fetches real responses from the benchmark dataset (the calendar feed, the
+CSV export, a reporting JSON endpoint and the admin lists). Each body is then
+compressed at several gzip and brotli levels, reporting the CPU time per
+response against the bytes saved. Use it to pick COMPRESS_LEVEL and
+COMPRESS_BR_LEVEL. Brotli rows need the optional ``brotli`` package.
+
+Usage:
+    python -m benchmarks.compression
+    python -m benchmarks.compression --scale medium --gzip-level 1 --gzip-level 6 --br-level 4
+"""
+import argparse
+import statistics
+import sys
+import time
+from argparse import Namespace
+from datetime import date, timedelta
+
+DEFAULT_GZIP_LEVELS = [1, 4, 6, 9]
+DEFAULT_BR_LEVELS = [1, 4, 6, 11]
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compression', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='small', help='Dataset scale: small, medium or large')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the dataset from scratch')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed compressions per body and level')
+    parser.add_argument('--gzip-level', type=int, action='append', default=[], help='gzip level (may be repeated)')
+    parser.add_argument('--br-level', type=int, action='append', default=[], help='brotli level (may be repeated)')
+    return parser.parse_args(argv)
+
+
+def fetch_payloads(scale, seed, rebuild=False):
+    """Return {name: body} for the large responses, fetched as the admin"""
+    from benchmarks.__main__ import prepare_database
+    from benchmarks.hot_paths import _get, _logged_in_client
+
+    app, db, summary = prepare_database(Namespace(scale=scale, seed=seed, rebuild=rebuild))
+    app.config['COMPRESS_ENABLED'] = False
+    with app.app_context():
+        from app.models import User
+        admin = _logged_in_client(app, User.query.filter_by(email=summary['admin_email']).first().id)
+
+    today = date.fromisoformat(summary['today'])
+    feed = f'/api/appointments?start={today.isoformat()}&end={(today + timedelta(days=30)).isoformat()}'
+    paths = {
+        'api.appointments_30d': feed,
+        'reporting.export_csv': '/reporting/export/csv',
+        'reporting.api_daily': '/reporting/api/appointments/daily',
+        'admin.users': '/admin/users',
+        'admin.appointments': '/admin/appointments',
+    }
+    return {name: _get(admin, path) for name, path in paths.items()}
+
+
+def measure(body, encoding, level, repeat):
+    """Median milliseconds to compress body once, and the compressed size"""
+    from app.utils.compression import BrotliCompressor, GzipCompressor
+
+    compressor_class = BrotliCompressor if encoding == 'br' else GzipCompressor
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressor = compressor_class(level)
+        data = compressor.compress(body) + compressor.finish()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(data)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    # Sets the dataset's database URL, so it must come before any app import
+    payloads = fetch_payloads(options.scale, options.seed, options.rebuild)
+    from app.utils.compression import _brotli_available
+
+    settings = [('gzip', level) for level in options.gzip_level or DEFAULT_GZIP_LEVELS]
+    if _brotli_available():
+        settings += [('br', level) for level in options.br_level or DEFAULT_BR_LEVELS]
+    else:
+        print('brotli is not installed; measuring gzip only')
+
+    print(f'{"response":<22} {"bytes":>10} {"encoding":>9} {"ms":>8} {"bytes out":>10} {"saved":>7} {"MB/s":>7}')
+    for name, body in payloads.items():
+        for encoding, level in settings:
+            ms, size = measure(body, encoding, level, options.repeat)
+            print(f'{name:<22} {len(body):>10} {f"{encoding}-{level}":>9} {ms:>8.2f} {size:>10} '
+                  f'{100 * (1 - size / len(body)):>6.1f}% {len(body) / 1000 / ms:>7.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
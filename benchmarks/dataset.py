@@ -0,0 +1,175 @@
+"""
+Synthetic dataset generator for the Rafad Clinic System benchmarks
+
+Builds a realistic clinic (doctors with weekly schedules, patients and a year
+of appointment history plus upcoming bookings) directly through SQLAlchemy
+Core bulk inserts so that even the large scale builds in seconds.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+
+from werkzeug.security import generate_password_hash
+
+# Password shared by every synthetic user (hashed once and reused)
+BENCH_PASSWORD = 'Bench@1234'
+
+# Dataset sizes, keyed by scale name
+SCALES = {
+    'small': {'doctors': 10, 'patients': 500, 'days_back': 90, 'days_ahead': 30, 'occupancy': 0.5},
+    'medium': {'doctors': 30, 'patients': 5000, 'days_back': 180, 'days_ahead': 60, 'occupancy': 0.6},
+    'large': {'doctors': 60, 'patients': 20000, 'days_back': 365, 'days_ahead': 90, 'occupancy': 0.7},
+}
+
+SPECIALIZATIONS = [
+    'General Medicine', 'Pediatrics', 'Dermatology', 'Cardiology',
+    'Orthopedics', 'Gynecology', 'Dentistry', 'Ophthalmology',
+]
+
+FIRST_NAMES = [
+    'Ahmed', 'Fatimah', 'Omar', 'Noura', 'Khalid', 'Sara', 'Faisal', 'Maha',
+    'Yousef', 'Reem', 'Abdullah', 'Lama', 'Saad', 'Huda', 'Turki', 'Amal',
+]
+
+LAST_NAMES = [
+    'Alqahtani', 'Alghamdi', 'Alzahrani', 'Aldossary', 'Alharbi', 'Alshehri',
+    'Almutairi', 'Alotaibi', 'Alanazi', 'Alsubaie', 'Alshammari', 'Alyami',
+]
+
+# Sunday to Thursday (0=Monday, 6=Sunday)
+WORKING_DAYS = (6, 0, 1, 2, 3)
+
+DAY_START = time(9, 0)
+DAY_END = time(17, 0)
+SLOT_MINUTES = 30
+
+
+def _slot_times():
+    """Return the (start, end) pairs of every slot in a working day"""
+    slots = []
+    current = datetime.combine(date.today(), DAY_START)
+    day_end = datetime.combine(date.today(), DAY_END)
+    while current + timedelta(minutes=SLOT_MINUTES) <= day_end:
+        slot_end = current + timedelta(minutes=SLOT_MINUTES)
+        slots.append((current.time(), slot_end.time()))
+        current = slot_end
+    return slots
+
+
+def build_dataset(db, scale='medium', seed=42, today=None):
+    """
+    Populate an empty database with a synthetic clinic
+
+    Args:
+        db: The Flask-SQLAlchemy instance (tables must already exist)
+        scale (str): One of the keys of SCALES
+        seed (int): Random seed so that runs are reproducible
+        today (date): Reference date for past/future appointments
+
+    Returns:
+        dict: Summary of what was generated, including login credentials
+    """
+    from app.models import User, Patient, Doctor, Schedule, Appointment
+
+    params = SCALES[scale]
+    rng = random.Random(seed)
+    today = today or date.today()
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+
+    users = [{
+        'id': 1, 'username': 'bench_admin', 'email': 'admin@bench.local',
+        'password_hash': password_hash, 'role': 'admin', 'is_active': True,
+        'created_at': now,
+    }]
+    doctors = []
+    patients = []
+    schedules = []
+
+    next_user_id = 2
+    for doctor_id in range(1, params['doctors'] + 1):
+        users.append({
+            'id': next_user_id, 'username': f'bench_doctor_{doctor_id}',
+            'email': f'doctor{doctor_id}@bench.local', 'password_hash': password_hash,
+            'role': 'doctor', 'is_active': True, 'created_at': now,
+        })
+        doctors.append({
+            'id': doctor_id, 'user_id': next_user_id,
+            'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES),
+            'specialization': SPECIALIZATIONS[doctor_id % len(SPECIALIZATIONS)],
+            'phone': f'05{rng.randint(10000000, 99999999)}', 'qualification': 'MD',
+            'experience_years': rng.randint(1, 30),
+        })
+        for day in WORKING_DAYS:
+            schedules.append({
+                'doctor_id': doctor_id, 'day_of_week': day,
+                'start_time': DAY_START, 'end_time': DAY_END, 'is_active': True,
+                'appointment_duration': SLOT_MINUTES, 'break_duration': 0,
+                'created_at': now, 'updated_at': now,
+            })
+        next_user_id += 1
+
+    for patient_id in range(1, params['patients'] + 1):
+        users.append({
+            'id': next_user_id, 'username': f'bench_patient_{patient_id}',
+            'email': f'patient{patient_id}@bench.local', 'password_hash': password_hash,
+            'role': 'patient', 'is_active': True, 'created_at': now,
+        })
+        patients.append({
+            'id': patient_id, 'user_id': next_user_id,
+            'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES),
+            'phone': f'05{rng.randint(10000000, 99999999)}',
+            'date_of_birth': date(rng.randint(1940, 2020), rng.randint(1, 12), rng.randint(1, 28)),
+            'gender': rng.choice(['male', 'female']),
+            'address': 'Dammam',
+        })
+        next_user_id += 1
+
+    # Fill each doctor's working days at the configured occupancy
+    appointments = []
+    slots = _slot_times()
+    first_day = today - timedelta(days=params['days_back'])
+    for offset in range(params['days_back'] + params['days_ahead'] + 1):
+        day = first_day + timedelta(days=offset)
+        if day.weekday() not in WORKING_DAYS:
+            continue
+        is_past = day < today
+        for doctor in doctors:
+            for start, end in slots:
+                if rng.random() >= params['occupancy']:
+                    continue
+                roll = rng.random()
+                if is_past:
+                    status = 'completed' if roll < 0.8 else ('cancelled' if roll < 0.9 else 'no_show')
+                else:
+                    status = 'scheduled' if roll < 0.9 else 'cancelled'
+                appointments.append({
+                    'patient_id': rng.randint(1, params['patients']),
+                    'doctor_id': doctor['id'], 'appointment_date': day,
+                    'start_time': start, 'end_time': end, 'status': status,
+                    'reason': 'Follow-up visit', 'notes': None,
+                    'created_at': now, 'updated_at': now,
+                })
+
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(Doctor.__table__.insert(), doctors)
+    db.session.execute(Patient.__table__.insert(), patients)
+    db.session.execute(Schedule.__table__.insert(), schedules)
+    db.session.execute(Appointment.__table__.insert(), appointments)
+    db.session.commit()
+    # Core inserts bypass the ORM hooks that maintain the per-patient counters
+    Patient.recalculate_appointment_counters()
+
+    return {
+        'scale': scale,
+        'seed': seed,
+        'today': today.isoformat(),
+        'users': len(users),
+        'doctors': len(doctors),
+        'patients': len(patients),
+        'schedules': len(schedules),
+        'appointments': len(appointments),
+        'password': BENCH_PASSWORD,
+        'admin_email': 'admin@bench.local',
+        'patient_email': 'patient1@bench.local',
+        'doctor_email': 'doctor1@bench.local',
+    }
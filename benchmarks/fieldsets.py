@@ -0,0 +1,90 @@
+"""
+Sparse fieldset benchmark for Rafad Clinic System
+
+Requests the calendar feed from the benchmark dataset with different
+``?fields=`` selections and reports latency, SQL statements, response size
+and the columns the main query selects:
+
+    default   every calendar field (no fields argument)
+    calendar  what the calendar grid shows (calendar.html)
+    minimal   id, time, status and doctor id
+
+Usage:
+    python -m benchmarks.fieldsets
+    python -m benchmarks.fieldsets --scale medium --days 90 --repeat 20
+"""
+import argparse
+import sys
+from argparse import Namespace
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+SELECTIONS = {
+    'default': None,
+    'calendar': 'id,patient_name,doctor_name,appointment_date,appointment_time,status',
+    'minimal': 'id,appointment_time,status,doctor_id',
+}
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.fieldsets', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='small', help='Dataset scale: small, medium or large')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the dataset from scratch')
+    parser.add_argument('--days', type=int, default=30, help='Days of appointments per request (max 90)')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed requests per selection')
+    return parser.parse_args(argv)
+
+
+def selected_columns(engine, request):
+    """Number of columns in the SELECT list of the appointments query one request runs"""
+    counts = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM appointments' in statement:
+            counts.append(statement.split(' FROM ', 1)[0].count(',') + 1)
+
+    event.listen(engine, 'before_cursor_execute', collect)
+    try:
+        request()
+    finally:
+        event.remove(engine, 'before_cursor_execute', collect)
+    return max(counts, default=0)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    # Sets the dataset's database URL, so it must come before any app import
+    from benchmarks.__main__ import prepare_database
+    from benchmarks.harness import measure
+    from benchmarks.hot_paths import _get, _logged_in_client
+
+    app, db, summary = prepare_database(Namespace(scale=options.scale, seed=options.seed, rebuild=options.rebuild))
+    app.config['COMPRESS_ENABLED'] = False
+    with app.app_context():
+        from app.models import User
+        admin = _logged_in_client(app, User.query.filter_by(email=summary['admin_email']).first().id)
+        engine = db.engine
+
+    today = date.fromisoformat(summary['today'])
+    url = f'/api/appointments?start={today}&end={today + timedelta(days=options.days)}'
+
+    print(f'{options.days}-day calendar feed, {summary["scale"]} dataset')
+    print(f'{"fields":<10} {"median ms":>10} {"p95 ms":>8} {"queries":>8} {"columns":>8} {"bytes":>10}')
+    for name, fields in SELECTIONS.items():
+        target = f'{url}&fields={fields}' if fields else url
+
+        def request():
+            return _get(admin, target)
+
+        result = measure(request, engine, repeat=options.repeat)
+        print(f'{name:<10} {result["median_ms"]:>10.1f} {result["p95_ms"]:>8.1f} {result["queries"]:>8} '
+              f'{selected_columns(engine, request):>8} {len(request()):>10}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
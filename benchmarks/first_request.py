@@ -0,0 +1,122 @@
+"""
+First-request latency benchmark for Rafad Clinic System
+
+Boots the application in a fresh interpreter per mode and times the first
+and second request to a few pages, the way a newly forked gunicorn worker
+would serve them:
+
+    cold      no bytecode cache, templates compiled on first use
+    bytecode  templates loaded from a bytecode cache filled by precompile
+    warm-up   warm_up() at boot (as gunicorn does), then serve
+    both      warm_up() at boot with the precompiled bytecode cache
+
+Usage:
+    python -m benchmarks.first_request
+    python -m benchmarks.first_request --runs 5 --path /auth/login
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_PATHS = ['/', '/auth/login', '/auth/register', '/about']
+
+MODES = ('cold', 'bytecode', 'warm-up', 'both')
+
+# Runs in a fresh interpreter so no template is compiled yet
+_PROBE = """
+import json, sys, time
+from app import create_app
+from app.models import db
+paths, warm = json.loads(sys.argv[1]), sys.argv[2] == '1'
+app = create_app('production')
+app.config['SERVER_NAME'] = 'localhost'
+with app.app_context():
+    db.create_all()
+boot = 0.0
+if warm:
+    from app.utils.warmup import warm_up
+    started = time.perf_counter()
+    warm_up(app)
+    boot = (time.perf_counter() - started) * 1000
+client = app.test_client()
+result = {'boot_ms': boot, 'first_ms': {}, 'second_ms': {}}
+for key in ('first_ms', 'second_ms'):
+    for path in paths:
+        started = time.perf_counter()
+        status = client.get(path).status_code
+        result[key][path] = (time.perf_counter() - started) * 1000
+        assert status < 500, (path, status)
+print(json.dumps(result))
+"""
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.first_request', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', action='append', default=[], help='Page to request (may be repeated)')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh processes per mode (median is reported)')
+    return parser.parse_args(argv)
+
+
+def probe(paths, cache_dir, warm):
+    """Run one fresh process and return its timings"""
+    env = dict(os.environ, DATABASE_URL='sqlite://', JINJA_BYTECODE_CACHE_DIR=cache_dir or '')
+    output = subprocess.run([sys.executable, '-c', _PROBE, json.dumps(paths), '1' if warm else '0'],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def precompile(cache_dir):
+    """Fill a bytecode cache the way `flask precompile-templates` does"""
+    env = dict(os.environ, DATABASE_URL='sqlite://', JINJA_BYTECODE_CACHE_DIR=cache_dir)
+    subprocess.run([sys.executable, '-c',
+                    "from app import create_app\n"
+                    "from app.utils.warmup import precompile_templates\n"
+                    "print(precompile_templates(create_app('production')))"],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+
+
+def measure(mode, paths, runs):
+    """Median boot, first and second request milliseconds for a mode"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cached = mode in ('bytecode', 'both')
+        if cached:
+            precompile(cache_dir)
+        results = [probe(paths, cache_dir if cached else None, mode in ('warm-up', 'both'))
+                   for _ in range(runs)]
+
+    def median(key, path=None):
+        return statistics.median(r[key][path] if path else r[key] for r in results)
+
+    return {
+        'boot_ms': median('boot_ms'),
+        'first_ms': {path: median('first_ms', path) for path in paths},
+        'second_ms': {path: median('second_ms', path) for path in paths},
+    }
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    paths = options.path or DEFAULT_PATHS
+
+    print(f'{"mode":<10} {"boot ms":>8} ' + ' '.join(f'{path:>16}' for path in paths))
+    for mode in MODES:
+        result = measure(mode, paths, options.runs)
+        firsts = ' '.join(f'{result["first_ms"][path]:>16.1f}' for path in paths)
+        print(f'{mode:<10} {result["boot_ms"]:>8.1f} {firsts}')
+    result = measure('cold', paths, 1)
+    seconds = ' '.join(f'{result["second_ms"][path]:>16.1f}' for path in paths)
+    print(f'{"(second)":<10} {"":>8} {seconds}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
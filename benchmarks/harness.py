@@ -0,0 +1,127 @@
+"""
+Measurement helpers for the Rafad Clinic System benchmarks
+"""
+import gc
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Count SQL statements executed on an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+def percentile(samples, pct):
+    """
+    Return the given percentile of a list of samples (nearest-rank method)
+
+    Args:
+        samples (list): Measured values
+        pct (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def measure(func, engine, repeat=10, warmup=1):
+    """
+    Time a callable and record its query count and peak memory
+
+    Timing is done first; query counting and memory tracing then share one
+    extra instrumented call so that tracemalloc overhead does not distort
+    the timings.
+
+    Args:
+        func: Zero-argument callable exercising the hot path
+        engine: SQLAlchemy engine whose statements are counted
+        repeat (int): Number of timed iterations
+        warmup (int): Untimed iterations run first
+
+    Returns:
+        dict: median_ms, p95_ms, queries, peak_kb and samples
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with QueryCounter(engine) as counter:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'queries': counter.count,
+        'peak_kb': round(peak / 1024.0, 1),
+        'samples': len(samples),
+    }
+
+
+def compare(results, baseline, threshold_pct):
+    """
+    Compare fresh results against a stored baseline
+
+    A path regresses when its median time, query count or peak memory grows
+    by more than ``threshold_pct`` percent over the baseline value.
+
+    Args:
+        results (dict): Mapping of benchmark name to measure() output
+        baseline (dict): Mapping of benchmark name to stored measurements
+        threshold_pct (float): Allowed growth in percent
+
+    Returns:
+        list: (name, metric, baseline_value, current_value, change_pct) tuples
+              for every regression found
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in ('median_ms', 'queries', 'peak_kb'):
+            old = previous.get(metric)
+            new = current.get(metric)
+            if old is None or new is None:
+                continue
+            if old == 0:
+                change = 0.0 if new == 0 else float('inf')
+            else:
+                change = (new - old) / old * 100.0
+            if change > threshold_pct:
+                regressions.append((name, metric, old, new, round(change, 1)))
+    return regressions
@@ -0,0 +1,70 @@
+"""
+Password hashing benchmark for Rafad Clinic System
+
+Measures how many password verifications (the CPU cost of one login) a
+single core can do for each hash method, and how that scales across
+processes. Use it to pick PASSWORD_HASH_METHOD and
+PASSWORD_VERIFY_CONCURRENCY for a machine.
+
+Usage:
+    python -m benchmarks.hashing
+    python -m benchmarks.hashing --method pbkdf2:sha256:600000 --method scrypt --processes 4
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHODS = ['pbkdf2:sha256:1000', 'pbkdf2:sha256:260000', 'pbkdf2:sha256:600000', 'scrypt']
+
+PASSWORD = 'Bench@1234'
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.hashing', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--method', action='append', default=[],
+                        help='Hash method to measure (may be repeated)')
+    parser.add_argument('--seconds', type=float, default=2.0, help='Measuring time per method and mode')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(),
+                        help='Processes for the parallel run (default: CPU count)')
+    return parser.parse_args(argv)
+
+
+def verifications(password_hash, seconds):
+    """Verify the password repeatedly for about ``seconds``; return the count"""
+    deadline = time.perf_counter() + seconds
+    done = 0
+    while time.perf_counter() < deadline:
+        check_password_hash(password_hash, PASSWORD)
+        done += 1
+    return done
+
+
+def measure(method, seconds, processes):
+    """
+    Return (per core, all processes) verifications per second for a method
+    """
+    password_hash = generate_password_hash(PASSWORD, method=method)
+    single = verifications(password_hash, seconds) / seconds
+    with multiprocessing.Pool(processes) as pool:
+        counts = pool.starmap(verifications, [(password_hash, seconds)] * processes)
+    return single, sum(counts) / seconds
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    methods = options.method or DEFAULT_METHODS
+
+    print(f'{"method":<24} {"ms/login":>9} {"logins/s/core":>14} {f"logins/s x{options.processes}":>16}')
+    for method in methods:
+        single, parallel = measure(method, options.seconds, options.processes)
+        print(f'{method:<24} {1000 / single:>9.1f} {single:>14.1f} {parallel:>16.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Hot path definitions for the Rafad Clinic System benchmarks
+
+Each case is a zero-argument callable. Model-level cases push their own
+application context per call, and route cases go through the Flask test
+client (which does the same per request) so that user loading, routing,
+template rendering and serialisation are all included in the timings.
+"""
+from datetime import date, time, timedelta
+
+
+class Case:
+    """A single named benchmark"""
+
+    def __init__(self, name, func, repeat=None, warmup=1):
+        self.name = name
+        self.func = func
+        self.repeat = repeat
+        self.warmup = warmup
+
+
+def _next_working_day(start, working_days):
+    """Return the first date on or after ``start`` that falls on a working day"""
+    day = start
+    while day.weekday() not in working_days:
+        day += timedelta(days=1)
+    return day
+
+
+def _logged_in_client(app, user_id):
+    """Return a test client with a Flask-Login session for the given user"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def _get(client, url):
+    """Issue a GET request and fail loudly on anything but a 200"""
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f'GET {url} returned {response.status_code}')
+    # Consume the body so streamed responses are fully produced
+    return response.get_data()
+
+
+def build_cases(app, summary, heavy_repeat=3):
+    """
+    Build the list of benchmark cases for the current dataset
+
+    Must be called inside an application context; the returned cases must be
+    run outside of it so that every call gets a fresh context and session.
+
+    Args:
+        app: The Flask application under test
+        summary (dict): Output of benchmarks.dataset.build_dataset
+        heavy_repeat (int): Iterations for whole-table paths (exports, admin lists),
+            which also skip the warm-up call
+
+    Returns:
+        list: Case instances
+    """
+    from app.models import User, Patient
+    from app.models.schedule import Schedule
+    from app.models.appointment import Appointment
+    from app.utils.appointment_validator import validate_appointment_request
+    from benchmarks.dataset import WORKING_DAYS
+
+    today = date.fromisoformat(summary['today'])
+    booking_day = _next_working_day(today + timedelta(days=7), WORKING_DAYS)
+    doctor_ids = list(range(1, summary['doctors'] + 1))
+    admin_id = User.query.filter_by(email=summary['admin_email']).first().id
+    admin = _logged_in_client(app, admin_id)
+    # The dashboard is measured for the patient with the longest history
+    busiest = Patient.query.order_by(
+        (Patient.upcoming_count + Patient.completed_count + Patient.cancelled_count
+         + Patient.no_show_count).desc()).first()
+    patient = _logged_in_client(app, busiest.user_id)
+    doctor = _logged_in_client(app, User.query.filter_by(email=summary['doctor_email']).first().id)
+
+    state = {'doctor': 0}
+
+    def next_doctor():
+        state['doctor'] = (state['doctor'] + 1) % len(doctor_ids)
+        return doctor_ids[state['doctor']]
+
+    def available_slots():
+        with app.app_context():
+            Schedule.get_available_slots(next_doctor(), booking_day)
+
+    def check_availability():
+        with app.app_context():
+            Appointment.check_availability(next_doctor(), booking_day, '10:00')
+
+    def validate_request():
+        with app.app_context():
+            validate_appointment_request(next_doctor(), booking_day, time(10, 0))
+
+    def api_range(days):
+        start = today.isoformat()
+        end = (today + timedelta(days=days)).isoformat()
+        return lambda: _get(admin, f'/api/appointments?start={start}&end={end}')
+
+    def login():
+        client = app.test_client()
+        response = client.post('/auth/login', data={
+            'email': summary['patient_email'],
+            'password': summary['password'],
+            'role': 'patient',
+        })
+        if response.status_code != 302:
+            raise RuntimeError(f'login returned {response.status_code}')
+
+    return [
+        Case('schedule.get_available_slots', available_slots),
+        Case('appointment.check_availability', check_availability),
+        Case('validate_appointment_request', validate_request),
+        Case('api.appointments_30d', api_range(30)),
+        Case('api.appointments_90d', api_range(90)),
+        Case('reporting.export_csv', lambda: _get(admin, '/reporting/export/csv'), repeat=heavy_repeat, warmup=0),
+        Case('reporting.api_appointments_daily', lambda: _get(admin, '/reporting/api/appointments/daily')),
+        Case('reporting.api_appointments_status', lambda: _get(admin, '/reporting/api/appointments/status')),
+        Case('reporting.api_doctor_utilization', lambda: _get(admin, '/reporting/api/doctor/utilization?period=month')),
+        Case('reporting.api_by_specialization', lambda: _get(admin, '/reporting/api/appointments/by-specialization')),
+        Case('admin.users', lambda: _get(admin, '/admin/users'), repeat=heavy_repeat, warmup=0),
+        Case('admin.doctors', lambda: _get(admin, '/admin/doctors')),
+        Case('admin.patients', lambda: _get(admin, '/admin/patients'), repeat=heavy_repeat, warmup=0),
+        Case('admin.appointments', lambda: _get(admin, '/admin/appointments'), repeat=heavy_repeat, warmup=0),
+        Case('patient.dashboard', lambda: _get(patient, '/patient/dashboard')),
+        Case('doctor.dashboard', lambda: _get(doctor, '/doctor/dashboard')),
+        Case('doctor.day_sheet', lambda: _get(doctor, '/doctor/day-sheet')),
+        Case('auth.login', login),
+    ]
@@ -0,0 +1,615 @@
+"""
+HTTP load test harness for Rafad Clinic System
+
+Drives a running server (or one it starts itself) with virtual users that
+follow role-based journeys built from the existing routes:
+
+- patient: log in, search available slots, book an appointment, cancel it
+- receptionist (front desk, uses the admin account): browse the appointment
+  list, open the calendar and load its data feed
+- doctor: log in and open the dashboard
+
+Only the standard library is used: a small asyncio HTTP/1.1 client keeps a
+cookie jar per virtual user, so no third-party HTTP client is needed.
+
+Usage:
+    python -m benchmarks.loadtest --prepare small --start-server --profile ramp
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --stages 30:10,60:40
+    python -m benchmarks.loadtest ... --json report.json --csv steps.csv --compare old.json
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+
+# Ramp-up profiles: list of (stage duration in seconds, target virtual users).
+# Users are ramped linearly from the previous target to the stage target.
+PROFILES = {
+    'smoke': [(10, 2)],
+    'steady': [(10, 20), (60, 20)],
+    'ramp': [(30, 10), (30, 25), (30, 50), (30, 50)],
+    'spike': [(20, 10), (5, 80), (30, 80), (10, 10), (20, 10)],
+}
+
+DEFAULT_MIX = {'patient': 6, 'receptionist': 3, 'doctor': 1}
+
+CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+VIEW_RE = re.compile(r'/appointment/view/(\d+)')
+
+
+class HttpError(Exception):
+    """Raised when a request fails at the transport level"""
+
+
+class HttpClient:
+    """
+    Minimal asyncio HTTP/1.1 client with keep-alive and a cookie jar
+
+    One instance per virtual user, so cookies model a browser session.
+    """
+
+    def __init__(self, host, port, timeout=30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookies = {}
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        """Close the underlying connection"""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+
+    def _store_cookies(self, headers):
+        for name, value in headers:
+            if name != 'set-cookie':
+                continue
+            pair = value.split(';', 1)[0]
+            key, _, val = pair.partition('=')
+            expired = 'max-age=0' in value.lower() or '1970' in value
+            if expired or not val:
+                self.cookies.pop(key.strip(), None)
+            else:
+                self.cookies[key.strip()] = val.strip()
+
+    async def _read_response(self):
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise HttpError('connection closed by server')
+        status = int(status_line.split()[1])
+
+        headers = []
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.append((name.strip().lower(), value.strip()))
+        header_map = dict(headers)
+
+        if header_map.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in header_map:
+            body = await self._reader.readexactly(int(header_map['content-length']))
+        else:
+            body = await self._reader.read()
+            header_map['connection'] = 'close'
+
+        return status, headers, header_map, body
+
+    async def request(self, method, path, data=None):
+        """
+        Send a request and return (status, headers, body)
+
+        Args:
+            method (str): HTTP method
+            path (str): Path including query string
+            data (dict): Optional form data (sent url-encoded)
+
+        Returns:
+            tuple: (status code, lower-cased header dict, body bytes)
+        """
+        body = urlencode(data).encode() if data is not None else b''
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Connection: keep-alive',
+            'User-Agent: rafad-loadtest',
+        ]
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{k}={v}' for k, v in self.cookies.items()))
+        if data is not None:
+            lines.append('Content-Type: application/x-www-form-urlencoded')
+            lines.append(f'Content-Length: {len(body)}')
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+        # Retry once on a stale keep-alive connection
+        for attempt in range(2):
+            reused = self._writer is not None
+            try:
+                if self._writer is None:
+                    await self._connect()
+                self._writer.write(payload)
+                await self._writer.drain()
+                status, headers, header_map, resp_body = await asyncio.wait_for(
+                    self._read_response(), self.timeout)
+                break
+            except (ConnectionError, OSError, HttpError, asyncio.IncompleteReadError) as e:
+                await self.close()
+                if not reused or attempt:
+                    raise HttpError(str(e) or type(e).__name__)
+            except asyncio.TimeoutError:
+                await self.close()
+                raise HttpError('timeout')
+
+        self._store_cookies(headers)
+        if header_map.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, header_map, resp_body
+
+
+class Recorder:
+    """Collects per-step latencies and outcomes"""
+
+    def __init__(self):
+        self.steps = {}
+        self.journeys = {}
+        self.timeline = {}
+        self.started = time.perf_counter()
+
+    def record(self, step, latency_ms, ok, error=None):
+        entry = self.steps.setdefault(step, {'latencies': [], 'errors': 0, 'error_kinds': {}})
+        entry['latencies'].append(latency_ms)
+        if not ok:
+            entry['errors'] += 1
+            kind = error or 'unexpected response'
+            entry['error_kinds'][kind] = entry['error_kinds'].get(kind, 0) + 1
+        second = int(time.perf_counter() - self.started)
+        self.timeline[second] = self.timeline.get(second, 0) + 1
+
+    def journey_done(self, role, ok):
+        entry = self.journeys.setdefault(role, {'completed': 0, 'failed': 0})
+        entry['completed' if ok else 'failed'] += 1
+
+
+class StepFailed(Exception):
+    """Raised inside a journey to abandon the current iteration"""
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class VirtualUser:
+    """A simulated user that repeats its role's journey until stopped"""
+
+    def __init__(self, role, account, host, port, recorder, options, rng):
+        self.role = role
+        self.account = account
+        self.client = HttpClient(host, port, timeout=options.timeout)
+        self.recorder = recorder
+        self.options = options
+        self.rng = rng
+        self.stopping = False
+
+    async def step(self, name, method, path, data=None, expect=(200,)):
+        started = time.perf_counter()
+        try:
+            status, headers, body = await self.client.request(method, path, data)
+        except HttpError as e:
+            self.recorder.record(name, (time.perf_counter() - started) * 1000.0, False, str(e))
+            raise StepFailed(name)
+        latency = (time.perf_counter() - started) * 1000.0
+        ok = status in expect
+        self.recorder.record(name, latency, ok, None if ok else f'HTTP {status}')
+        if not ok:
+            raise StepFailed(name)
+        return status, headers, body
+
+    async def think(self):
+        if self.options.think_ms:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.options.think_ms / 1000.0)
+
+    async def login(self):
+        _, _, body = await self.step('login.form', 'GET', '/auth/login')
+        match = CSRF_RE.search(body.decode('utf-8', 'replace'))
+        form = {
+            'email': self.account['email'],
+            'password': self.account['password'],
+            'role': self.account['login_role'],
+            'submit': 'Sign In',
+        }
+        if match:
+            form['csrf_token'] = match.group(1)
+        await self.step('login.submit', 'POST', '/auth/login', form, expect=(302,))
+
+    async def logout(self):
+        await self.step('logout', 'GET', '/auth/logout', expect=(302,))
+        self.client.cookies.clear()
+
+    async def patient_journey(self):
+        await self.login()
+        await self.think()
+
+        doctor_id = self.rng.randint(1, self.options.doctors)
+        day = date.today() + timedelta(days=self.rng.randint(1, 30))
+        await self.step('slots.page', 'GET',
+                        f'/appointment/available-slots?doctor_id={doctor_id}&date={day.isoformat()}')
+        _, _, body = await self.step(
+            'slots.api', 'GET', f'/api/available-slots?doctor_id={doctor_id}&date={day.isoformat()}')
+        slots = json.loads(body or b'{}').get('slots', [])
+        await self.think()
+
+        if slots:
+            slot = self.rng.choice(slots)
+            query = urlencode({'doctor_id': doctor_id, 'date': day.isoformat(), 'time': slot})
+            _, _, body = await self.step('book.form', 'GET', f'/appointment/create?{query}')
+            match = CSRF_RE.search(body.decode('utf-8', 'replace'))
+            form = {
+                'patient_id': self.account['profile_id'],
+                'doctor_id': doctor_id,
+                'appointment_date': day.isoformat(),
+                'appointment_time': slot,
+                'reason': 'Load test visit',
+                'status': 'scheduled',
+                'notes': '',
+            }
+            if match:
+                form['csrf_token'] = match.group(1)
+            # A 200 means the form was re-rendered with an error (e.g. the
+            # slot was taken by another virtual user in the meantime)
+            _, headers, _ = await self.step('book.submit', 'POST', '/appointment/create', form,
+                                            expect=(302,))
+            appointment = VIEW_RE.search(headers.get('location', ''))
+            await self.think()
+            if appointment:
+                await self.step('cancel', 'POST', f'/appointment/update-status/{appointment.group(1)}',
+                                {'status': 'cancelled'}, expect=(302,))
+        await self.logout()
+
+    async def receptionist_journey(self):
+        await self.login()
+        await self.think()
+        for page in range(1, 3):
+            await self.step('appointments.list', 'GET', f'/appointment/list?page={page}')
+            await self.think()
+        await self.step('calendar.page', 'GET', '/appointment/calendar')
+        start = date.today() - timedelta(days=date.today().weekday())
+        end = start + timedelta(days=34)
+        await self.step('calendar.feed', 'GET',
+                        f'/api/appointments?start={start.isoformat()}&end={end.isoformat()}')
+        await self.think()
+        await self.logout()
+
+    async def doctor_journey(self):
+        await self.login()
+        await self.think()
+        for _ in range(2):
+            await self.step('doctor.dashboard', 'GET', '/doctor/dashboard')
+            await self.think()
+        await self.logout()
+
+    async def run(self):
+        journey = getattr(self, f'{self.role}_journey')
+        try:
+            while not self.stopping:
+                try:
+                    await journey()
+                    self.recorder.journey_done(self.role, True)
+                except StepFailed:
+                    self.recorder.journey_done(self.role, False)
+                    self.client.cookies.clear()
+                    await self.client.close()
+        finally:
+            await self.client.close()
+
+
+def _accounts(role, index, options):
+    """Return login details for the n-th virtual user of a role"""
+    if role == 'patient':
+        n = index % options.patients + 1
+        return {'email': f'patient{n}@bench.local', 'login_role': 'patient', 'profile_id': n,
+                'password': options.password}
+    if role == 'doctor':
+        n = index % options.doctors + 1
+        return {'email': f'doctor{n}@bench.local', 'login_role': 'doctor', 'profile_id': n,
+                'password': options.password}
+    return {'email': 'admin@bench.local', 'login_role': 'admin', 'profile_id': None,
+            'password': options.password}
+
+
+async def run_load(options, stages, mix):
+    """
+    Run the configured stages and return the recorder
+
+    Every 0.5 s the controller interpolates the target user count for the
+    current stage and starts or stops virtual users to match it. Roles are
+    assigned in proportion to the configured mix.
+    """
+    recorder = Recorder()
+    rng = random.Random(options.seed)
+    # Interleave roles in proportion to their weights (p, r, p, p, d, ...)
+    roles = [role for _, role in sorted(
+        ((k + 0.5) / weight, role) for role, weight in mix.items() for k in range(weight))]
+    users = []
+    tasks = []
+    counters = {}
+    active_samples = []
+
+    previous_target = 0
+    started = time.perf_counter()
+    for duration, target in stages:
+        stage_start = time.perf_counter()
+        while True:
+            elapsed = time.perf_counter() - stage_start
+            if elapsed >= duration:
+                break
+            wanted = round(previous_target + (target - previous_target) * min(1.0, elapsed / max(duration, 1e-6)))
+            while len(users) < wanted:
+                role = roles[len(users) % len(roles)]
+                index = counters.get(role, 0)
+                counters[role] = index + 1
+                user = VirtualUser(role, _accounts(role, index, options), options.host, options.port,
+                                   recorder, options, random.Random(rng.random()))
+                users.append(user)
+                tasks.append(asyncio.ensure_future(user.run()))
+            while len(users) > wanted:
+                users.pop().stopping = True
+                tasks.pop()
+            active_samples.append((round(time.perf_counter() - started, 1), len(users)))
+            await asyncio.sleep(0.5)
+        previous_target = target
+
+    for user in users:
+        user.stopping = True
+    # Let in-flight journeys finish their current step
+    await asyncio.sleep(0)
+    pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    if pending:
+        await asyncio.wait(pending, timeout=options.timeout)
+    recorder.duration = time.perf_counter() - started
+    recorder.active_samples = active_samples
+    return recorder
+
+
+def build_report(recorder, options, stages, mix):
+    """Summarise a recorder into a JSON-serialisable report"""
+    steps = {}
+    total_requests = 0
+    total_errors = 0
+    for name, entry in sorted(recorder.steps.items()):
+        latencies = entry['latencies']
+        total_requests += len(latencies)
+        total_errors += entry['errors']
+        steps[name] = {
+            'count': len(latencies),
+            'errors': entry['errors'],
+            'error_rate': round(entry['errors'] / len(latencies), 4) if latencies else 0.0,
+            'error_kinds': entry['error_kinds'],
+            'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            'p50_ms': round(_percentile(latencies, 50), 2),
+            'p90_ms': round(_percentile(latencies, 90), 2),
+            'p95_ms': round(_percentile(latencies, 95), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies), 2) if latencies else 0.0,
+        }
+    duration = max(recorder.duration, 1e-6)
+    return {
+        'label': options.label,
+        'base_url': f'http://{options.host}:{options.port}',
+        'stages': stages,
+        'mix': mix,
+        'duration_s': round(duration, 2),
+        'requests': total_requests,
+        'errors': total_errors,
+        'error_rate': round(total_errors / total_requests, 4) if total_requests else 0.0,
+        'throughput_rps': round(total_requests / duration, 2),
+        'journeys': recorder.journeys,
+        'steps': steps,
+        'timeline': [{'second': s, 'requests': n} for s, n in sorted(recorder.timeline.items())],
+        'active_users': [{'second': s, 'users': n} for s, n in recorder.active_samples],
+    }
+
+
+def write_csv(report, path):
+    """Write one row per step for spreadsheet comparison between builds"""
+    fields = ['label', 'step', 'count', 'errors', 'error_rate', 'mean_ms',
+              'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for name, step in report['steps'].items():
+            row = {key: step[key] for key in fields if key in step}
+            row.update({'label': report['label'], 'step': name})
+            writer.writerow(row)
+
+
+def print_report(report, previous=None):
+    """Print a human-readable summary, optionally against a previous report"""
+    print(f"\n{report['label']}: {report['requests']} requests in {report['duration_s']} s "
+          f"-> {report['throughput_rps']} req/s, error rate {report['error_rate'] * 100:.2f}%")
+    for role, counts in sorted(report['journeys'].items()):
+        print(f"  {role:14s} journeys completed {counts['completed']:6d}  failed {counts['failed']:6d}")
+    print(f"\n  {'step':22s} {'count':>7s} {'err%':>6s} {'p50':>9s} {'p90':>9s} {'p95':>9s} {'p99':>9s}")
+    for name, step in report['steps'].items():
+        line = (f"  {name:22s} {step['count']:7d} {step['error_rate'] * 100:6.2f} "
+                f"{step['p50_ms']:9.1f} {step['p90_ms']:9.1f} {step['p95_ms']:9.1f} {step['p99_ms']:9.1f}")
+        old = (previous or {}).get('steps', {}).get(name)
+        if old and old['p95_ms']:
+            line += f"   p95 {((step['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100):+.1f}%"
+        print(line)
+    if previous:
+        change = (report['throughput_rps'] - previous['throughput_rps']) / max(previous['throughput_rps'], 1e-6)
+        print(f"\n  throughput vs {previous.get('label')}: {change * 100:+.1f}%")
+
+
+def prepare_database(scale, path):
+    """Build a synthetic dataset for the server under test"""
+    sys.path.insert(0, str(ROOT_DIR))
+    os.environ['TEST_DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app, db
+    from benchmarks.dataset import build_dataset
+
+    if os.path.exists(path):
+        os.unlink(path)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        summary = build_dataset(db, scale=scale)
+    return summary
+
+
+def start_server(options, db_path):
+    """Start gunicorn on the target port with the prepared database"""
+    env = dict(os.environ)
+    env.update({
+        'FLASK_CONFIG': 'production',
+        'DATABASE_URL': f'sqlite:///{db_path}',
+        'SECRET_KEY': env.get('SECRET_KEY', 'loadtest-secret'),
+    })
+    cmd = ['gunicorn', 'run:app', '--bind', f'{options.host}:{options.port}']
+    cmd += options.server_args.split() if options.server_args else []
+    process = subprocess.Popen(cmd, cwd=str(ROOT_DIR), env=env)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((options.host, options.port), timeout=1):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit(f'server exited with code {process.returncode}')
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('server did not start within 30 s')
+
+
+def parse_stages(value):
+    """Parse "30:10,60:40" into [(30, 10), (60, 40)]"""
+    stages = []
+    for part in value.split(','):
+        duration, _, users = part.partition(':')
+        stages.append((float(duration), int(users)))
+    return stages
+
+
+def parse_mix(value):
+    """Parse "patient=6,receptionist=3,doctor=1" into a weight dict"""
+    mix = {}
+    for part in value.split(','):
+        role, _, weight = part.partition('=')
+        if role not in DEFAULT_MIX:
+            raise SystemExit(f'unknown role {role!r}')
+        if int(weight) > 0:
+            mix[role] = int(weight)
+    return mix
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8765', help='Server to test')
+    parser.add_argument('--profile', default='steady', choices=sorted(PROFILES),
+                        help='Named ramp-up profile')
+    parser.add_argument('--stages', help='Custom stages "seconds:users,..." (overrides --profile)')
+    parser.add_argument('--mix', default='patient=6,receptionist=3,doctor=1',
+                        help='Role weights for the virtual users')
+    parser.add_argument('--think-ms', type=float, default=500.0,
+                        help='Mean think time between steps (0 for closed-loop stress)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--password', default='Bench@1234', help='Password of the synthetic users')
+    parser.add_argument('--doctors', type=int, help='Number of doctors in the dataset')
+    parser.add_argument('--patients', type=int, help='Number of patients in the dataset')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--prepare', metavar='SCALE',
+                        help='Build a synthetic dataset (small/medium/large) before running')
+    parser.add_argument('--db', default=str(BENCH_DIR / '.data' / 'loadtest.sqlite'),
+                        help='Database file used with --prepare/--start-server')
+    parser.add_argument('--start-server', action='store_true',
+                        help='Start gunicorn (run:app) on --base-url for the duration of the test')
+    parser.add_argument('--server-args', default='',
+                        help='Extra gunicorn arguments, e.g. "--workers 4 --threads 2"')
+    parser.add_argument('--label', default='run', help='Name of this run in reports')
+    parser.add_argument('--json', help='Write the full report to this JSON file')
+    parser.add_argument('--csv', help='Write per-step results to this CSV file')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    options = parser.parse_args(argv)
+
+    url = urlsplit(options.base_url)
+    options.host = url.hostname or '127.0.0.1'
+    options.port = url.port or 80
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    stages = parse_stages(options.stages) if options.stages else PROFILES[options.profile]
+    mix = parse_mix(options.mix)
+
+    # Flask-SQLAlchemy resolves relative SQLite paths against the instance folder
+    options.db = str(Path(options.db).resolve())
+
+    summary = {}
+    if options.prepare:
+        Path(options.db).parent.mkdir(parents=True, exist_ok=True)
+        print(f'Building {options.prepare} dataset in {options.db} ...', flush=True)
+        summary = prepare_database(options.prepare, options.db)
+    options.doctors = options.doctors or summary.get('doctors') or 10
+    options.patients = options.patients or summary.get('patients') or 500
+
+    server = start_server(options, options.db) if options.start_server else None
+    try:
+        recorder = asyncio.run(run_load(options, stages, mix))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    report = build_report(recorder, options, stages, mix)
+    previous = json.loads(Path(options.compare).read_text()) if options.compare else None
+    print_report(report, previous)
+    if options.json:
+        Path(options.json).write_text(json.dumps(report, indent=2) + '\n')
+    if options.csv:
+        write_csv(report, options.csv)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+JSON serialization benchmark for Rafad Clinic System
+
+Times how long it takes to turn a calendar payload into a JSON response
+body. The payload has the /api/appointments shape, built from in-memory
+appointment objects so only serialization is measured:
+
+    before    hand-written dict per row with isoformat()/strftime(), stdlib json
+    stdlib    row serializer + AppJSONProvider on the json module
+    orjson    row serializer + AppJSONProvider on orjson (if installed)
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 50000 --repeat 10
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+STATUSES = ('scheduled', 'completed', 'cancelled', 'no_show')
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help='Appointments in the payload')
+    parser.add_argument('--repeat', type=int, default=7, help='Timed runs per mode (median is reported)')
+    return parser.parse_args(argv)
+
+
+def make_appointments(count):
+    """Appointment-like objects with the attributes the calendar feed reads"""
+    doctors = [SimpleNamespace(id=i, full_name=f'Dr. Doctor {i}') for i in range(1, 31)]
+    patients = [SimpleNamespace(id=i, full_name=f'Patient Number {i}') for i in range(1, 2001)]
+    start = date(2026, 1, 4)
+    rows = []
+    for i in range(count):
+        doctor, patient = doctors[i % len(doctors)], patients[(i * 7) % len(patients)]
+        slot = datetime(2026, 1, 1, 9) + timedelta(minutes=30 * (i % 16))
+        rows.append(SimpleNamespace(
+            id=i + 1, patient=patient, patient_id=patient.id, doctor=doctor, doctor_id=doctor.id,
+            appointment_date=start + timedelta(days=i // 480), start_time=slot.time(),
+            status=STATUSES[i % len(STATUSES)], reason='Follow-up visit' if i % 3 else None,
+        ))
+    return rows
+
+
+def before_rows(rows):
+    """The per-endpoint formatting loop the row serializer replaced"""
+    formatted = []
+    for appointment in rows:
+        patient = appointment.patient
+        doctor = appointment.doctor
+        formatted.append({
+            'id': appointment.id,
+            'patient_id': patient.id,
+            'patient_name': patient.full_name,
+            'doctor_id': doctor.id,
+            'doctor_name': doctor.full_name,
+            'appointment_date': appointment.appointment_date.isoformat(),
+            'appointment_time': appointment.start_time.strftime('%H:%M'),
+            'status': appointment.status,
+            'reason': appointment.reason
+        })
+    return formatted
+
+
+def before_encode(payload):
+    """Flask's default provider: stdlib json, sorted keys, compact separators"""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+
+
+def with_provider(app, backend):
+    """The current code path (row serializer, AppJSONProvider) for a backend"""
+    from app.routes.api.appointment import APPOINTMENT_FIELDS, CALENDAR_FIELDS
+    from app.utils.serialization import AppJSONProvider, serialize_rows
+
+    app.config['JSON_BACKEND'] = backend
+    provider = AppJSONProvider(app)
+
+    def encode(payload):
+        with app.app_context():
+            return provider.response(payload).get_data()
+
+    return (lambda rows: serialize_rows(rows, APPOINTMENT_FIELDS.spec(CALENDAR_FIELDS))), encode
+
+
+def timed(func, arg, repeat):
+    """Median milliseconds of func(arg) and its result"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    from app import create_app
+    from app.utils.serialization import _import_orjson
+
+    app = create_app('production')
+    rows = make_appointments(options.rows)
+    modes = [('before', (before_rows, before_encode)), ('stdlib', with_provider(app, 'stdlib'))]
+    if _import_orjson() is not None:
+        modes.append(('orjson', with_provider(app, 'orjson')))
+    else:
+        print('orjson is not installed; measuring the stdlib backend only')
+
+    print(f'{options.rows} appointments')
+    print(f'{"mode":<8} {"rows ms":>8} {"encode ms":>10} {"total ms":>9} {"bytes":>10} {"speedup":>8}')
+    reference = None
+    for name, (build, encode) in modes:
+        build_ms, payload = timed(build, rows, options.repeat)
+        encode_ms, body = timed(encode, {'appointments': payload}, options.repeat)
+        total = build_ms + encode_ms
+        reference = reference or total
+        print(f'{name:<8} {build_ms:>8.1f} {encode_ms:>10.1f} {total:>9.1f} {len(body):>10} {reference / total:>7.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
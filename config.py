@@ -16,6 +16,90 @@ class Config:
     # Upload folder for files
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'app', 'static', 'uploads')
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max upload size
+    # Appointment import files (/admin/appointments/import) may be larger:
+    # about 100 bytes per CSV row, so 200MB covers a couple of million rows
+    IMPORT_MAX_CONTENT_LENGTH = int(os.environ.get('IMPORT_MAX_CONTENT_LENGTH', 200 * 1024 * 1024))
+
+    # Werkzeug password hashing method ("pbkdf2:sha256" uses its default work
+    # factor). Stored hashes made with another method are upgraded at login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+    
+    # Password checks running at once per process, and seconds a login waits
+    # for a free slot before it is turned away (see app/utils/passwords.py)
+    PASSWORD_VERIFY_CONCURRENCY = int(os.environ.get('PASSWORD_VERIFY_CONCURRENCY', 2))
+    PASSWORD_VERIFY_TIMEOUT = float(os.environ.get('PASSWORD_VERIFY_TIMEOUT', 5))
+    
+    # Failed logins allowed per client IP and per email address within a
+    # sliding window; past half the limit each failure adds a doubling delay
+    # (see app/utils/login_throttle.py). The backend is "database" (shared by
+    # all workers) or "memory" (per process).
+    LOGIN_THROTTLE_BACKEND = os.environ.get('LOGIN_THROTTLE_BACKEND', 'database')
+    LOGIN_THROTTLE_WINDOW = int(os.environ.get('LOGIN_THROTTLE_WINDOW', 900))
+    LOGIN_THROTTLE_IP_LIMIT = int(os.environ.get('LOGIN_THROTTLE_IP_LIMIT', 50))
+    LOGIN_THROTTLE_EMAIL_LIMIT = int(os.environ.get('LOGIN_THROTTLE_EMAIL_LIMIT', 10))
+    LOGIN_THROTTLE_BASE_DELAY = float(os.environ.get('LOGIN_THROTTLE_BASE_DELAY', 1))
+
+    # Reverse proxies in front of the app that append to X-Forwarded-For (1 on
+    # Render). The client address, which login throttling counts by, is then
+    # taken from that header; 0 trusts no proxy and uses the socket address.
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    
+    # Seconds between batched writes of users' last login and last seen times
+    # (0 disables the background writer; app.utils.activity.flush() still works)
+    ACTIVITY_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_FLUSH_INTERVAL', 5))
+    
+    # Seconds before a worker reloads its in-memory schedule exception index
+    # (changes made by the same worker apply immediately)
+    SCHEDULE_EXCEPTION_CACHE_TTL = int(os.environ.get('SCHEDULE_EXCEPTION_CACHE_TTL', 60))
+    
+    # Minutes after an appointment ends before `flask sweep-no-shows` marks it as a no-show
+    NO_SHOW_GRACE_MINUTES = int(os.environ.get('NO_SHOW_GRACE_MINUTES', 60))
+    
+    # Finished appointments older than this many days move to appointments_archive
+    APPOINTMENT_ARCHIVE_DAYS = int(os.environ.get('APPOINTMENT_ARCHIVE_DAYS', 730))
+    
+    # Appointment reminders: hours ahead to remind, channels (email, sms) and
+    # transport ("console", "file" or a "module:Class" path)
+    REMINDER_LEAD_HOURS = int(os.environ.get('REMINDER_LEAD_HOURS', 24))
+    REMINDER_CHANNELS = os.environ.get('REMINDER_CHANNELS', 'email').split(',')
+    REMINDER_TRANSPORT = os.environ.get('REMINDER_TRANSPORT', 'console')
+    REMINDER_OUTBOX_FILE = os.environ.get('REMINDER_OUTBOX_FILE') or os.path.join(BASE_DIR, 'instance', 'reminders.jsonl')
+    
+    # Compiled templates shared by all workers and deploys (empty disables);
+    # fill it at build time with `flask precompile-templates`
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR', os.path.join(BASE_DIR, 'instance', 'jinja_cache'))
+    
+    # Link the fingerprinted bundles built by `flask build-assets` (static/dist/)
+    # instead of the individual source files, once a build exists
+    ASSET_BUNDLES = os.environ.get('ASSET_BUNDLES', '1') == '1'
+    
+    # Response compression (app/utils/compression.py): brotli when the brotli
+    # package is installed, else gzip; levels picked with benchmarks/compression.py.
+    # Bodies smaller than COMPRESS_MIN_SIZE bytes are sent as they are.
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_ALGORITHMS = os.environ.get('COMPRESS_ALGORITHMS', 'br,gzip').split(',')
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_MIMETYPES = [
+        'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+        'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+    ]
+    
+    # JSON encoder behind jsonify(): "auto" (orjson when installed), "orjson" or "stdlib"
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+    
+    # Template fragment cache ({% cache %} blocks): "lru", "null" (off) or a
+    # "module:Class" backend; default lifetime in seconds and LRU capacity.
+    # The lifetime bounds how long other workers' changes take to show.
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND', 'lru')
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 60))
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 1000))
+    
+    # Result files and uploads of background jobs (never under static/), and
+    # the days `flask worker` keeps them before deleting them
+    JOB_FOLDER = os.environ.get('JOB_FOLDER') or os.path.join(BASE_DIR, 'instance', 'jobs')
+    JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', 7))
     
     @staticmethod
     def init_app(app):
@@ -29,13 +113,22 @@ class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or \
         'sqlite:///' + str(BASE_DIR / 'rafad_dev.sqlite')
+    # Serve the source files so edits show up without a rebuild
+    ASSET_BUNDLES = os.environ.get('ASSET_BUNDLES', '0') == '1'
 
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or \
-        'sqlite:///' + str(BASE_DIR / 'rafad_test.sqlite')
+    # In-memory by default, which is private to each pytest-xdist worker. A file
+    # URL may contain "{worker}" to get one database per worker, e.g.
+    # TEST_DATABASE_URL=sqlite:////tmp/rafad_test_{worker}.sqlite
+    SQLALCHEMY_DATABASE_URI = (os.environ.get('TEST_DATABASE_URL') or 'sqlite://').replace(
+        '{worker}', os.environ.get('PYTEST_XDIST_WORKER', 'main'))
+    # Cheap hashes keep tests that create users fast; never use outside tests
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    JINJA_BYTECODE_CACHE_DIR = None
+    ASSET_BUNDLES = False
 
 
 class ProductionConfig(Config):
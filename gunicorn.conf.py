@@ -0,0 +1,104 @@
+"""
+Gunicorn configuration for Rafad Clinic System
+
+Loaded automatically from the project root (or with ``-c gunicorn.conf.py``).
+Every setting can be overridden from the environment:
+
+    WEB_CONCURRENCY                  number of worker processes
+    GUNICORN_WORKER_CLASS            sync, gthread or gevent (default gthread)
+    GUNICORN_THREADS                 threads per gthread worker
+    GUNICORN_PRELOAD                 load the app once in the master (default true)
+    GUNICORN_TIMEOUT                 worker timeout in seconds
+    GUNICORN_MAX_REQUESTS            recycle a worker after this many requests (0 = never)
+    GUNICORN_MAX_REQUESTS_JITTER     random spread so workers do not restart together
+    GUNICORN_WARMUP                  warm caches before serving (default true)
+    PORT                             port to bind when GUNICORN_BIND is not set
+
+See docs/gunicorn.md for the benchmark behind the defaults.
+"""
+import importlib.util
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Worker class: on one CPU, sync has the better tail latency (see
+# docs/gunicorn.md); with more CPUs gthread overlaps the time requests spend
+# waiting on SQLite and the password hasher. gevent is used only when it is
+# installed.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync' if cpu_count == 1 else 'gthread')
+if worker_class == 'gevent' and importlib.util.find_spec('gevent') is None:
+    worker_class = 'gthread'
+
+# Defaults are capped: containers often report the host's CPU count
+if worker_class == 'gthread':
+    workers = _env_int('WEB_CONCURRENCY', max(2, min(cpu_count + 1, 8)))
+    threads = _env_int('GUNICORN_THREADS', 4)
+elif worker_class == 'gevent':
+    workers = _env_int('WEB_CONCURRENCY', min(cpu_count, 8))
+    worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+else:
+    workers = _env_int('WEB_CONCURRENCY', min(2 * cpu_count + 1, 12))
+
+# Import the app once in the master; workers share its memory copy-on-write
+# and boot almost instantly. post_fork() drops the inherited DB connections.
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers to contain slow memory leaks
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None  # empty to disable
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+warmup = _env_bool('GUNICORN_WARMUP', True)
+
+
+def when_ready(server):
+    """Warm caches in the master so every forked worker starts warm"""
+    if not (server.cfg.preload_app and warmup):
+        return
+    from app.utils.warmup import warm_up, dispose_engines
+
+    app = server.app.wsgi()
+    server.log.info('Warm-up: %s', warm_up(app))
+    # The master never serves requests; do not hand its connections to workers
+    dispose_engines(app)
+
+
+def post_fork(server, worker):
+    """Discard database connections inherited from the master"""
+    if not server.cfg.preload_app:
+        return
+    from app.utils.warmup import dispose_engines
+
+    dispose_engines(server.app.wsgi(), close=False)
+
+
+def post_worker_init(worker):
+    """Without preload each worker loads the app itself, so warm it here"""
+    if worker.cfg.preload_app or not warmup:
+        return
+    from app.utils.warmup import warm_up
+
+    worker.log.info('Warm-up: %s', warm_up(worker.wsgi))
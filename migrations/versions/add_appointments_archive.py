@@ -0,0 +1,49 @@
+"""Add the appointments archive table
+
+Revision ID: add_appointments_archive
+Revises: add_schedule_validity
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_appointments_archive'
+down_revision = 'add_schedule_validity'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'appointments_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=False),
+        sa.Column('appointment_date', sa.Date(), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('end_time', sa.Time(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('reason', sa.Text(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id']),
+        sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_appointments_archive_patient_date', 'appointments_archive',
+                    ['patient_id', 'appointment_date', 'start_time'])
+    op.create_index('ix_appointments_archive_doctor_date', 'appointments_archive',
+                    ['doctor_id', 'appointment_date'])
+    op.create_index('ix_appointments_archive_date', 'appointments_archive', ['appointment_date'])
+
+
+def downgrade():
+    op.drop_index('ix_appointments_archive_date', table_name='appointments_archive')
+    op.drop_index('ix_appointments_archive_doctor_date', table_name='appointments_archive')
+    op.drop_index('ix_appointments_archive_patient_date', table_name='appointments_archive')
+    op.drop_table('appointments_archive')
@@ -0,0 +1,36 @@
+"""Add the login throttle table
+
+Revision ID: add_login_throttle
+Revises: add_reminder_outbox
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_login_throttle'
+down_revision = 'add_reminder_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'login_throttle',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=160), nullable=False),
+        sa.Column('window_start', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('previous_count', sa.Integer(), nullable=False),
+        sa.Column('blocked_until', sa.DateTime(), nullable=True),
+        sa.Column('rejected', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('login_throttle')
@@ -0,0 +1,47 @@
+"""Add per-patient appointment counters and the patient/date appointment index
+
+Revision ID: add_patient_appointment_counters
+Revises: remove_medical_records_tables
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_patient_appointment_counters'
+down_revision = 'remove_medical_records_tables'
+branch_labels = None
+depends_on = None
+
+COUNTERS = {
+    'upcoming_count': ('scheduled', 'confirmed'),
+    'completed_count': ('completed',),
+    'cancelled_count': ('cancelled',),
+    'no_show_count': ('no_show',),
+}
+
+
+def upgrade():
+    with op.batch_alter_table('patients') as batch_op:
+        for column in COUNTERS:
+            batch_op.add_column(sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the existing appointments
+    for column, statuses in COUNTERS.items():
+        status_list = ', '.join(f"'{status}'" for status in statuses)
+        op.execute(
+            f"UPDATE patients SET {column} = (SELECT COUNT(*) FROM appointments "
+            f"WHERE appointments.patient_id = patients.id AND appointments.status IN ({status_list}))"
+        )
+
+    op.create_index('ix_appointments_patient_date', 'appointments',
+                    ['patient_id', 'appointment_date', 'start_time'])
+
+
+def downgrade():
+    op.drop_index('ix_appointments_patient_date', table_name='appointments')
+    with op.batch_alter_table('patients') as batch_op:
+        for column in COUNTERS:
+            batch_op.drop_column(column)
@@ -0,0 +1,50 @@
+"""Add the reminder outbox and the appointment time index
+
+Revision ID: add_reminder_outbox
+Revises: add_jobs
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_reminder_outbox'
+down_revision = 'add_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_appointments_date_start_status', 'appointments',
+                    ['appointment_date', 'start_time', 'status'])
+    op.create_table(
+        'reminder_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dedup_key', sa.String(length=100), nullable=False),
+        sa.Column('appointment_id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('channel', sa.String(length=20), nullable=False),
+        sa.Column('recipient', sa.String(length=120), nullable=False),
+        sa.Column('subject', sa.String(length=200), nullable=True),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(length=255), nullable=True),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dedup_key')
+    )
+    op.create_index('ix_reminder_outbox_appointment_id', 'reminder_outbox', ['appointment_id'])
+    op.create_index('ix_reminder_outbox_status_id', 'reminder_outbox', ['status', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_reminder_outbox_status_id', table_name='reminder_outbox')
+    op.drop_index('ix_reminder_outbox_appointment_id', table_name='reminder_outbox')
+    op.drop_table('reminder_outbox')
+    op.drop_index('ix_appointments_date_start_status', table_name='appointments')
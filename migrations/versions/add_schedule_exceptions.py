@@ -0,0 +1,43 @@
+"""Add schedule exceptions (holidays, leave and partial closures)
+
+Revision ID: add_schedule_exceptions
+Revises: add_patient_appointment_counters
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_schedule_exceptions'
+down_revision = 'add_patient_appointment_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'schedule_exceptions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('doctor_id', sa.Integer(), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=True),
+        sa.Column('end_time', sa.Time(), nullable=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('reason', sa.String(length=128), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_schedule_exceptions_doctor_range', 'schedule_exceptions',
+                    ['doctor_id', 'start_date', 'end_date'])
+    op.create_index('ix_schedule_exceptions_end_date', 'schedule_exceptions', ['end_date'])
+
+
+def downgrade():
+    op.drop_index('ix_schedule_exceptions_end_date', table_name='schedule_exceptions')
+    op.drop_index('ix_schedule_exceptions_doctor_range', table_name='schedule_exceptions')
+    op.drop_table('schedule_exceptions')
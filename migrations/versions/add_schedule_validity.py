@@ -0,0 +1,32 @@
+"""Add effective dates to schedules
+
+Revision ID: add_schedule_validity
+Revises: add_schedule_exceptions
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_schedule_validity'
+down_revision = 'add_schedule_exceptions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows stay open-ended (NULL bounds), so they apply as before
+    with op.batch_alter_table('schedules') as batch_op:
+        batch_op.add_column(sa.Column('valid_from', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('valid_to', sa.Date(), nullable=True))
+    op.create_index('ix_schedules_doctor_day_validity', 'schedules',
+                    ['doctor_id', 'day_of_week', 'valid_from', 'valid_to'])
+
+
+def downgrade():
+    op.drop_index('ix_schedules_doctor_day_validity', table_name='schedules')
+    with op.batch_alter_table('schedules') as batch_op:
+        batch_op.drop_column('valid_to')
+        batch_op.drop_column('valid_from')
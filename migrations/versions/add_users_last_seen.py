@@ -0,0 +1,24 @@
+"""Add last_seen column to users table
+
+Revision ID: add_users_last_seen
+Revises: add_login_throttle
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_users_last_seen'
+down_revision = 'add_login_throttle'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('last_seen', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('users', 'last_seen')
@@ -0,0 +1,43 @@
+"""Never reuse appointment IDs
+
+Archived appointments keep their IDs, but SQLite gives a new row max(id) + 1
+unless the table is AUTOINCREMENT. Once the newest appointment was deleted,
+a new booking could take the ID of an archived one. Rebuild appointments as
+AUTOINCREMENT and start its sequence past every live and archived ID. Other
+databases use sequences, which never hand an ID out twice.
+
+Revision ID: make_appointment_ids_autoincrement
+Revises: add_users_last_seen
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'make_appointment_ids_autoincrement'
+down_revision = 'add_users_last_seen'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('appointments', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'appointments'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'appointments', MAX("
+        "COALESCE((SELECT MAX(id) FROM appointments), 0), "
+        "COALESCE((SELECT MAX(id) FROM appointments_archive), 0))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('appointments', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}):
+        pass
@@ -1,15 +1,18 @@
 """
 Test configuration for Rafad Clinic System
 """
-from config import Config
+from config import Config, TestingConfig
 
 
 class TestConfig(Config):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_DATABASE_URI = TestingConfig.SQLALCHEMY_DATABASE_URI
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # Fast hashing for tests
     WTF_CSRF_ENABLED = False  # Disable CSRF tokens in tests
     SECRET_KEY = 'test-secret-key'
     DEBUG = False
     SERVER_NAME = 'localhost'  # Required for url_for to work in tests
-    PRESERVE_CONTEXT_ON_EXCEPTION = False
\ No newline at end of file
+    PRESERVE_CONTEXT_ON_EXCEPTION = False
+    ACTIVITY_FLUSH_INTERVAL = 0  # Tests flush activity explicitly
+    ASSET_BUNDLES = False  # Link source files even if static/dist/ was built
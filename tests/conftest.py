@@ -1,5 +1,10 @@
 """
 Pytest fixtures for Rafad Clinic System tests
+
+The application and its schema are created once per test session (once per
+worker under pytest-xdist). Every test then runs inside an outer transaction
+on a single connection; commits made by the code under test only release a
+SAVEPOINT, and the outer transaction is rolled back when the test ends.
 """
 import os
 import sys
@@ -9,32 +14,104 @@ from datetime import datetime, timedelta
 # Add the parent directory to the path so we can import app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
 from app import create_app, db
-from app.models.user import User
-from app.models.patient import Patient
-from app.models.doctor import Doctor
-from app.models.schedule import Schedule
-from app.models.appointment import Appointment
 from tests.config import TestConfig
+from tests.helpers import (
+    create_user, create_patient, create_doctor, create_schedule,
+    create_appointment, login_as
+)
 
 
-@pytest.fixture(scope='function')
+class _ConnectionBoundSession(Session):
+    """Session that always uses the per-test connection
+
+    Flask-SQLAlchemy's Session.get_bind() resolves binds from the engine map
+    and would ignore a session-level ``bind``, escaping the test transaction.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        return bind if bind is not None else self.bind
+
+
+def _enable_sqlite_savepoints(engine):
+    """Let pysqlite emit BEGIN itself so SAVEPOINTs nest correctly
+
+    See "Serializable isolation / Savepoints / Transactional DDL" in the
+    SQLAlchemy SQLite dialect documentation.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _on_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+
+@pytest.fixture(scope='session')
 def app():
-    """Create and configure a Flask app for testing"""
+    """Create the Flask app and the database schema once per session"""
     app = create_app('testing')
     app.config.from_object(TestConfig)
-    
-    # Establish application context
+
     with app.app_context():
-        # Create all tables
+        # Reconnect with savepoint support and build the schema on that connection
+        _enable_sqlite_savepoints(db.engine)
+        db.engine.dispose()
         db.create_all()
-        yield app
-        
-        # Clean up
-        db.session.remove()
+
+    yield app
+
+    with app.app_context():
         db.drop_all()
 
 
+@pytest.fixture(autouse=True)
+def _transaction(request):
+    """Wrap every test that uses the app in a rolled-back transaction
+
+    Each test also gets its own application context so that ``g`` (and the
+    user cached there by Flask-Login) never leaks between tests.
+    """
+    if 'app' not in request.fixturenames:
+        yield
+        return
+
+    app = request.getfixturevalue('app')
+    ctx = app.app_context()
+    ctx.push()
+    connection = db.engine.connect()
+    outer = connection.begin()
+
+    original_session = db.session
+    db.session = db._make_scoped_session({
+        'class_': _ConnectionBoundSession,
+        'bind': connection,
+        'join_transaction_mode': 'create_savepoint',
+    })
+    try:
+        yield
+    finally:
+        db.session.remove()
+        db.session = original_session
+        outer.rollback()
+        connection.close()
+        # In-process caches may hold rows that were just rolled back
+        app.extensions.pop('schedule_exceptions', None)
+        app.extensions.pop('appointment_archive', None)
+        app.extensions.pop('login_throttle', None)
+        app.extensions.pop('activity', None)
+        app.extensions.pop('fragment_cache', None)
+        app.extensions.pop('assets', None)
+        ctx.pop()
+
+
 @pytest.fixture(scope='function')
 def client(app):
     """A test client for the app"""
@@ -49,173 +126,90 @@ def runner(app):
 
 @pytest.fixture(scope='function')
 def _db(app):
-    """Create and configure a database for testing"""
-    with app.app_context():
-        db.create_all()
-        yield db
-        db.session.remove()
-        db.drop_all()
+    """The database, isolated by the per-test transaction"""
+    return db
+
+
+@pytest.fixture(scope='function')
+def app_with_db(app, _db):
+    """The Flask app with an isolated database"""
+    return app
 
 
 @pytest.fixture(scope='function')
-def test_admin(app, _db):
+def test_admin(_db):
     """Create a test admin user"""
-    admin = User(
-        username='admin_test',
-        email='admin@example.com',
-        role='admin',
-        is_active=True
-    )
-    admin.password = 'password'
-    _db.session.add(admin)
-    _db.session.commit()
-    return admin
+    return create_user(role='admin', username='admin_test', email='admin@example.com')
 
 
 @pytest.fixture(scope='function')
-def test_patient_user(app, _db):
+def test_patient_user(_db):
     """Create a test patient user"""
-    user = User(
-        username='patient_test',
-        email='patient@example.com',
-        role='patient',
-        is_active=True
-    )
-    user.password = 'password'
-    _db.session.add(user)
-    _db.session.flush()  # Flush to get the user ID
-    
-    patient = Patient(
-        user_id=user.id,
-        first_name='Test',
-        last_name='Patient',
-        phone='1234567890',
+    user = create_user(role='patient', username='patient_test', email='patient@example.com')
+    create_patient(
+        user,
         date_of_birth=datetime(1990, 1, 1),
-        gender='male',
-        address='123 Test St',
         medical_history='No significant medical history'
     )
-    _db.session.add(patient)
-    _db.session.commit()
     return user
 
+
 @pytest.fixture(scope='function')
-def test_patient(app, _db, test_patient_user):
+def test_patient(test_patient_user):
     """Return the patient instance directly for tests that need it"""
     return test_patient_user.patient
 
 
 @pytest.fixture(scope='function')
-def test_doctor_user(app, _db):
+def test_doctor_user(_db):
     """Create a test doctor user"""
-    user = User(
-        username='doctor_test',
-        email='doctor@example.com',
-        role='doctor',
-        is_active=True
-    )
-    user.password = 'password'
-    _db.session.add(user)
-    _db.session.flush()  # Flush to get the user ID
-    
-    doctor = Doctor(
-        user_id=user.id,
-        first_name='Test',
-        last_name='Doctor',
-        specialization='General Medicine',
-        phone='1234567890',
-        qualification='MD',
-        bio='Test doctor bio',
-        experience_years=10
-    )
-    _db.session.add(doctor)
-    _db.session.commit()
+    user = create_user(role='doctor', username='doctor_test', email='doctor@example.com')
+    create_doctor(user, bio='Test doctor bio')
     return user
 
+
 @pytest.fixture(scope='function')
-def test_doctor(app, _db, test_doctor_user):
+def test_doctor(test_doctor_user):
     """Return the doctor instance directly for tests that need it"""
     return test_doctor_user.doctor
 
 
 @pytest.fixture(scope='function')
-def test_schedule(app, _db, test_doctor):
-    """Create a test schedule for the doctor"""
-    today = datetime.now().date()
-    
-    # Create a schedule for the next 7 days
-    schedule = Schedule(
-        doctor_id=test_doctor.id,
-        day_of_week=today.weekday(),
-        start_time=datetime.strptime('09:00', '%H:%M').time(),
-        end_time=datetime.strptime('17:00', '%H:%M').time(),
-        is_active=True
-    )
-    _db.session.add(schedule)
-    _db.session.commit()
-    return schedule
+def test_schedule(test_doctor):
+    """Create a test schedule for the doctor on today's weekday"""
+    return create_schedule(test_doctor)
 
 
 @pytest.fixture(scope='function')
-def test_appointment(app, _db, test_patient, test_doctor):
+def test_appointment(test_patient, test_doctor):
     """Create a test appointment"""
     tomorrow = datetime.now() + timedelta(days=1)
-    
-    appointment = Appointment(
-        patient_id=test_patient.id,
-        doctor_id=test_doctor.id,
+    return create_appointment(
+        test_patient,
+        test_doctor,
         appointment_date=tomorrow.date(),
-        start_time=datetime.strptime('10:00', '%H:%M').time(),
-        end_time=datetime.strptime('10:30', '%H:%M').time(),
         status='confirmed',
         reason='Test appointment reason',
         notes='Test appointment notes'
     )
-    _db.session.add(appointment)
-    _db.session.commit()
-    return appointment
 
 
 # Medical records functionality has been removed as it was out of scope
 
-@pytest.fixture(scope='function')
-def app_with_db(app):
-    """Create and configure a Flask app with database for testing"""
-    with app.app_context():
-        # Create all tables
-        db.create_all()
-        yield app
-        
-        # Clean up
-        db.session.remove()
-        db.drop_all()
-
 
 @pytest.fixture(scope='function')
 def auth_client(client, test_patient_user):
     """Create a client that's already logged in as a patient"""
-    with client.session_transaction() as session:
-        # Flask-Login's session format
-        session['_user_id'] = str(test_patient_user.id)
-        session['_fresh'] = True
-    return client
+    return login_as(client, test_patient_user)
 
 
 @pytest.fixture(scope='function')
 def doctor_auth_client(client, test_doctor_user):
     """Create a client that's already logged in as a doctor"""
-    with client.session_transaction() as session:
-        # Flask-Login's session format
-        session['_user_id'] = str(test_doctor_user.id)
-        session['_fresh'] = True
-    return client
+    return login_as(client, test_doctor_user)
 
 
 @pytest.fixture(scope='function')
 def admin_auth_client(client, test_admin):
     """Create a client that's already logged in as an admin"""
-    with client.session_transaction() as session:
-        # Flask-Login's session format
-        session['_user_id'] = str(test_admin.id)
-        session['_fresh'] = True
-    return client
\ No newline at end of file
+    return login_as(client, test_admin)
@@ -1,93 +1,173 @@
-""""""
-
-Helper functions for testsHelper functions for tests
-
-""""""
-
-from datetime import datetime, timedeltafrom datetime import datetime, timedelta
-
-import jsonimport json
-
-
-
-
-
-def login(client, email, password):def login(client, email, password):def parse_json(response):
-
-    """Log in a user with the test client"""    """Parse a JSON response"""
-
-    return client.post(    return json.loads(response.data)og in a user with the test client"""
-
-        '/auth/login',    return client.post(
-
-        data={'email': email, 'password': password},        '/auth/login',
-
-        follow_redirects=True        data={'email': email, 'password': password},
+"""
+Helper functions and model factories for tests
+
+The factories replace ad-hoc model setup in tests and fixtures. They add the
+objects to the current session and flush, so ids are available immediately
+while everything is still rolled back at the end of the test.
+"""
+import json
+from datetime import date, datetime, time, timedelta
+from itertools import count
+
+from flask import current_app
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models.user import User
+from app.models.patient import Patient
+from app.models.doctor import Doctor
+from app.models.schedule import Schedule
+from app.models.appointment import Appointment
+
+# Default password for users built by the factories
+DEFAULT_PASSWORD = 'password'
+
+_sequence = count(1)
+_password_hashes = {}
+
+
+def _password_hash(password):
+    """Hash each distinct password once per test session"""
+    if password not in _password_hashes:
+        _password_hashes[password] = generate_password_hash(
+            password, method=current_app.config['PASSWORD_HASH_METHOD'])
+    return _password_hashes[password]
+
+
+def create_user(role='patient', username=None, email=None, password=DEFAULT_PASSWORD,
+                is_active=True, **kwargs):
+    """Create a user; username and email are generated when not given"""
+    n = next(_sequence)
+    user = User(
+        username=username or f'{role}_{n}',
+        email=email or f'{role}_{n}@example.com',
+        role=role,
+        is_active=is_active,
+        password_hash=_password_hash(password),
+        **kwargs
+    )
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def create_patient(user=None, **kwargs):
+    """Create a patient profile (and its user when not given)"""
+    user = user or create_user(role='patient')
+    values = {
+        'first_name': 'Test',
+        'last_name': 'Patient',
+        'phone': '1234567890',
+        'date_of_birth': date(1990, 1, 1),
+        'gender': 'male',
+        'address': '123 Test St',
+    }
+    values.update(kwargs)
+    patient = Patient(user_id=user.id, **values)
+    db.session.add(patient)
+    db.session.flush()
+    return patient
+
+
+def create_doctor(user=None, **kwargs):
+    """Create a doctor profile (and its user when not given)"""
+    user = user or create_user(role='doctor')
+    values = {
+        'first_name': 'Test',
+        'last_name': 'Doctor',
+        'specialization': 'General Medicine',
+        'phone': '1234567890',
+        'qualification': 'MD',
+        'experience_years': 10,
+    }
+    values.update(kwargs)
+    doctor = Doctor(user_id=user.id, **values)
+    db.session.add(doctor)
+    db.session.flush()
+    return doctor
+
+
+def create_schedule(doctor, day_of_week=None, start='09:00', end='17:00', **kwargs):
+    """Create an active weekly schedule entry for a doctor (today's weekday by default)"""
+    schedule = Schedule(
+        doctor_id=doctor.id,
+        day_of_week=date.today().weekday() if day_of_week is None else day_of_week,
+        start_time=datetime.strptime(start, '%H:%M').time(),
+        end_time=datetime.strptime(end, '%H:%M').time(),
+        is_active=kwargs.pop('is_active', True),
+        **kwargs
+    )
+    db.session.add(schedule)
+    db.session.flush()
+    return schedule
+
+
+def create_appointment(patient, doctor, appointment_date=None, start='10:00', duration=30,
+                       status='scheduled', **kwargs):
+    """Create an appointment (tomorrow at 10:00 by default)"""
+    appointment_date = appointment_date or date.today() + timedelta(days=1)
+    start_time = datetime.strptime(start, '%H:%M').time() if isinstance(start, str) else start
+    end_time = (datetime.combine(appointment_date, start_time) + timedelta(minutes=duration)).time()
+    appointment = Appointment(
+        patient_id=patient.id,
+        doctor_id=doctor.id,
+        appointment_date=appointment_date,
+        start_time=start_time,
+        end_time=end_time,
+        status=status,
+        **kwargs
+    )
+    db.session.add(appointment)
+    db.session.flush()
+    return appointment
 
-    )        follow_redirects=True
 
+def login(client, email, password, role='patient'):
+    """Log in a user with the test client"""
+    return client.post(
+        '/auth/login',
+        data={'email': email, 'password': password, 'role': role},
+        follow_redirects=True
     )
 
 
-
 def logout(client):
-
-    """Log out a user with the test client"""def logout(client):
-
-    return client.get('/auth/logout', follow_redirects=True)    """Log out a user with the test client"""
-
+    """Log out a user with the test client"""
     return client.get('/auth/logout', follow_redirects=True)
 
 
+def login_as(client, user):
+    """Log a user in by writing the Flask-Login session directly"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client
 
-def create_test_appointment_data(patient_id, doctor_id):
-
-    """Create test data for an appointment"""
 
+def create_test_appointment_data(patient_id, doctor_id):
+    """Create form data for an appointment"""
     appointment_date = datetime.now() + timedelta(days=1)
-
-    appointment_time = datetime.now().time()
-
-        
+    appointment_time = time(10, 0)
 
     return {
-
         'patient_id': patient_id,
-
         'doctor_id': doctor_id,
-
         'appointment_date': appointment_date.strftime('%Y-%m-%d'),
-
         'appointment_time': appointment_time.strftime('%H:%M'),
-
         'reason': 'Test appointment',
-
         'notes': 'Test appointment notes'
-
     }
 
-def assert_response_status(response, status_code=200):
-    """Assert that a response has the expected status code"""
-    assert response.status_code == status_code
-
-
-def get_json_response(response):
-    """Parse a JSON response"""
-    return json.loads(response.data)
-
-
-def parse_json(response):
-    """Parse a JSON response"""
-    return json.loads(response.data)
-
 
 def assert_response_status(response, status_code=200):
     """Assert that a response has the expected status code"""
     assert response.status_code == status_code
 
 
-def get_json_response(response):
+def parse_json(response):
     """Parse a JSON response"""
     return json.loads(response.data)
 
 
+# Kept for tests written against the older helper name
+get_json_response = parse_json
@@ -4,7 +4,9 @@ Tests for Appointment model in Rafad Clinic System
 import pytest
 from datetime import datetime, timedelta
 from app.models.appointment import Appointment
+from app.models.patient import Patient
 from app.models.schedule import Schedule
+from tests.helpers import create_appointment, create_doctor
 
 
 def test_appointment_creation(_db, test_patient, test_doctor):
@@ -206,4 +208,49 @@ def test_appointment_in_past(_db, test_doctor, test_patient):
         date=yesterday,
         time=datetime.strptime('10:00', '%H:%M').time()
     )
-    assert is_available is False
\ No newline at end of file
+    assert is_available is False
+
+
+def test_bulk_update_status_checks_permissions_set_wise(_db, test_patient, test_doctor):
+    """Only the doctor's own appointments in an allowed status change; counters follow"""
+    other = create_doctor(last_name='Other')
+    today = datetime.now().date()
+    mine = [create_appointment(test_patient, test_doctor, appointment_date=today, start=f'{h}:00')
+            for h in (9, 10)]
+    cancelled = create_appointment(test_patient, test_doctor, appointment_date=today, start='11:00',
+                                   status='cancelled')
+    theirs = create_appointment(test_patient, other, appointment_date=today, start='09:00')
+    _db.session.commit()
+    ids = [mine[0].id, mine[1].id, cancelled.id, theirs.id]
+
+    updated, skipped = Appointment.bulk_update_status(ids, 'completed', test_doctor.user)
+
+    assert updated == sorted([mine[0].id, mine[1].id])
+    assert skipped == sorted([cancelled.id, theirs.id])
+    assert mine[0].status == 'completed'
+    assert mine[0].updated_at is not None
+    patient = Patient.query.get(test_patient.id)
+    assert (patient.completed_count, patient.upcoming_count) == (2, 1)
+
+    with pytest.raises(ValueError):
+        Appointment.bulk_update_status(ids, 'completed', test_patient.user)
+
+
+def test_sweep_no_shows_marks_only_overdue_scheduled(_db, test_patient, test_doctor):
+    """Scheduled appointments that ended before the grace period become no-shows, in chunks"""
+    now = datetime(2030, 5, 10, 12, 0)
+    day = now.date()
+    overdue = [create_appointment(test_patient, test_doctor, appointment_date=day - timedelta(days=d))
+               for d in (1, 2, 3)]
+    create_appointment(test_patient, test_doctor, appointment_date=day, start='10:45')  # ends 11:15
+    create_appointment(test_patient, test_doctor, appointment_date=day - timedelta(days=1), start='11:00',
+                       status='completed')
+    create_appointment(test_patient, test_doctor, appointment_date=day + timedelta(days=1))
+    _db.session.commit()
+
+    assert Appointment.sweep_no_shows(now=now, grace_minutes=60, chunk_size=2) == 3
+    assert {a.status for a in overdue} == {'no_show'}
+    assert Appointment.query.filter_by(status='scheduled').count() == 2
+    assert Patient.query.get(test_patient.id).no_show_count == 3
+
+    assert Appointment.sweep_no_shows(now=now + timedelta(hours=1), grace_minutes=60) == 1
@@ -0,0 +1,70 @@
+"""
+Tests for Patient model appointment counters in Rafad Clinic System
+"""
+from datetime import date, time, timedelta
+
+from app.models.appointment import Appointment
+from app.models.patient import Patient
+from tests.helpers import create_appointment, create_patient, create_user
+
+
+def _counters(patient):
+    return (patient.upcoming_count, patient.completed_count,
+            patient.cancelled_count, patient.no_show_count)
+
+
+def test_counters_follow_inserts(_db, test_patient, test_doctor):
+    """New appointments are counted under their status"""
+    create_appointment(test_patient, test_doctor, start='09:00')
+    create_appointment(test_patient, test_doctor, start='09:30', status='confirmed')
+    create_appointment(test_patient, test_doctor, start='10:00', status='completed')
+    _db.session.commit()
+
+    assert _counters(test_patient) == (2, 1, 0, 0)
+    assert test_patient.total_visits == 3
+
+
+def test_counters_follow_status_changes_and_deletes(_db, test_patient, test_doctor):
+    """Status changes move the count; deletes remove it"""
+    appointment = create_appointment(test_patient, test_doctor)
+    _db.session.commit()
+
+    appointment.status = 'cancelled'
+    _db.session.commit()
+    assert _counters(test_patient) == (0, 0, 1, 0)
+
+    # Also when the instance was expired before the change
+    _db.session.expire(appointment)
+    appointment.status = 'no_show'
+    _db.session.commit()
+    assert _counters(test_patient) == (0, 0, 0, 1)
+
+    _db.session.delete(appointment)
+    _db.session.commit()
+    assert _counters(test_patient) == (0, 0, 0, 0)
+
+
+def test_counters_for_patient_created_in_same_flush(_db, test_doctor):
+    """A patient and its first appointment can be flushed together"""
+    patient = Patient(user=create_user(role='patient'), first_name='New', last_name='Patient',
+                      phone='1234567890', date_of_birth=date(1990, 1, 1), gender='female')
+    appointment = Appointment(doctor_id=test_doctor.id, appointment_date=date.today() + timedelta(days=2),
+                              start_time=time(11, 0), end_time=time(11, 30))
+    appointment.patient = patient
+    _db.session.add_all([patient, appointment])
+    _db.session.commit()
+
+    assert _counters(patient) == (1, 0, 0, 0)
+
+
+def test_recalculate_appointment_counters(_db, test_patient, test_doctor):
+    """Counters can be rebuilt after bulk SQL"""
+    create_appointment(test_patient, test_doctor, status='completed')
+    other = create_patient()
+    _db.session.commit()
+    Patient.query.update({Patient.completed_count: 99}, synchronize_session=False)
+
+    assert Patient.recalculate_appointment_counters() >= 2
+    _db.session.expire_all()
+    assert _counters(test_patient) == (0, 1, 0, 0)
+    assert _counters(other) == (0, 0, 0, 0)
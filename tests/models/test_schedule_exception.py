@@ -0,0 +1,150 @@
+"""
+Tests for schedule exceptions (holidays, leave) in Rafad Clinic System
+"""
+from datetime import date, time, timedelta
+
+from flask import url_for
+from sqlalchemy import event
+
+from app.models import Appointment, Schedule, ScheduleException
+from app.utils.schedule_exceptions import get_exception_index
+from tests.helpers import create_doctor, create_schedule, parse_json
+
+MONDAY = date.today() + timedelta(days=7 - date.today().weekday())
+
+
+def add_exception(_db, doctor=None, start=MONDAY, end=None, start_time=None, end_time=None, **kwargs):
+    exception = ScheduleException(
+        doctor_id=doctor.id if doctor else None,
+        start_date=start,
+        end_date=end or start,
+        start_time=start_time,
+        end_time=end_time,
+        **kwargs
+    )
+    _db.session.add(exception)
+    _db.session.commit()
+    return exception
+
+
+def test_full_day_leave_removes_all_slots(_db, test_doctor):
+    """A doctor on leave has no slots, and another doctor is unaffected"""
+    other = create_doctor(last_name='Other')
+    create_schedule(test_doctor, day_of_week=0)
+    create_schedule(other, day_of_week=0)
+    add_exception(_db, test_doctor, start=MONDAY - timedelta(days=2), end=MONDAY + timedelta(days=1),
+                  kind='leave', reason='Conference')
+
+    assert Schedule.get_available_slots(test_doctor.id, MONDAY) == []
+    assert Schedule.get_available_slots(other.id, MONDAY) != []
+    assert Schedule.get_available_slots(test_doctor.id, MONDAY + timedelta(days=7)) != []
+
+    available, reason = Appointment.check_availability(test_doctor.id, MONDAY, '10:00')
+    assert not available
+    assert reason == 'Doctor is unavailable: Leave: Conference'
+
+
+def test_clinic_wide_holiday_applies_to_every_doctor(_db, test_doctor):
+    """Clinic-wide closures have no doctor"""
+    create_schedule(test_doctor, day_of_week=0)
+    add_exception(_db, kind='holiday', reason='National Day')
+
+    assert Schedule.get_available_slots(test_doctor.id, MONDAY) == []
+    assert get_exception_index().closures(test_doctor.id, MONDAY)[0].clinic_wide
+
+
+def test_partial_closure_only_blocks_overlapping_slots(_db, test_doctor):
+    """A closed afternoon leaves the morning bookable"""
+    create_schedule(test_doctor, day_of_week=0, start='09:00', end='17:00')
+    add_exception(_db, test_doctor, start_time=time(13, 0), end_time=time(17, 0), kind='other')
+
+    slots = Schedule.get_available_slots(test_doctor.id, MONDAY)
+    assert '12:30' in slots
+    assert '13:00' not in slots and '16:30' not in slots
+
+    assert Appointment.check_availability(test_doctor.id, MONDAY, '12:00')[0]
+    available, reason = Appointment.check_availability(test_doctor.id, MONDAY, '12:45')
+    assert not available
+    assert reason == 'Doctor is unavailable: Other'
+
+
+def test_closed_day_needs_no_query(_db, test_doctor):
+    """Once the index is loaded, a closed day is answered from memory"""
+    add_exception(_db, test_doctor)
+    get_exception_index().closures(test_doctor.id, MONDAY)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(_db.engine, 'before_cursor_execute', listener)
+    try:
+        slots = Schedule.get_available_slots(test_doctor.id, MONDAY)
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', listener)
+
+    assert slots == []
+    assert statements == []
+
+
+def test_index_refreshes_on_change(_db, test_doctor):
+    """Writes drop the index so lookups see them straight away"""
+    index = get_exception_index()
+    assert index.closures(test_doctor.id, MONDAY) == []
+
+    exception = add_exception(_db, test_doctor, end=MONDAY + timedelta(days=2))
+    assert len(index.closures(test_doctor.id, MONDAY + timedelta(days=1))) == 1
+
+    exception.end_date = MONDAY
+    _db.session.commit()
+    assert index.closures(test_doctor.id, MONDAY + timedelta(days=1)) == []
+
+    _db.session.delete(exception)
+    _db.session.commit()
+    assert index.closures(test_doctor.id, MONDAY) == []
+
+
+def test_index_handles_nested_ranges(_db, test_doctor):
+    """A long range still covers days after a shorter range that starts later"""
+    add_exception(_db, test_doctor, start=MONDAY, end=MONDAY + timedelta(days=20), reason='Long')
+    add_exception(_db, test_doctor, start=MONDAY + timedelta(days=2), end=MONDAY + timedelta(days=3),
+                  reason='Short')
+    index = get_exception_index()
+
+    assert [c.label for c in index.closures(test_doctor.id, MONDAY + timedelta(days=10))] == ['Leave: Long']
+    assert len(index.closures(test_doctor.id, MONDAY + timedelta(days=3))) == 2
+    assert index.closures(test_doctor.id, MONDAY + timedelta(days=21)) == []
+
+
+def test_weekly_api_lists_closures(auth_client, _db, test_doctor):
+    """The weekly view API reports closures for the requested week"""
+    create_schedule(test_doctor, day_of_week=0)
+    add_exception(_db, test_doctor, start=MONDAY + timedelta(days=1), start_time=time(9, 0),
+                  end_time=time(12, 0), reason='Training')
+
+    response = auth_client.get(url_for('schedule_api.get_doctor_schedule', doctor_id=test_doctor.id,
+                                       week=(MONDAY + timedelta(days=3)).isoformat()))
+    data = parse_json(response)
+    assert response.status_code == 200
+    assert data['week_start'] == MONDAY.isoformat()
+    assert data['exceptions'] == [{
+        'date': (MONDAY + timedelta(days=1)).isoformat(),
+        'day_of_week': 1,
+        'start_time': '09:00',
+        'end_time': '12:00',
+        'label': 'Leave: Training',
+        'clinic_wide': False,
+    }]
+
+
+def test_doctor_adds_own_leave(doctor_auth_client, test_doctor):
+    """Doctors can record leave for themselves"""
+    response = doctor_auth_client.post(url_for('schedule.exceptions'), data={
+        'doctor_id': test_doctor.id,
+        'kind': 'leave',
+        'start_date': MONDAY.isoformat(),
+        'end_date': (MONDAY + timedelta(days=4)).isoformat(),
+        'reason': 'Annual leave',
+    }, follow_redirects=True)
+
+    assert response.status_code == 200
+    assert 'Annual leave' in response.get_data(as_text=True)
+    assert Schedule.get_available_slots(test_doctor.id, MONDAY + timedelta(days=2)) == []
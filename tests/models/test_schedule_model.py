@@ -185,4 +185,60 @@ def test_doctor_schedule_availability(_db):
     
     # Get all schedules
     all_schedules = Schedule.query.filter_by(doctor_id=test_doctor.id).all()
-    assert len(all_schedules) == 2
\ No newline at end of file
+    assert len(all_schedules) == 2
+
+
+def _next(weekday, weeks=1):
+    """The given weekday `weeks` weeks from now"""
+    from datetime import date
+    today = date.today()
+    return today + timedelta(days=(weekday - today.weekday()) % 7 + 7 * weeks)
+
+
+def test_supersede_keeps_old_hours_before_effective_date(_db, test_doctor):
+    """A change from a future date leaves earlier days on the old version"""
+    from tests.helpers import create_schedule
+    schedule = create_schedule(test_doctor, day_of_week=0, start='09:00', end='17:00')
+    effective_from = _next(0, weeks=2)
+
+    version = schedule.supersede(effective_from, start_time=time(12, 0))
+    _db.session.commit()
+
+    assert version.id != schedule.id
+    assert schedule.valid_to == effective_from - timedelta(days=1)
+    assert Schedule.for_date(test_doctor.id, _next(0, weeks=1)).start_time == time(9, 0)
+    assert Schedule.for_date(test_doctor.id, effective_from).start_time == time(12, 0)
+    assert Schedule.get_available_slots(test_doctor.id, effective_from)[0] == '12:00'
+
+    # A version not yet in effect is edited in place
+    assert version.supersede(effective_from, end_time=time(15, 0)) is version
+
+
+def test_affected_appointments_only_returns_bookings_outside_new_hours(_db, test_patient, test_doctor):
+    """Affected bookings come from one statement and skip other days and blocks"""
+    from sqlalchemy import event
+    from tests.helpers import create_appointment, create_schedule
+    morning = create_schedule(test_doctor, day_of_week=0, start='09:00', end='12:00')
+    create_schedule(test_doctor, day_of_week=0, start='14:00', end='17:00')
+    monday, tuesday = _next(0), _next(1)
+    early = create_appointment(test_patient, test_doctor, appointment_date=monday, start='09:00')
+    create_appointment(test_patient, test_doctor, appointment_date=monday, start='11:00')
+    create_appointment(test_patient, test_doctor, appointment_date=monday, start='15:00')
+    create_appointment(test_patient, test_doctor, appointment_date=tuesday, start='09:00')
+    create_appointment(test_patient, test_doctor, appointment_date=monday, start='09:30', status='cancelled')
+    _db.session.commit()
+    _db.session.refresh(morning)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(_db.engine, 'before_cursor_execute', listener)
+    try:
+        affected = morning.affected_appointments(monday, start_time=time(10, 0)).all()
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', listener)
+
+    assert [a.id for a in affected] == [early.id]
+    assert len([sql for sql in statements if sql.startswith('SELECT')]) == 1
+
+    # Deactivating the block affects all of its bookings, but not the afternoon
+    assert morning.affected_appointments(monday, is_active=False).count() == 2
@@ -1,8 +1,12 @@
 """
 Tests for User model in Rafad Clinic System
 """
+import threading
+
 import pytest
 from app.models.user import User
+from app.utils.passwords import VerifierBusy
+from tests.helpers import DEFAULT_PASSWORD, create_user
 
 
 def test_password_setter(_db):
@@ -103,4 +107,32 @@ def test_duplicate_username(_db):
     # Should raise an integrity error due to unique constraint
     with pytest.raises(Exception) as e:
         _db.session.commit()
-    _db.session.rollback()
\ No newline at end of file
+    _db.session.rollback()
+
+def test_outdated_hash_is_upgraded_on_login(_db, app, monkeypatch):
+    """A correct password re-hashes a hash made with an older method"""
+    user = create_user(password='cat')
+    _db.session.commit()
+    old_hash = user.password_hash
+
+    monkeypatch.setitem(app.config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1500')
+    assert user.verify_password('dog') is False
+    assert user.password_hash == old_hash
+
+    assert user.verify_password('cat') is True
+    assert user.password_hash.startswith('pbkdf2:sha256:1500$')
+    assert user.verify_password('cat') is True
+
+
+def test_login_is_turned_away_when_verifier_is_busy(client, app, monkeypatch, test_patient_user):
+    """With every verification slot taken, logins fail fast with 503"""
+    busy = threading.BoundedSemaphore(1)
+    busy.acquire()
+    monkeypatch.setitem(app.extensions, 'password_verifier', busy)
+    monkeypatch.setitem(app.config, 'PASSWORD_VERIFY_TIMEOUT', 0.01)
+
+    with pytest.raises(VerifierBusy):
+        test_patient_user.verify_password(DEFAULT_PASSWORD)
+    response = client.post('/auth/login', data={
+        'email': test_patient_user.email, 'password': DEFAULT_PASSWORD, 'role': 'patient'})
+    assert response.status_code == 503
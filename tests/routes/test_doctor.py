@@ -0,0 +1,112 @@
+"""
+Tests for doctor routes in Rafad Clinic System
+"""
+from datetime import date, datetime, timedelta
+
+from flask import url_for
+from sqlalchemy import event
+
+from app.utils.day_sheet import load_day_sheet
+from tests.helpers import create_appointment, create_user, login_as, parse_json
+
+
+def test_day_sheet_is_one_query(_db, test_patient, test_doctor):
+    """Appointments and their patients come back in a single statement"""
+    today = date.today()
+    create_appointment(test_patient, test_doctor, appointment_date=today, start='09:00')
+    create_appointment(test_patient, test_doctor, appointment_date=today + timedelta(days=3))
+    create_appointment(test_patient, test_doctor, appointment_date=today + timedelta(days=30))
+    _db.session.commit()
+    doctor_id = test_doctor.id
+    _db.session.expunge_all()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(_db.engine, 'before_cursor_execute', listener)
+    try:
+        sheet = load_day_sheet(doctor_id, days=7)
+        names = [a.patient.full_name for a in sheet['todays_appointments'] + sheet['upcoming_appointments']]
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', listener)
+
+    assert len(statements) == 1
+    assert len(sheet['todays_appointments']) == 1
+    assert len(sheet['upcoming_appointments']) == 1
+    assert names == ['Test Patient', 'Test Patient']
+
+
+def test_dashboard_renders_day_sheet(doctor_auth_client, test_patient, test_doctor):
+    """Today's and upcoming appointments are rendered"""
+    create_appointment(test_patient, test_doctor, appointment_date=date.today(), reason='Checkup today')
+    create_appointment(test_patient, test_doctor, appointment_date=date.today() + timedelta(days=2),
+                       reason='Follow-up later')
+
+    response = doctor_auth_client.get(url_for('doctor.dashboard'))
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert 'Checkup today' in html
+    assert 'Follow-up later' in html
+
+
+def test_day_sheet_feed_is_incremental(_db, doctor_auth_client, test_patient, test_doctor):
+    """A refresh sends only changed rows and drops cancelled ones from ids"""
+    kept = create_appointment(test_patient, test_doctor, appointment_date=date.today())
+    cancelled = create_appointment(test_patient, test_doctor, appointment_date=date.today() + timedelta(days=1))
+    _db.session.commit()
+
+    full = parse_json(doctor_auth_client.get(url_for('doctor.day_sheet')))
+    assert full['full'] is True
+    assert sorted(full['ids']) == sorted([kept.id, cancelled.id])
+    assert full['fields'][0] == 'id' and len(full['rows']) == 2
+
+    since = (datetime.utcnow() - timedelta(seconds=1)).isoformat()
+    kept.updated_at = datetime.utcnow() - timedelta(minutes=5)
+    cancelled.status = 'cancelled'
+    _db.session.commit()
+
+    update = parse_json(doctor_auth_client.get(url_for('doctor.day_sheet', since=since)))
+    assert update['full'] is False
+    assert [row[0] for row in update['rows']] == [cancelled.id]
+    assert update['rows'][0][full['fields'].index('status')] == 'cancelled'
+    assert update['ids'] == [kept.id]
+
+
+def test_day_sheet_feed_rejects_bad_since(doctor_auth_client, test_doctor):
+    """since must be an ISO 8601 datetime"""
+    response = doctor_auth_client.get(url_for('doctor.day_sheet', since='yesterday'))
+    assert response.status_code == 400
+
+
+def test_bulk_status_shows_up_in_incremental_feed(doctor_auth_client, _db, test_patient, test_doctor):
+    """Bulk changes touch updated_at, so the day sheet refresh sends them"""
+    today = date.today()
+    first = create_appointment(test_patient, test_doctor, appointment_date=today, start='09:00')
+    second = create_appointment(test_patient, test_doctor, appointment_date=today, start='09:30')
+    _db.session.commit()
+    since = datetime.utcnow()
+
+    response = doctor_auth_client.post(url_for('api.bulk_update_status'),
+                                       json={'ids': [first.id, second.id], 'status': 'no_show'})
+    assert parse_json(response)['updated'] == sorted([first.id, second.id])
+
+    feed = parse_json(doctor_auth_client.get(url_for('doctor.day_sheet', since=since.isoformat())))
+    status = feed['fields'].index('status')
+    assert sorted(row[status] for row in feed['rows']) == ['no_show', 'no_show']
+
+    response = doctor_auth_client.post(url_for('api.bulk_update_status'), json={'ids': 'all', 'status': 'no_show'})
+    assert response.status_code == 400
+    response = doctor_auth_client.post(url_for('api.bulk_update_status'),
+                                       json={'ids': [first.id], 'status': ['no_show']})
+    assert response.status_code == 400
+
+
+def test_bulk_status_needs_a_doctor_profile(client, _db, test_patient, test_doctor):
+    appointment = create_appointment(test_patient, test_doctor)
+    user = create_user(role='doctor')
+    _db.session.commit()
+
+    response = login_as(client, user).post(url_for('api.bulk_update_status'),
+                                           json={'ids': [appointment.id], 'status': 'completed'})
+
+    assert response.status_code == 403
+    assert appointment.status == 'scheduled'
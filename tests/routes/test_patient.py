@@ -0,0 +1,68 @@
+"""
+Tests for patient routes in Rafad Clinic System
+"""
+from datetime import date, timedelta
+
+from flask import url_for
+
+from app.routes.patient import DASHBOARD_PAGE_SIZE
+from tests.helpers import create_appointment, parse_json
+
+
+def _book_history(patient, doctor, past=12, upcoming=7):
+    """Create past and upcoming appointments, one per day"""
+    for n in range(1, past + 1):
+        create_appointment(patient, doctor, appointment_date=date.today() - timedelta(days=n),
+                           status='completed')
+    for n in range(1, upcoming + 1):
+        create_appointment(patient, doctor, appointment_date=date.today() + timedelta(days=n))
+
+
+def test_dashboard_shows_first_page_and_totals(auth_client, test_patient, test_doctor):
+    """The dashboard renders only the first page of each list plus the counters"""
+    _book_history(test_patient, test_doctor)
+
+    response = auth_client.get(url_for('patient.dashboard'))
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert html.count('<span class="badge bg-success">completed</span>') == DASHBOARD_PAGE_SIZE
+    assert html.count('Load more</button>') == 2
+    assert '<div class="h4 mb-0">12</div>' in html
+
+
+def test_appointment_history_pages_with_cursor(auth_client, test_patient, test_doctor):
+    """Following next_cursor walks the whole history without gaps or repeats"""
+    _book_history(test_patient, test_doctor)
+
+    seen, cursor = [], None
+    while True:
+        params = {'kind': 'past', 'limit': 5}
+        if cursor:
+            params['cursor'] = cursor
+        data = parse_json(auth_client.get(url_for('patient.appointment_history', **params)))
+        seen.extend(item['date'] for item in data['appointments'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == 12
+    assert seen == sorted(seen, reverse=True)
+
+
+
+def test_upcoming_skips_stale_scheduled_appointments(auth_client, test_patient, test_doctor):
+    """A past-dated booking still marked scheduled does not take an upcoming slot"""
+    create_appointment(test_patient, test_doctor, appointment_date=date.today() - timedelta(days=3))
+    _book_history(test_patient, test_doctor, past=0, upcoming=5)
+
+    data = parse_json(auth_client.get(url_for('patient.appointment_history', kind='upcoming', limit=5)))
+
+    expected = [(date.today() + timedelta(days=n)).strftime('%Y-%m-%d') for n in range(1, 6)]
+    assert [item['date'] for item in data['appointments']] == expected
+    assert data['next_cursor'] is None
+
+def test_appointment_history_rejects_bad_input(auth_client, test_patient):
+    """Unknown kinds and malformed cursors are client errors"""
+    assert auth_client.get(url_for('patient.appointment_history', kind='all')).status_code == 400
+    response = auth_client.get(url_for('patient.appointment_history', cursor='not-a-cursor'))
+    assert response.status_code == 400
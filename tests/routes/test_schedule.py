@@ -0,0 +1,75 @@
+"""
+Tests for schedule routes in Rafad Clinic System
+"""
+from datetime import date, timedelta
+
+from flask import url_for
+
+from app.models import Schedule
+from tests.helpers import create_appointment, create_schedule
+
+
+def test_edit_creates_version_and_lists_affected_bookings(doctor_auth_client, _db, test_patient, test_doctor):
+    """Editing hours from a date starts a new version and warns about bookings outside them"""
+    today = date.today()
+    schedule = create_schedule(test_doctor, day_of_week=today.weekday(), start='09:00', end='17:00')
+    next_week = today + timedelta(days=7)
+    create_appointment(test_patient, test_doctor, appointment_date=next_week, start='09:00')
+    create_appointment(test_patient, test_doctor, appointment_date=next_week, start='14:00')
+    _db.session.commit()
+    schedule_id = schedule.id
+
+    response = doctor_auth_client.post(url_for('schedule.edit', schedule_id=schedule_id), data={
+        'day_of_week': today.weekday(),
+        'start_time': '12:00',
+        'end_time': '17:00',
+        'is_available': 'y',
+        'effective_from': (today + timedelta(days=1)).isoformat(),
+    }, follow_redirects=True)
+
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert '1 existing appointment(s) fall outside the new hours' in html
+    assert next_week.strftime('%d/%m/%Y') + ' 09:00' in html
+
+    assert Schedule.query.get(schedule_id).valid_to == today
+    assert Schedule.for_date(test_doctor.id, today).start_time.hour == 9
+    assert Schedule.for_date(test_doctor.id, next_week).start_time.hour == 12
+
+
+def test_edit_current_version_with_a_pending_change(doctor_auth_client, _db, test_doctor):
+    """The current hours can still be edited once a later change is queued"""
+    today = date.today()
+    current = create_schedule(test_doctor, day_of_week=today.weekday(), start='09:00', end='17:00')
+    _db.session.commit()
+    pending = current.supersede(today + timedelta(days=14), start_time=current.start_time.replace(hour=10))
+    _db.session.commit()
+    current_id = current.id
+
+    response = doctor_auth_client.post(url_for('schedule.edit', schedule_id=current_id), data={
+        'day_of_week': today.weekday(),
+        'start_time': '08:00',
+        'end_time': '16:00',
+        'is_available': 'y',
+        'effective_from': (today + timedelta(days=1)).isoformat(),
+    }, follow_redirects=True)
+
+    assert 'overlaps with another schedule' not in response.get_data(as_text=True)
+    assert Schedule.for_date(test_doctor.id, today + timedelta(days=7)).start_time.hour == 8
+    assert Schedule.for_date(test_doctor.id, today + timedelta(days=14)).id == pending.id
+
+
+def test_delete_keeps_the_end_of_an_expired_version(doctor_auth_client, _db, test_doctor):
+    """Deleting a version that already ended does not bring it back into effect"""
+    today = date.today()
+    ended = today - timedelta(days=10)
+    old = create_schedule(test_doctor, valid_from=today - timedelta(days=30), valid_to=ended)
+    create_schedule(test_doctor, valid_from=ended + timedelta(days=1))
+    _db.session.commit()
+    old_id = old.id
+
+    response = doctor_auth_client.post(url_for('schedule.delete', schedule_id=old_id),
+                                       data={'schedule_id': old_id})
+
+    assert response.status_code == 302
+    assert _db.session.get(Schedule, old_id).valid_to == ended
@@ -0,0 +1,83 @@
+"""
+Tests for write-behind activity tracking
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.models import User
+from app.utils import activity
+from tests.helpers import DEFAULT_PASSWORD, create_user, login
+
+NOW = datetime(2026, 10, 19, 9, 0)
+
+
+def test_login_writes_nothing_until_flush(app, client, _db):
+    user = create_user(email='tracked@example.com')
+    _db.session.commit()
+
+    writes = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(('SELECT', 'SAVEPOINT', 'RELEASE', 'ROLLBACK')):
+            writes.append(statement)
+
+    event.listen(_db.engine, 'before_cursor_execute', collect)
+    try:
+        response = login(client, user.email, DEFAULT_PASSWORD)
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', collect)
+
+    assert response.status_code == 200
+    assert writes == []
+    assert activity.pending()[user.id]['last_login'] is not None
+
+    assert activity.flush() == 1
+    _db.session.refresh(user)
+    assert user.last_login is not None and user.last_seen >= user.last_login
+    assert activity.pending() == {}
+
+
+def test_flush_batches_users_and_keeps_earlier_logins(app, _db):
+    first = create_user(email='first@example.com')
+    second = create_user(email='second@example.com')
+    first.last_login = datetime(2026, 1, 1)
+    _db.session.commit()
+
+    activity.record_seen(first.id, now=NOW)
+    activity.record_login(second.id, now=NOW)
+    assert activity.flush() == 2
+
+    _db.session.expire_all()
+    assert (first.last_login, first.last_seen) == (datetime(2026, 1, 1), NOW)
+    assert (second.last_login, second.last_seen) == (NOW, NOW)
+
+
+def test_failed_flush_keeps_times_for_the_next_one(app, _db, monkeypatch):
+    user = create_user(email='retry@example.com')
+    _db.session.commit()
+    activity.record_login(user.id, now=NOW)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('database is locked')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(_db.session, 'execute', broken)
+        with pytest.raises(RuntimeError):
+            activity.flush()
+
+    assert activity.pending()[user.id]['last_login'] == NOW
+    assert activity.flush() == 1
+
+
+def test_admin_users_page_shows_unwritten_logins(app, admin_auth_client, _db):
+    user = create_user(email='recent@example.com')
+    _db.session.commit()
+    activity.record_login(user.id, now=NOW)
+
+    response = admin_auth_client.get('/admin/users')
+
+    assert response.status_code == 200
+    assert b'2026-10-19 09:00' in response.data
+    assert _db.session.get(User, user.id).last_login is None
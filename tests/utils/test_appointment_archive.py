@@ -0,0 +1,107 @@
+"""
+Tests for archiving historical appointments in Rafad Clinic System
+"""
+from datetime import date, timedelta
+
+from flask import url_for
+
+from app.models import Appointment, ArchivedAppointment
+from app.utils.appointment_archive import archive_appointments, archive_boundary
+from tests.helpers import create_appointment, parse_json
+
+OLD = date.today() - timedelta(days=800)
+CUTOFF = date.today() - timedelta(days=730)
+
+
+def _history(_db, test_patient, test_doctor):
+    """Two old finished visits, an old booking never closed and a recent visit"""
+    old_done = create_appointment(test_patient, test_doctor, appointment_date=OLD, status='completed')
+    old_cancelled = create_appointment(test_patient, test_doctor, appointment_date=OLD + timedelta(days=1),
+                                       status='cancelled')
+    old_open = create_appointment(test_patient, test_doctor, appointment_date=OLD + timedelta(days=2))
+    recent = create_appointment(test_patient, test_doctor, appointment_date=date.today() - timedelta(days=5),
+                                status='completed')
+    _db.session.commit()
+    return old_done.id, old_cancelled.id, old_open.id, recent.id
+
+
+def test_archive_moves_only_old_finished_appointments(_db, test_patient, test_doctor):
+    """Finished rows past the cutoff move; counters and the boundary stay consistent"""
+    old_done, old_cancelled, old_open, recent = _history(_db, test_patient, test_doctor)
+    counters = (test_patient.completed_count, test_patient.cancelled_count, test_patient.upcoming_count)
+
+    assert archive_appointments(CUTOFF, dry_run=True)['moved'] == 2
+    assert archive_boundary() is None
+
+    report = archive_appointments(CUTOFF, chunk_size=1)
+
+    assert report['moved'] == 2
+    assert archive_boundary() == CUTOFF
+    assert {a.id for a in ArchivedAppointment.query} == {old_done, old_cancelled}
+    assert {a.id for a in Appointment.query} == {old_open, recent}
+
+    test_patient.recalculate_appointment_counters([test_patient.id])
+    _db.session.refresh(test_patient)
+    assert (test_patient.completed_count, test_patient.cancelled_count,
+            test_patient.upcoming_count) == counters
+
+
+def test_archived_appointment_is_shown_read_only(admin_auth_client, _db, test_patient, test_doctor):
+    """Archived visits still open, without edit or delete actions"""
+    old_done, _, _, recent = _history(_db, test_patient, test_doctor)
+    archive_appointments(CUTOFF)
+
+    html = admin_auth_client.get(url_for('appointment.view', id=old_done)).get_data(as_text=True)
+    assert 'Archived' in html
+    assert url_for('appointment.edit', id=old_done) not in html
+
+    html = admin_auth_client.get(url_for('appointment.view', id=recent)).get_data(as_text=True)
+    assert url_for('appointment.view', id=old_done) in html
+    assert url_for('appointment.edit', id=recent) in html
+
+
+def test_patient_history_continues_into_the_archive(auth_client, _db, test_patient, test_doctor):
+    """"Load more" pages run from live appointments into archived ones"""
+    old_done, old_cancelled, _, recent = _history(_db, test_patient, test_doctor)
+    archive_appointments(CUTOFF)
+
+    seen, cursor = [], None
+    while True:
+        params = {'kind': 'past', 'limit': 1}
+        if cursor:
+            params['cursor'] = cursor
+        data = parse_json(auth_client.get(url_for('patient.appointment_history', **params)))
+        seen += [item['id'] for item in data['appointments']]
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == [recent, old_cancelled, old_done]
+
+
+def test_reports_include_archived_appointments(admin_auth_client, _db, test_patient, test_doctor):
+    """All-time reports count the archive too"""
+    _history(_db, test_patient, test_doctor)
+    archive_appointments(CUTOFF)
+
+    data = parse_json(admin_auth_client.get(url_for('reporting.api_appointments_status')))
+    counts = dict(zip(data['labels'], data['datasets'][0]['data']))
+    assert counts == {'completed': 2, 'cancelled': 1, 'scheduled': 1}
+
+    csv = admin_auth_client.get(url_for('reporting.export_csv')).get_data(as_text=True)
+    assert len(csv.strip().splitlines()) == 5
+
+
+def test_new_bookings_never_reuse_archived_ids(_db, test_patient, test_doctor):
+    """Deleting the newest appointment after archiving does not free an archived ID"""
+    old_done, old_cancelled, old_open, recent = _history(_db, test_patient, test_doctor)
+    archive_appointments(CUTOFF)
+    for appointment_id in (recent, old_open):
+        _db.session.delete(_db.session.get(Appointment, appointment_id))
+    _db.session.commit()
+
+    booked = create_appointment(test_patient, test_doctor, appointment_date=date.today() + timedelta(days=1))
+    _db.session.commit()
+
+    assert booked.id > recent
+    assert {a.id for a in ArchivedAppointment.query} == {old_done, old_cancelled}
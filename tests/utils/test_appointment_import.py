@@ -0,0 +1,116 @@
+"""
+Tests for the bulk appointment import in Rafad Clinic System
+"""
+import io
+from datetime import date, timedelta
+
+from flask import url_for
+
+from app.models import Appointment, Patient
+from app.utils.appointment_import import import_appointments, iter_rows, write_rejects
+from tests.helpers import create_appointment
+
+DAY = date.today() + timedelta(days=3)
+
+
+def _csv(*lines):
+    header = 'patient_email,doctor_id,date,start,duration,status,reason\n'
+    return io.StringIO(header + ''.join(line + '\n' for line in lines))
+
+
+def test_import_resolves_references_and_rejects_bad_rows(_db, test_patient, test_doctor):
+    """Valid rows are inserted; clashes and unknown references are reported by line"""
+    create_appointment(test_patient, test_doctor, appointment_date=DAY, start='09:00')
+    _db.session.commit()
+    email = test_patient.user.email.upper()
+    stream = _csv(
+        f'{email},{test_doctor.id},{DAY},10:00,30,scheduled,Imported',
+        f'{email},{test_doctor.id},{DAY},10:15,30,scheduled,Clashes with the row above',
+        f'{email},{test_doctor.id},{DAY},09:00,30,completed,Clashes with existing',
+        f'{email},{test_doctor.id},{DAY},09:00,30,cancelled,Cancelled rows never clash',
+        f'nobody@example.com,{test_doctor.id},{DAY},11:00,30,scheduled,',
+        f'{email},{test_doctor.id},not-a-date,11:00,30,scheduled,',
+        f'{email},{test_doctor.id},{DAY - timedelta(days=400)},11:00,30,completed,Historical',
+    )
+
+    report = import_appointments(iter_rows(stream), chunk_size=2)
+
+    assert report['total'] == 7
+    assert report['inserted'] == 3
+    assert [(item['line'], item['error']) for item in report['rejected']] == [
+        (3, 'Conflicts with appointment at 10:00'),
+        (4, 'Conflicts with appointment at 09:00'),
+        (6, 'Unknown patient: nobody@example.com'),
+        (7, 'Date must be YYYY-MM-DD'),
+    ]
+    assert Appointment.query.filter_by(reason='Imported').one().end_time.strftime('%H:%M') == '10:30'
+
+    # Bulk inserts bypass the ORM listeners; counters are recalculated
+    patient = Patient.query.get(test_patient.id)
+    assert (patient.upcoming_count, patient.completed_count, patient.cancelled_count) == (2, 1, 1)
+
+    output = io.StringIO()
+    write_rejects(report['rejected'], output)
+    assert output.getvalue().splitlines()[1].startswith('3,Conflicts with appointment at 10:00,')
+
+
+def test_dry_run_saves_nothing(_db, test_patient, test_doctor):
+    """A dry run validates every row without inserting"""
+    stream = io.StringIO(f'{{"patient_id": {test_patient.id}, "doctor_id": {test_doctor.id}, '
+                         f'"date": "{DAY}", "start": "10:00", "end": "10:20"}}\nnot json\n')
+
+    report = import_appointments(iter_rows(stream, 'jsonl'), dry_run=True)
+
+    assert report['valid'] == 1 and report['inserted'] == 0
+    assert report['rejected'][0]['error'] == 'Invalid JSON'
+    assert Appointment.query.count() == 0
+
+
+def test_odd_json_values_are_rejected_not_fatal(_db, test_patient, test_doctor):
+    """Non-string statuses and non-numeric durations land in the rejects"""
+    rows = [
+        {'patient_id': test_patient.id, 'doctor_id': test_doctor.id, 'date': str(DAY), 'start': '10:00', 'status': 1},
+        {'patient_id': test_patient.id, 'doctor_id': test_doctor.id, 'date': str(DAY), 'start': '11:00',
+         'duration': [30]},
+        {'patient_id': test_patient.id, 'doctor_id': test_doctor.id, 'date': str(DAY), 'start': '12:00',
+         'reason': 42},
+    ]
+
+    report = import_appointments(enumerate(rows, start=1))
+
+    assert [(item['line'], item['error']) for item in report['rejected']] == [
+        (1, 'Invalid status: 1'),
+        (2, 'Times must be HH:MM and duration whole minutes'),
+    ]
+    assert Appointment.query.one().reason == '42'
+
+
+def test_admin_upload(admin_auth_client, test_patient, test_doctor):
+    """Admins can upload a file and see the report"""
+    data = f'patient_id,doctor_id,date,start\n{test_patient.id},{test_doctor.id},{DAY},10:00\n'
+
+    response = admin_auth_client.post(url_for('admin.import_appointments'), data={
+        'file': (io.BytesIO(data.encode()), 'legacy.csv'),
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert '1 imported' in response.get_data(as_text=True)
+    assert Appointment.query.filter_by(doctor_id=test_doctor.id).count() == 1
+
+
+def test_admin_upload_has_its_own_size_limit(app, monkeypatch, admin_auth_client, test_patient, test_doctor):
+    """Import files may exceed MAX_CONTENT_LENGTH up to IMPORT_MAX_CONTENT_LENGTH"""
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+    notes = 'n' * 4096
+    data = f'patient_id,doctor_id,date,start,notes\n{test_patient.id},{test_doctor.id},{DAY},10:00,{notes}\n'
+
+    def upload():
+        return admin_auth_client.post(url_for('admin.import_appointments'), data={
+            'file': (io.BytesIO(data.encode()), 'legacy.csv'),
+        }, content_type='multipart/form-data')
+
+    assert upload().status_code == 200
+    assert Appointment.query.filter_by(doctor_id=test_doctor.id).one().notes == notes
+
+    monkeypatch.setitem(app.config, 'IMPORT_MAX_CONTENT_LENGTH', 2048)
+    assert upload().status_code == 413
@@ -0,0 +1,64 @@
+"""
+Tests for the static asset pipeline
+"""
+import gzip
+import shutil
+
+import pytest
+
+from app.utils.assets import BUNDLES, DIST_DIR, build_assets, minify_css, minify_js
+
+
+@pytest.fixture
+def built(app, tmp_path, monkeypatch):
+    """A copy of the static folder with a fresh build, linked by the templates"""
+    static = tmp_path / 'static'
+    shutil.copytree(app.static_folder, static, ignore=shutil.ignore_patterns(DIST_DIR))
+    monkeypatch.setattr(app, 'static_folder', str(static))
+    monkeypatch.setitem(app.config, 'ASSET_BUNDLES', True)
+    return build_assets(str(static))
+
+
+def test_minifiers_keep_strings_and_code():
+    css = minify_css('/* nav */\na :hover ,\n.b > .c {\n  content: "a  /* b */";\n  color : red;\n}\n')
+    js = minify_js('/**\n * Header\n */\n  // note\nconst url = "http://x";  // kept\n\n  go(url);\n')
+
+    assert css == 'a :hover,.b>.c{content:"a  /* b */";color :red}\n'
+    assert js == 'const url = "http://x";  // kept\ngo(url);\n'
+
+
+def test_pages_link_source_files_until_built(client):
+    page = client.get('/').data.decode()
+
+    for source in BUNDLES['app.css'] + BUNDLES['app.js']:
+        assert f'/static/{source}' in page
+    assert f'/static/{DIST_DIR}/' not in page
+
+
+def test_pages_link_fingerprinted_bundles(client, built):
+    page = client.get('/').data.decode()
+
+    assert built['app.css'].startswith('dist/css/app.') and built['app.css'].endswith('.css')
+    assert f'/static/{built["app.css"]}' in page
+    assert f'/static/{built["app.js"]}' in page
+    assert f'/static/{built["img/logo.svg"]}' in page
+    assert '/static/css/main.css' not in page
+    # Same content, same names: a rebuild does not bust browser caches
+    assert build_assets(client.application.static_folder) == built
+
+
+def test_built_files_are_immutable_and_precompressed(client, built):
+    url = f'/static/{built["app.js"]}'
+
+    compressed = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+    plain = client.get(url)
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.mimetype in ('text/javascript', 'application/javascript')
+    assert gzip.decompress(compressed.data) == plain.data
+    assert 'Content-Encoding' not in plain.headers
+    for response in (compressed, plain):
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'max-age=31536000' in response.headers['Cache-Control']
+        assert response.headers['Vary'] == 'Accept-Encoding'
+    assert 'immutable' not in client.get('/static/css/main.css').headers.get('Cache-Control', '')
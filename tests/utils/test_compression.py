@@ -0,0 +1,62 @@
+"""
+Tests for response compression
+"""
+import gzip
+import zlib
+
+from flask import Response, request
+
+from app.utils.compression import choose_encoding, compress_response
+
+
+def test_pages_are_gzipped_when_accepted(client):
+    plain = client.get('/')
+    compressed = client.get('/', headers={'Accept-Encoding': 'br;q=0, gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert int(compressed.headers['Content-Length']) == len(compressed.data) < len(plain.data)
+    assert gzip.decompress(compressed.data) == plain.data
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+
+
+def test_small_and_unlisted_responses_are_left_alone(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'COMPRESS_MIN_SIZE', 10 ** 6)
+    small = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    monkeypatch.setitem(app.config, 'COMPRESS_MIN_SIZE', 0)
+    image = client.get('/static/img/logo.svg', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in small.headers
+    assert 'Accept-Encoding' in small.headers['Vary']
+    assert 'Content-Encoding' not in image.headers
+
+
+def test_streamed_responses_are_compressed_chunk_by_chunk(app):
+    closed = []
+
+    class Rows:
+        def __iter__(self):
+            yield from ('id,status\n', '1,scheduled\n', '2,completed\n')
+
+        def close(self):
+            closed.append(True)
+
+    with app.test_request_context('/', headers={'Accept-Encoding': 'gzip'}):
+        response = compress_response(Response(Rows(), mimetype='text/csv'))
+        chunks = list(response.response)
+        response.close()
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(chunks) == 4  # one flushed block per row, then the trailer
+    stream = zlib.decompressobj(31)
+    assert stream.decompress(chunks[0]) == b'id,status\n'
+    assert stream.decompress(b''.join(chunks[1:])) == b'1,scheduled\n2,completed\n'
+    assert closed == [True]
+
+
+def test_encoding_follows_client_quality_then_server_order(app):
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip;q=0.5, br'}):
+        assert choose_encoding(request.accept_encodings, ['br', 'gzip']) == 'br'
+        assert choose_encoding(request.accept_encodings, ['gzip']) == 'gzip'
+    with app.test_request_context(headers={'Accept-Encoding': 'identity'}):
+        assert choose_encoding(request.accept_encodings, ['br', 'gzip']) is None
@@ -0,0 +1,115 @@
+"""
+Tests for template fragment caching
+"""
+from datetime import time
+
+from sqlalchemy import event
+
+from app.models import Schedule, User
+from app.utils import activity
+from app.utils.fragment_cache import LRUBackend, get_fragment_cache
+from tests.helpers import create_schedule
+
+TEMPLATE = "{% cache 'names', depends=['doctors'], vary=selected %}{{ render() }}{% endcache %}"
+
+
+def test_lru_backend_evicts_oldest_and_expires(app):
+    backend = LRUBackend(max_entries=2)
+    backend.set('a', 'A', 60)
+    backend.set('b', 'B', 60)
+    backend.get('a')
+    backend.set('c', 'C', 60)
+
+    assert backend.get('a') == 'A'
+    assert backend.get('b') is None
+    backend.set('d', 'D', -1)
+    assert backend.get('d') is None
+
+
+def test_fragment_is_cached_per_vary_value(app):
+    renders = []
+
+    def render():
+        renders.append(1)
+        return f'render {len(renders)}'
+
+    template = app.jinja_env.from_string(TEMPLATE)
+    with app.test_request_context():
+        first = template.render(render=render, selected=1)
+        again = template.render(render=render, selected=1)
+        other = template.render(render=render, selected=2)
+
+    assert first == again == 'render 1'
+    assert other == 'render 2'
+    assert get_fragment_cache().stats == {'hits': 1, 'misses': 2}
+
+
+def test_doctor_write_invalidates_fragments(app, _db, test_doctor):
+    template = app.jinja_env.from_string(TEMPLATE)
+    with app.test_request_context():
+        before = template.render(render=lambda: test_doctor.first_name, selected=None)
+        test_doctor.first_name = 'Renamed'
+        _db.session.commit()
+        after = template.render(render=lambda: test_doctor.first_name, selected=None)
+
+    assert before != 'Renamed'
+    assert after == 'Renamed'
+
+
+def test_cached_doctor_options_skip_the_query(app, auth_client, _db, test_doctor):
+    queries = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM doctors JOIN users' in statement:
+            queries.append(statement)
+
+    event.listen(_db.engine, 'before_cursor_execute', collect)
+    try:
+        first = auth_client.get('/appointment/calendar')
+        second = auth_client.get('/appointment/calendar')
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', collect)
+
+    assert first.status_code == second.status_code == 200
+    assert test_doctor.full_name.encode() in second.data
+    assert len(queries) == 1
+
+
+
+def test_cached_weekly_grid_skips_the_query(app, doctor_auth_client, _db, test_doctor):
+    create_schedule(test_doctor, day_of_week=0, start='09:00', end='12:00')
+    _db.session.commit()
+    queries = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM schedules' in statement:
+            queries.append(statement)
+
+    event.listen(_db.engine, 'before_cursor_execute', collect)
+    try:
+        first = doctor_auth_client.get('/schedule/manage')
+        second = doctor_auth_client.get('/schedule/manage')
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', collect)
+
+    assert first.status_code == second.status_code == 200
+    assert b'09:00 AM' in second.data
+    # Both pages list pending changes; only the first builds the grid
+    assert len(queries) == 3
+
+def test_bulk_writes_invalidate_fragments(app, _db, test_doctor):
+    cache = get_fragment_cache()
+    schedules, users = cache.versions['schedules'], cache.versions['users']
+    _db.session.execute(_db.insert(Schedule), [{
+        'doctor_id': test_doctor.id, 'day_of_week': 2, 'start_time': time(9), 'end_time': time(12)}])
+    _db.session.execute(_db.update(User).where(User.id == test_doctor.user_id).values(is_active=False))
+    _db.session.commit()
+
+    assert cache.versions['schedules'] > schedules
+    assert cache.versions['users'] > users
+
+    # Activity flushes only write last seen times
+    users = cache.versions['users']
+    activity.record_seen(test_doctor.user_id)
+    assert activity.flush() == 1
+    assert cache.versions['users'] == users
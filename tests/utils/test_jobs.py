@@ -0,0 +1,151 @@
+"""
+Tests for the database-backed background jobs in Rafad Clinic System
+"""
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from flask import url_for
+
+from app import create_app, db
+from app.models import Appointment, Job
+from app.utils import jobs
+from config import TestingConfig
+from tests.helpers import parse_json
+
+
+@pytest.fixture
+def job_folder(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_FOLDER', str(tmp_path))
+    return tmp_path
+
+
+def test_worker_runs_export_and_result_downloads(admin_auth_client, job_folder, test_appointment):
+    """A queued export is run by the worker and its file served through the API"""
+    response = admin_auth_client.post(url_for('jobs_api.create_job'), json={'kind': 'export_appointments'})
+    assert response.status_code == 202
+    job_url = response.headers['Location']
+
+    jobs.run_worker('testing', processes=0, once=True, log=lambda line: None)
+
+    data = parse_json(admin_auth_client.get(job_url))
+    assert data['status'] == 'succeeded'
+    assert data['progress'] == 100
+    assert data['result'] == {'appointments': 1}
+
+    csv = admin_auth_client.get(data['download_url']).get_data(as_text=True)
+    assert csv.splitlines()[1].startswith(f'{test_appointment.id},')
+
+
+def test_failed_job_is_retried_then_fails(_db, job_folder, monkeypatch):
+    """Failures back off and are retried until max_attempts"""
+    def broken(context, params):
+        context.progress(50, 'Half way')
+        raise RuntimeError('Disk full')
+
+    monkeypatch.setitem(jobs.JOB_KINDS, 'broken', jobs.JobKind('Broken', broken, 2))
+    job = jobs.enqueue('broken')
+
+    assert jobs.claim_job('test') == job.id
+    assert jobs.claim_job('test') is None
+    assert not jobs.run_job(job.id)
+    _db.session.refresh(job)
+    assert job.status == 'queued'
+    assert job.run_after > datetime.utcnow()
+    assert 'Disk full' in job.error
+
+    # Not due yet, so nothing to claim until the backoff has passed
+    assert jobs.claim_job('test') is None
+    job.run_after = datetime.utcnow() - timedelta(seconds=1)
+    _db.session.commit()
+    assert jobs.claim_job('test') == job.id
+    jobs.run_job(job.id)
+    _db.session.refresh(job)
+    assert (job.status, job.attempts) == ('failed', 2)
+    assert job.finished_at is not None
+
+
+def test_abandoned_job_is_requeued(_db, job_folder):
+    """Running jobs without a heartbeat count as a failed attempt"""
+    job = jobs.enqueue('recount_patient_counters')
+    jobs.claim_job('gone')
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=jobs.STALE_AFTER + 1)
+    _db.session.commit()
+
+    assert jobs.requeue_stale() == 1
+    _db.session.refresh(job)
+    assert job.status == 'queued'
+
+
+def test_import_upload_runs_in_background(admin_auth_client, _db, job_folder, test_patient, test_doctor):
+    """The import page can hand the file to a job, which keeps a rejects file"""
+    day = (datetime.now() + timedelta(days=3)).date()
+    upload = (f'patient_id,doctor_id,date,start,duration\n'
+              f'{test_patient.id},{test_doctor.id},{day},10:00,30\n'
+              f'{test_patient.id},999,{day},11:00,30\n')
+    response = admin_auth_client.post(url_for('admin.import_appointments'), data={
+        'file': (io.BytesIO(upload.encode()), 'legacy.csv'),
+        'background': '1',
+    }, content_type='multipart/form-data')
+    assert response.status_code == 302
+    assert Appointment.query.count() == 0
+
+    jobs.run_worker('testing', processes=0, once=True, log=lambda line: None)
+
+    job = Job.query.one()
+    assert job.status == 'succeeded'
+    assert job.summary['inserted'] == 1 and job.summary['rejected'] == 1
+    assert 'Unknown doctor' in (job_folder / job.result_file).read_text()
+    assert Appointment.query.count() == 1
+    # The upload is gone once the import has run
+    assert [path.name for path in job_folder.iterdir()] == [job.result_file]
+
+
+def test_old_job_files_are_pruned(_db, job_folder):
+    """Files past the retention period go, except uploads still waiting for their job"""
+    done = jobs.enqueue('export_appointments')
+    done.status, done.result_file = 'succeeded', 'job-1-appointments.csv'
+    waiting = jobs.enqueue('import_appointments', {'upload': 'upload-waiting'})
+    _db.session.commit()
+    old = time.time() - 8 * 86400
+    for name in ('job-1-appointments.csv', 'upload-waiting', 'upload-abandoned', 'job-2-recent.csv'):
+        (job_folder / name).write_text('data')
+        if name != 'job-2-recent.csv':
+            os.utime(job_folder / name, (old, old))
+
+    assert jobs.prune_job_files(retention_days=7) == 2
+
+    assert sorted(path.name for path in job_folder.iterdir()) == ['job-2-recent.csv', 'upload-waiting']
+    _db.session.refresh(done)
+    assert done.result_file is None
+    assert waiting.status == 'queued'
+
+
+def test_job_api_is_admin_only(auth_client):
+    response = auth_client.post(url_for('jobs_api.create_job'), json={'kind': 'export_appointments'})
+    assert response.status_code == 403
+
+
+def test_worker_runs_jobs_in_pool_processes(tmp_path, monkeypatch):
+    """Pool processes build their own app on the shared database and record the result"""
+    database = f'sqlite:///{tmp_path / "jobs.sqlite"}'
+    # Spawned processes read the environment; this process reads the patched class
+    monkeypatch.setenv('TEST_DATABASE_URL', database)
+    monkeypatch.setenv('JOB_FOLDER', str(tmp_path / 'jobs'))
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', database)
+    monkeypatch.setattr(TestingConfig, 'JOB_FOLDER', str(tmp_path / 'jobs'))
+    parent = create_app('testing')
+
+    with parent.app_context():
+        db.create_all()
+        job_ids = [jobs.enqueue('export_appointments').id, jobs.enqueue('recount_patient_counters').id]
+
+        jobs.run_worker('testing', processes=2, poll_interval=0.1, once=True, log=lambda line: None)
+
+        db.session.expire_all()
+        finished = [db.session.get(Job, job_id) for job_id in job_ids]
+        assert [job.status for job in finished] == ['succeeded', 'succeeded']
+        assert (tmp_path / 'jobs' / finished[0].result_file).exists()
+        db.session.remove()
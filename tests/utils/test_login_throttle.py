@@ -0,0 +1,108 @@
+"""
+Tests for login throttling
+"""
+from datetime import datetime, timedelta
+
+from flask import request
+
+from app.models import LoginThrottle, User
+from app.utils import login_throttle
+from tests.helpers import create_user, login
+
+NOW = datetime(2026, 10, 19, 9, 0)
+
+
+def test_sliding_window_estimate_weighs_previous_window():
+    window = timedelta(minutes=10)
+    row = LoginThrottle(key='ip:10.0.0.1', window_start=NOW, count=8, previous_count=0)
+
+    # A quarter into the next window, three quarters of the old failures still count
+    assert login_throttle.estimate(row, NOW + timedelta(minutes=12, seconds=30), window) == 6
+    assert row.previous_count == 8 and row.count == 0
+    # Two windows later nothing is left
+    assert login_throttle.estimate(row, NOW + timedelta(minutes=31), window) == 0
+
+
+def test_failures_add_doubling_delays_then_block(app, _db, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOGIN_THROTTLE_EMAIL_LIMIT', 6)
+
+    waits = [login_throttle.record_failure('10.0.0.1', 'Victim@example.com', now=NOW) for _ in range(6)]
+
+    assert waits == [0, 0, 0, 1, 2, app.config['LOGIN_THROTTLE_WINDOW']]
+    assert login_throttle.check('10.0.0.2', 'victim@example.com', now=NOW) == app.config['LOGIN_THROTTLE_WINDOW']
+    row = LoginThrottle.query.filter_by(key='email:victim@example.com').one()
+    assert row.count == 6 and row.rejected == 1
+    assert login_throttle.check('10.0.0.2', 'other@example.com', now=NOW) == 0
+
+
+def test_blocked_login_is_rejected_before_hashing(app, client, _db, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOGIN_THROTTLE_EMAIL_LIMIT', 2)
+    user = create_user(email='locked@example.com')
+    _db.session.commit()
+    for _ in range(2):
+        login(client, user.email, 'wrong-password')
+
+    verified = []
+    monkeypatch.setattr(User, 'verify_password', lambda self, password: verified.append(password) or True)
+    response = client.post('/auth/login', data={'email': user.email, 'password': 'password', 'role': 'patient'})
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    assert verified == []
+    assert login_throttle.metrics()['process']['rejected_email'] == 1
+
+
+def test_successful_login_forgets_email_failures(app, client, _db):
+    user = create_user(email='forgetful@example.com')
+    _db.session.commit()
+    login(client, user.email, 'wrong-password')
+    assert LoginThrottle.query.filter_by(key='email:forgetful@example.com').count() == 1
+
+    response = login(client, user.email, 'password')
+
+    assert response.status_code == 200
+    assert LoginThrottle.query.filter_by(key='email:forgetful@example.com').count() == 0
+    # The client IP keeps its count
+    assert LoginThrottle.query.filter(LoginThrottle.key.like('ip:%')).one().count == 1
+
+
+def test_memory_backend_keeps_counters_in_process(app, _db, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOGIN_THROTTLE_BACKEND', 'memory')
+    monkeypatch.setitem(app.config, 'LOGIN_THROTTLE_IP_LIMIT', 2)
+
+    login_throttle.record_failure('10.0.0.9', None, now=NOW)
+    login_throttle.record_failure('10.0.0.9', None, now=NOW)
+
+    assert login_throttle.check('10.0.0.9', 'anyone@example.com', now=NOW) > 0
+    assert LoginThrottle.query.count() == 0
+    stats = login_throttle.metrics(now=NOW)
+    assert stats['rejected']['ip'] == 1 and stats['blocked']['ip'] == 1
+
+
+def test_client_address_comes_from_trusted_proxy_header(monkeypatch):
+    from app import create_app
+    from config import TestingConfig
+
+    monkeypatch.setattr(TestingConfig, 'PROXY_FIX_X_FOR', 1)
+    fresh = create_app('testing')
+
+    @fresh.route('/_client-address')
+    def client_address():
+        return request.remote_addr
+
+    response = fresh.test_client().get('/_client-address', environ_base={'REMOTE_ADDR': '10.0.0.1'},
+                                       headers={'X-Forwarded-For': '203.0.113.9, 198.51.100.7'})
+    # Only the hop added by the one trusted proxy counts
+    assert response.get_data(as_text=True) == '198.51.100.7'
+
+
+def test_concurrent_failures_are_all_counted(app, _db):
+    login_throttle.record_failure('10.0.0.3', None, now=NOW)
+    # This worker still holds the row it loaded when another one counts a failure
+    row = LoginThrottle.query.filter_by(key='ip:10.0.0.3').one()
+    _db.session.execute(LoginThrottle.__table__.update().values(count=LoginThrottle.__table__.c.count + 1))
+
+    login_throttle.record_failure('10.0.0.3', None, now=NOW)
+
+    _db.session.refresh(row)
+    assert row.count == 3
@@ -0,0 +1,104 @@
+"""
+Tests for account registration and bulk patient onboarding
+"""
+import io
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Patient, User
+from app.utils.appointment_import import iter_rows
+from app.utils.registration import RegistrationConflict, conflict_fields, create_account, register_patients
+from tests.helpers import create_user
+
+PROFILE = {
+    'first_name': 'Sara', 'last_name': 'Ali', 'phone': '0555123456',
+    'gender': 'female', 'address': None, 'medical_history': None,
+}
+
+
+def _registration(**overrides):
+    data = {
+        'role': 'patient', 'username': 'newpatient', 'email': 'new@example.com',
+        'first_name': 'Sara', 'last_name': 'Ali', 'phone': '0555123456',
+        'date_of_birth': '1990-05-01', 'gender': 'female',
+        'password': 'Secret@123', 'confirm_password': 'Secret@123',
+    }
+    data.update(overrides)
+    return data
+
+
+def test_registration_checks_both_fields_in_one_query(client, _db):
+    create_user(username='taken', email='taken@example.com')
+    _db.session.commit()
+
+    queries = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM users' in statement:
+            queries.append(statement)
+
+    event.listen(_db.engine, 'before_cursor_execute', collect)
+    try:
+        response = client.post('/auth/register', data=_registration(username='taken', email='taken@example.com'))
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', collect)
+
+    assert response.status_code == 200
+    assert b'Username already in use.' in response.data
+    assert b'Email already registered.' in response.data
+    assert len(queries) == 1
+
+
+def test_registration_creates_user_and_profile(client, _db):
+    response = client.post('/auth/register', data=_registration())
+
+    assert response.status_code == 302
+    user = User.query.filter_by(email='new@example.com').one()
+    assert user.patient.first_name == 'Sara'
+
+
+def test_lost_race_is_mapped_to_the_clashing_field(_db):
+    from datetime import date
+
+    create_user(username='racer', email='racer@example.com')
+    _db.session.commit()
+
+    with pytest.raises(RegistrationConflict) as error:
+        create_account('patient', 'someone', 'racer@example.com', 'Secret@123',
+                       dict(PROFILE, date_of_birth=date(1990, 5, 1)))
+
+    assert error.value.fields == ['email']
+    assert conflict_fields(Exception('UNIQUE constraint failed: users.username')) == ['username']
+    assert conflict_fields(Exception('Key (email)=(a@b.c) already exists.')) == ['email']
+    assert User.query.filter_by(username='someone').count() == 0
+
+
+def test_register_patients_in_bulk(_db):
+    create_user(username='olduser', email='existing@example.com')
+    _db.session.commit()
+    stream = io.StringIO(
+        'email,first_name,last_name,phone,date_of_birth,gender,password\n'
+        'amal@example.com,Amal,Saleh,0555000001,1985-02-03,female,\n'
+        'omar@example.com,Omar,Hadi,0555000002,1979-11-30,male,Secret@123\n'
+        'AMAL@example.com,Amal,Again,0555000003,1985-02-03,female,\n'
+        'existing@example.com,Ex,Isting,0555000004,1990-01-01,male,\n'
+        'broken,No,Email,0555000005,1990-01-01,male,\n'
+        'late@example.com,Not,Born,0555000006,2999-01-01,male,\n'
+    )
+
+    report = register_patients(iter_rows(stream), chunk_size=2)
+
+    assert report['created'] == 2
+    assert [(item['line'], item['error']) for item in report['rejected']] == [
+        (4, 'Username already in use. Email already registered.'),
+        (5, 'Email already registered.'),
+        (6, 'Invalid email: broken'),
+        (7, 'Date of birth must be in the past'),
+    ]
+    amal = User.query.filter_by(email='amal@example.com').one()
+    assert amal.username == 'amal' and amal.role == 'patient'
+    assert amal.patient.last_name == 'Saleh'
+    assert amal.verify_password('') is False
+    assert User.query.filter_by(email='omar@example.com').one().verify_password('Secret@123')
+    assert Patient.query.filter_by(user_id=amal.id).one().upcoming_count == 0
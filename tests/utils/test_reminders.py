@@ -0,0 +1,125 @@
+"""
+Tests for appointment reminders in Rafad Clinic System
+"""
+import json
+from datetime import datetime, timedelta
+
+from app.models import Reminder
+from app.utils import reminders
+from tests.helpers import create_appointment
+
+NOW = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time()).replace(hour=23, minute=30)
+
+
+class RecordingTransport(reminders.Transport):
+    def __init__(self, fail=()):
+        self.sent = []
+        self.fail = fail
+
+    def send(self, reminder):
+        if reminder.recipient in self.fail:
+            raise ConnectionError('Gateway unavailable')
+        self.sent.append(reminder.dedup_key)
+
+
+def _book(test_patient, test_doctor, hours, status='scheduled'):
+    start = NOW + timedelta(hours=hours)
+    return create_appointment(test_patient, test_doctor, appointment_date=start.date(), start=start.time(),
+                              status=status)
+
+
+def test_generation_covers_the_window_once(_db, test_patient, test_doctor):
+    """Active appointments in the window get one reminder per channel, even across midnight and reruns"""
+    soon = _book(test_patient, test_doctor, 1)            # 00:30 the next day
+    later = _book(test_patient, test_doctor, 20)
+    _book(test_patient, test_doctor, 3, status='cancelled')
+    _book(test_patient, test_doctor, 30)                  # outside the 24 hour window
+    _db.session.commit()
+
+    report = reminders.generate_reminders(now=NOW, lead_hours=24, bucket_minutes=45, channels=['email', 'sms'])
+    assert (report['scanned'], report['created']) == (2, 4)
+    assert {r.appointment_id for r in Reminder.query} == {soon.id, later.id}
+
+    email = Reminder.query.filter_by(appointment_id=soon.id, channel='email').one()
+    assert email.recipient == test_patient.user.email
+    assert test_doctor.last_name in email.body and '00:30' in email.subject
+
+    again = reminders.generate_reminders(now=NOW, lead_hours=24, channels=['email', 'sms'])
+    assert (again['created'], again['skipped']) == (0, 4)
+
+    # A rescheduled appointment is a new slot and gets its own reminder
+    soon.start_time = (NOW + timedelta(hours=2)).time()
+    _db.session.commit()
+    assert reminders.generate_reminders(now=NOW, lead_hours=24, channels=['email'])['created'] == 1
+
+
+def test_delivery_sends_each_reminder_once(_db, test_patient, test_doctor):
+    """Sent reminders are never picked up again"""
+    _book(test_patient, test_doctor, 2)
+    _book(test_patient, test_doctor, 5)
+    _db.session.commit()
+    reminders.generate_reminders(now=NOW, lead_hours=24, channels=['email'])
+
+    transport = RecordingTransport()
+    report = reminders.deliver_reminders(transport, batch_size=1)
+    assert report['sent'] == 2
+    assert len(set(transport.sent)) == 2
+
+    assert reminders.deliver_reminders(transport)['sent'] == 0
+    assert len(transport.sent) == 2
+    assert Reminder.query.filter_by(status='sent').count() == 2
+
+
+def test_failed_delivery_is_retried_then_given_up(_db, test_patient, test_doctor):
+    _book(test_patient, test_doctor, 2)
+    _db.session.commit()
+    reminders.generate_reminders(now=NOW, lead_hours=24, channels=['email'])
+    transport = RecordingTransport(fail={test_patient.user.email})
+
+    for run in range(1, reminders.MAX_ATTEMPTS + 1):
+        report = reminders.deliver_reminders(transport)
+        reminder = Reminder.query.one()
+        assert reminder.attempts == run
+
+    assert report['given_up'] == 1
+    assert (reminder.status, reminder.error) == ('failed', 'Gateway unavailable')
+
+    # Given-up reminders stay out of later runs
+    assert reminders.deliver_reminders(transport)['failed'] == 0
+    assert Reminder.query.one().attempts == reminders.MAX_ATTEMPTS
+
+
+def test_file_transport_writes_json_lines(_db, app, tmp_path, test_patient, test_doctor):
+    _book(test_patient, test_doctor, 2)
+    _db.session.commit()
+    reminders.generate_reminders(now=NOW, lead_hours=24, channels=['sms'])
+
+    path = tmp_path / 'outbox.jsonl'
+    reminders.deliver_reminders(reminders.FileTransport(str(path)))
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]['recipient'] == test_patient.phone
+    assert lines[0]['body'].startswith('Rafad Clinic: reminder')
+
+
+def test_reminders_for_cancelled_or_moved_appointments_are_not_sent(_db, test_patient, test_doctor):
+    kept = _book(test_patient, test_doctor, 2)
+    moved = _book(test_patient, test_doctor, 3)
+    cancelled = _book(test_patient, test_doctor, 4)
+    _db.session.commit()
+    reminders.generate_reminders(now=NOW, lead_hours=24, channels=['email'])
+
+    moved.start_time = (NOW + timedelta(hours=6)).time()
+    cancelled.status = 'cancelled'
+    _db.session.commit()
+    reminders.generate_reminders(now=NOW, lead_hours=24, channels=['email'])
+
+    transport = RecordingTransport()
+    report = reminders.deliver_reminders(transport, batch_size=1)
+
+    assert (report['sent'], report['cancelled']) == (2, 2)
+    sent = {r.appointment_id: r for r in Reminder.query.filter_by(status='sent')}
+    assert set(sent) == {kept.id, moved.id}
+    assert moved.start_time.strftime('%H:%M') in sent[moved.id].subject
+    assert {r.appointment_id for r in Reminder.query.filter_by(status='cancelled')} == {moved.id, cancelled.id}
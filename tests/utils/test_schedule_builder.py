@@ -0,0 +1,118 @@
+"""
+Tests for bulk schedule creation in Rafad Clinic System
+"""
+import io
+from datetime import date, timedelta
+
+import pytest
+from flask import url_for
+
+from app.models import Schedule
+from app.utils.schedule_builder import build_schedules, expand_template, parse_days, read_schedule_csv
+from tests.helpers import create_doctor, create_schedule, parse_json
+
+
+def test_parse_days():
+    """Ranges, names and numbers are accepted"""
+    assert parse_days('mon-fri') == [0, 1, 2, 3, 4]
+    assert parse_days('Sat, sunday') == [5, 6]
+    assert parse_days([0, '2']) == [0, 2]
+    with pytest.raises(ValueError):
+        parse_days('fri-mon')
+
+
+def test_template_creates_week_for_many_doctors(_db, test_doctor):
+    """One batch gives every doctor the template week"""
+    other = create_doctor(last_name='Other')
+    rows = expand_template({'days': 'mon-fri', 'start': '09:00', 'end': '13:00', 'duration': 20},
+                           [test_doctor.id, other.id])
+
+    report = build_schedules(rows)
+
+    assert report['created'] == 10
+    assert report['errors'] == []
+    schedules = Schedule.query.filter_by(doctor_id=other.id).order_by(Schedule.day_of_week).all()
+    assert [s.day_of_week for s in schedules] == [0, 1, 2, 3, 4]
+    assert schedules[0].appointment_duration == 20
+
+
+def test_dry_run_and_overlaps_save_nothing(_db, test_doctor):
+    """Overlaps with existing schedules or within the batch reject the whole batch"""
+    create_schedule(test_doctor, day_of_week=0, start='09:00', end='12:00')
+    rows = [
+        {'doctor_id': test_doctor.id, 'day': 'mon', 'start': '11:00', 'end': '15:00'},
+        {'doctor_id': test_doctor.id, 'day': 'tue', 'start': '09:00', 'end': '12:00'},
+        {'doctor_id': test_doctor.id, 'day': 'tue', 'start': '10:00', 'end': '11:00'},
+        {'doctor_id': 999999, 'day': 'wed', 'start': '09:00', 'end': '12:00'},
+    ]
+
+    report = build_schedules(rows)
+
+    assert report['created'] == 0
+    assert report['errors'] == [
+        {'row': 1, 'error': 'Monday overlaps an existing schedule'},
+        {'row': 3, 'error': 'Tuesday overlaps row 2'},
+        {'row': 4, 'error': 'Doctor 999999 not found'},
+    ]
+    assert Schedule.query.filter_by(doctor_id=test_doctor.id).count() == 1
+
+    report = build_schedules(rows[1:2], dry_run=True)
+    assert report['valid'] == 1 and report['created'] == 0
+
+
+
+def test_rows_can_start_after_an_existing_version_ends(_db, test_doctor):
+    """A version ending the day before a row starts is not an overlap"""
+    last_day = date.today() + timedelta(days=7)
+    create_schedule(test_doctor, day_of_week=0, start='09:00', end='12:00', valid_to=last_day)
+    rows = [{'doctor_id': test_doctor.id, 'day': 'mon', 'start': '09:00', 'end': '12:00',
+             'valid_from': (last_day + timedelta(days=1)).isoformat()}]
+
+    report = build_schedules(rows)
+
+    assert report['errors'] == []
+    assert report['created'] == 1
+
+    rows[0]['valid_from'] = last_day.isoformat()
+    assert build_schedules(rows, dry_run=True)['errors'] == [
+        {'row': 1, 'error': 'Monday overlaps an existing schedule'}
+    ]
+
+def test_bulk_api_accepts_csv(admin_auth_client, test_doctor):
+    """Admins can upload a CSV"""
+    csv_data = f'doctor_id,day,start,end,duration\n{test_doctor.id},mon,09:00,12:00,15\n{test_doctor.id},thu,14:00,18:00,\n'
+
+    response = admin_auth_client.post(url_for('schedule_api.bulk_schedules'), data={
+        'file': (io.BytesIO(csv_data.encode()), 'schedules.csv'),
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert parse_json(response)['created'] == 2
+    assert Schedule.query.filter_by(doctor_id=test_doctor.id, day_of_week=3).one().appointment_duration == 30
+
+
+def test_bulk_api_is_admin_only(doctor_auth_client, test_doctor):
+    """Doctors cannot bulk create schedules"""
+    response = doctor_auth_client.post(url_for('schedule_api.bulk_schedules'),
+                                       json={'rows': [{'doctor_id': test_doctor.id, 'day': 0,
+                                                       'start': '09:00', 'end': '10:00'}]})
+    assert response.status_code == 403
+
+
+def test_bulk_api_rejects_malformed_json(admin_auth_client, test_doctor):
+    """Rows that are not objects are a bad request, not a server error"""
+    url = url_for('schedule_api.bulk_schedules')
+    row = {'doctor_id': test_doctor.id, 'day': 0, 'start': '09:00', 'end': '10:00'}
+
+    mixed = admin_auth_client.post(url, json={'rows': [row, 'tuesday', [1, 2]]})
+    assert mixed.status_code == 400
+    assert [error['row'] for error in parse_json(mixed)['errors']] == [2, 3]
+    for payload in ({'rows': 'all'}, [row], {'template': 'mon-fri', 'doctor_ids': [test_doctor.id]}):
+        assert admin_auth_client.post(url, json=payload).status_code == 400
+    assert Schedule.query.count() == 0
+
+
+def test_read_schedule_csv_requires_columns():
+    """Missing required columns are reported"""
+    with pytest.raises(ValueError, match='end'):
+        read_schedule_csv(io.StringIO('doctor_id,day,start\n1,mon,09:00\n'))
@@ -0,0 +1,133 @@
+"""
+Tests for the JSON provider and the row serializer
+"""
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Appointment, db
+from app.utils.serialization import AppJSONProvider, row_serializer, serialize_rows
+from tests.helpers import create_appointment, create_patient, create_schedule, create_user
+
+PAYLOAD = {
+    'day': date(2026, 10, 19),
+    'at': datetime(2026, 10, 19, 9, 30, 5, 120),
+    'slot': time(9, 30),
+    'precise': time(9, 30, 15),
+    'fee': Decimal('12.50'),
+    'by_id': {7: 'int key'},
+}
+
+
+def test_backends_encode_the_same_way(app, monkeypatch):
+    pytest.importorskip('orjson')
+    monkeypatch.setitem(app.config, 'JSON_BACKEND', 'stdlib')
+    stdlib = AppJSONProvider(app)
+    monkeypatch.setitem(app.config, 'JSON_BACKEND', 'orjson')
+    fast = AppJSONProvider(app)
+
+    assert stdlib.backend == 'stdlib' and fast.backend == 'orjson'
+    assert json.loads(fast.dumps(PAYLOAD)) == json.loads(stdlib.dumps(PAYLOAD)) == {
+        'day': '2026-10-19',
+        'at': '2026-10-19T09:30:05.000120',
+        'slot': '09:30',
+        'precise': '09:30:15',
+        'fee': '12.50',
+        'by_id': {'7': 'int key'},
+    }
+    with app.test_request_context():
+        assert fast.response(PAYLOAD).get_json() == stdlib.response(PAYLOAD).get_json()
+
+    monkeypatch.setitem(app.config, 'JSON_BACKEND', 'ujson')
+    with pytest.raises(ValueError):
+        AppJSONProvider(app)
+
+
+def test_row_serializer_reads_paths_callables_and_rows(_db, test_patient, test_doctor):
+    appointment = create_appointment(test_patient, test_doctor)
+    serialize = row_serializer({
+        'id': 'id',
+        'doctor_name': 'doctor.full_name',
+        'length': lambda row: row.end_time.hour * 60 + row.end_time.minute
+                              - row.start_time.hour * 60 - row.start_time.minute,
+    })
+    rows = db.session.execute(db.select(Appointment.id, Appointment.status)).all()
+
+    assert serialize(appointment) == {'id': appointment.id, 'doctor_name': test_doctor.full_name, 'length': 30}
+    assert serialize_rows(rows, ['id', 'status']) == [{'id': appointment.id, 'status': 'scheduled'}]
+
+
+def test_api_keeps_its_date_and_time_format(admin_auth_client, _db, test_patient, test_doctor):
+    day = date.today() + timedelta(days=1)
+    appointment = create_appointment(test_patient, test_doctor, appointment_date=day, start='10:00')
+    create_schedule(test_doctor, day_of_week=day.weekday())
+    _db.session.commit()
+
+    calendar = admin_auth_client.get(f'/api/appointments?start={day}&end={day}').get_json()
+    detail = admin_auth_client.get(f'/api/appointment/{appointment.id}').get_json()
+    schedule = admin_auth_client.get(f'/api/doctor-schedule/{test_doctor.id}?week={day}').get_json()
+
+    assert calendar['appointments'] == [{
+        'id': appointment.id,
+        'patient_id': test_patient.id,
+        'patient_name': test_patient.full_name,
+        'doctor_id': test_doctor.id,
+        'doctor_name': test_doctor.full_name,
+        'appointment_date': day.isoformat(),
+        'appointment_time': '10:00',
+        'status': 'scheduled',
+        'reason': appointment.reason,
+    }]
+    assert detail['appointment']['created_at'] == appointment.created_at.isoformat()
+    assert detail['appointment']['formatted_date'] == day.strftime('%d/%m/%Y')
+    assert schedule['schedules'][0]['start_time'] == '09:00'
+    assert schedule['week_start'] == (day - timedelta(days=day.weekday())).isoformat()
+
+
+def test_fields_limit_the_payload_and_the_loaded_columns(admin_auth_client, _db, test_patient, test_doctor):
+    day = date.today() + timedelta(days=1)
+    appointment = create_appointment(test_patient, test_doctor, appointment_date=day, notes='Private note')
+    create_schedule(test_doctor, day_of_week=day.weekday())
+    _db.session.commit()
+    appointment_id, doctor_id, doctor_name = appointment.id, test_doctor.id, test_doctor.full_name
+    # Nothing cached in the identity map: every column shown must come from the query
+    _db.session.expunge_all()
+
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM appointments' in statement:
+            statements.append(statement)
+
+    event.listen(_db.engine, 'before_cursor_execute', collect)
+    try:
+        calendar = admin_auth_client.get(f'/api/appointments?start={day}&end={day}&fields=id,status,doctor_name')
+    finally:
+        event.remove(_db.engine, 'before_cursor_execute', collect)
+    detail = admin_auth_client.get(f'/api/appointment/{appointment_id}?fields=notes')
+    schedule = admin_auth_client.get(f'/api/doctor-schedule/{doctor_id}?week={day}&fields=day_of_week,start_time')
+    unknown = admin_auth_client.get(f'/api/appointments?start={day}&end={day}&fields=id,password')
+
+    assert calendar.get_json()['appointments'] == [
+        {'id': appointment_id, 'status': 'scheduled', 'doctor_name': doctor_name}]
+    assert len(statements) == 1
+    assert 'doctors_1.first_name' in statements[0]
+    assert 'appointments.notes' not in statements[0] and 'appointments.reason' not in statements[0]
+    assert detail.get_json() == {'appointment': {'notes': 'Private note'}}
+    assert schedule.get_json()['schedules'] == [{'day_of_week': day.weekday(), 'start_time': '09:00'}]
+    assert unknown.status_code == 400
+    assert 'password' in unknown.get_json()['details']
+
+
+def test_sparse_detail_still_checks_ownership(auth_client, _db, test_patient, test_doctor):
+    other = create_patient(create_user(role='patient', username='otherpatient', email='other@example.com'))
+    appointment_id = create_appointment(other, test_doctor).id
+    _db.session.commit()
+    _db.session.expunge_all()
+
+    response = auth_client.get(f'/api/appointment/{appointment_id}?fields=status')
+
+    assert response.status_code == 403
@@ -0,0 +1,44 @@
+"""
+Tests for the startup profiling helpers
+"""
+import pytest
+
+from app.utils.startup_profile import parse_importtime, summarize_imports
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      2000 |       2500 |   sqlalchemy.sql
+import time:       300 |       2800 | sqlalchemy
+import time:       500 |        500 | app.models
+"""
+
+
+def test_parse_importtime():
+    """Header lines are skipped and nesting depth is recovered"""
+    entries = parse_importtime(SAMPLE)
+    assert [e['module'] for e in entries] == ['_io', 'sqlalchemy.sql', 'sqlalchemy', 'app.models']
+    assert [e['depth'] for e in entries] == [2, 1, 0, 0]
+    assert entries[1]['self_ms'] == 2.0
+    assert entries[2]['cumulative_ms'] == 2.8
+
+
+def test_summarize_imports():
+    """Modules are ranked by cumulative time and packages by self time"""
+    summary = summarize_imports(parse_importtime(SAMPLE), top=2)
+    assert summary['total_ms'] == pytest.approx(2.92)
+    assert [e['module'] for e in summary['slowest']] == ['sqlalchemy', 'sqlalchemy.sql']
+    assert summary['packages'][0] == ('sqlalchemy', pytest.approx(2.3))
+
+
+def test_create_app_does_not_create_tables():
+    """create_app leaves schema creation to init_db / migrations"""
+    from sqlalchemy import inspect
+    from app import create_app, db
+
+    fresh = create_app('testing')
+    if fresh.config['SQLALCHEMY_DATABASE_URI'] != 'sqlite://':
+        pytest.skip('needs the private in-memory test database')
+    with fresh.app_context():
+        assert inspect(db.engine).get_table_names() == []
+    # Flask-Migrate is only set up under the flask CLI
+    assert 'migrate' not in fresh.extensions
@@ -0,0 +1,43 @@
+"""
+Tests for the application warm-up used by gunicorn
+"""
+import pytest
+from jinja2 import FileSystemBytecodeCache, TemplateSyntaxError
+
+from app.utils import warmup
+from app.utils.warmup import precompile_templates, warm_up
+
+
+def test_warm_up_compiles_templates(app, test_doctor):
+    """Every step runs and templates end up in the Jinja cache"""
+    timings = warm_up(app)
+    assert set(timings) == {'mappers', 'templates', 'doctor_directory', 'settings'}
+    assert all(value is not None for value in timings.values())
+    templates = app.jinja_env.list_templates(extensions=('html',))
+    assert len(app.jinja_env.cache) >= min(len(templates), app.jinja_env.cache.capacity)
+
+
+def test_warm_up_survives_any_failing_step(app, test_doctor, monkeypatch):
+    """A broken template is logged and skipped; the other steps still run"""
+    def broken(app):
+        raise TemplateSyntaxError('unexpected end of template', 1)
+
+    monkeypatch.setattr(warmup, '_compile_templates', broken)
+    timings = warm_up(app)
+
+    assert timings['templates'] is None
+    assert timings['doctor_directory'] is not None and timings['settings'] is not None
+
+
+def test_precompile_templates_fills_the_bytecode_cache(app, tmp_path, monkeypatch):
+    """Every template gets a cache entry that later loads reuse"""
+    with pytest.raises(RuntimeError):
+        precompile_templates(app)
+
+    monkeypatch.setattr(app.jinja_env, 'bytecode_cache', FileSystemBytecodeCache(str(tmp_path)))
+    report = precompile_templates(app)
+    entries = {path.name: path.stat().st_mtime_ns for path in tmp_path.iterdir()}
+    assert report['templates'] == len(entries) > 0
+
+    precompile_templates(app)
+    assert {path.name: path.stat().st_mtime_ns for path in tmp_path.iterdir()} == entries